@@ -1,3 +1,4 @@
+from .backfill import *
 from .branch import *
 from .chem import *
 from .database_helper import *
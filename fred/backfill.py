@@ -0,0 +1,171 @@
+"""backfill.py module"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import logging
+import os
+import time
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import TYPE_CHECKING
+
+import fred.database_helper as dbh
+from .chem import ChemCheck
+from .vat import VAT
+
+if TYPE_CHECKING:
+    from typing import Dict, Iterator, List, Optional, Tuple
+    from .branch import Branch
+    from .database import YMCADatabase
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class BackfillKind:
+    """The model and name columns used to import one kind of Formstack export."""
+    model: type
+    insert: str
+    name_columns: Tuple[Tuple[str, str], ...]
+
+
+BACKFILL_KINDS: Dict[str, BackfillKind] = {
+    'chems': BackfillKind(ChemCheck, 'insert_chems', (('Your Name (First)', 'Your Name (Last)'),)),
+    'vats': BackfillKind(VAT, 'insert_vats', (
+        ('Name of Lifeguard Vigilance Tested (First)', 'Name of Lifeguard Vigilance Tested (Last)'),
+        ('Who monitored & conducted the vigilance test? (First)',
+         'Who monitored & conducted the vigilance test? (Last)')))
+}
+
+
+class CSVBackfill:
+    """
+    Imports historical Formstack CSV exports into the database.
+
+    The export is streamed in chunks rather than read whole. Each distinct
+    name in a chunk is matched to a Discord id once, and every chunk is
+    written in a single transaction together with a checkpoint of how many
+    rows have been imported, so an interrupted backfill resumes at the
+    first unwritten chunk.
+
+    Args:
+        database (YMCADatabase): The database to import into.
+        branch (Branch): The YMCA Branch the export is filtered for.
+        chunk_size (int, optional): Rows written per transaction.
+    """
+
+    def __init__(self, database: YMCADatabase, branch: Branch, chunk_size: int = 1000):
+        self.database: YMCADatabase = database
+        self.branch: Branch = branch
+        self.chunk_size: int = chunk_size
+        self.discord_ids: Dict[Tuple[str, str], Optional[int]] = {}
+
+    @staticmethod
+    def checkpoint_feed(kind: str, path: str) -> str:
+        """
+        Names the checkpoint of an export after its resolved absolute path, so
+        exports that share a file name in different directories never share a
+        checkpoint. Checkpoints are stored per branch (the ingestion_state
+        key), so the same path imported for two branches is tracked apart.
+        """
+        return f"csv:{kind}:{os.path.realpath(path)}"
+
+    def select_checkpoint(self, feed: str) -> int:
+        with self.database.reader() as connection:
+            cursor = connection.cursor()
+            cursor.execute("""
+                SELECT high_water_mark FROM ingestion_state
+                WHERE branch_id = ? AND feed = ?;
+            """, (self.branch.branch_id, feed))
+            checkpoint = cursor.fetchone()
+        return checkpoint[0] if checkpoint else 0
+
+    def run(self, kind: str, path: str) -> int:
+        """
+        Imports a CSV export, resuming from the last checkpoint for the file.
+
+        Args:
+            kind (str): 'chems' or 'vats'.
+            path (str): Path to the Formstack CSV export.
+
+        Returns:
+            int: The number of rows newly written to the database.
+        """
+        backfill_kind = BACKFILL_KINDS[kind]
+        insert = getattr(self.database, backfill_kind.insert)
+        feed = self.checkpoint_feed(kind, path)
+        offset = self.select_checkpoint(feed)
+        if offset:
+            log.log(logging.INFO, f"Resuming backfill of {path} after row {offset}")
+
+        inserted, processed = 0, 0
+        start = time.perf_counter()
+        with open(path, newline='') as csvfile:
+            for chunk in self._chunks(itertools.islice(csv.DictReader(csvfile), offset, None)):
+                self._resolve_names(backfill_kind, chunk)
+                items = [backfill_kind.model.from_csv_row(self.branch, row, self.discord_ids) for row in chunk]
+                checkpoint = offset + processed + len(chunk)
+                inserted += len(insert(self.branch, items, feed=feed, high_water_mark=checkpoint))
+                if self.select_checkpoint(feed) < checkpoint:
+                    log.log(logging.ERROR, f"Backfill of {path} stopped after row {offset + processed}; "
+                                           f"rerun to resume from there")
+                    break
+                processed += len(chunk)
+        elapsed = time.perf_counter() - start
+        log.log(logging.INFO, f"Backfilled {processed} {kind} rows ({inserted} new) from {path} in {elapsed:.2f}s "
+                              f"({processed / elapsed if elapsed else 0:.0f} rows/sec)")
+        return inserted
+
+    def _chunks(self, rows: Iterator[Dict[str, str]]) -> Iterator[List[Dict[str, str]]]:
+        while chunk := list(itertools.islice(rows, self.chunk_size)):
+            yield chunk
+
+    def _resolve_names(self, backfill_kind: BackfillKind, chunk: List[Dict[str, str]]) -> None:
+        names = [(row[first_column], row[last_column]) for row in chunk
+                 for first_column, last_column in backfill_kind.name_columns]
+        unresolved = [name for name in names if name not in self.discord_ids]
+        self.discord_ids.update(dbh.match_discord_ids(self.branch, unresolved))
+
+
+def stored_guild(database: YMCADatabase, branch_id: str) -> SimpleNamespace:
+    """
+    Stands in for a Discord guild when backfilling without a bot connection,
+    using the members last synced into the discord_users table.
+    """
+    with database.reader() as connection:
+        cursor = connection.cursor()
+        cursor.execute("SELECT id, nickname FROM discord_users WHERE branch_id = ?;", (branch_id,))
+        members = [SimpleNamespace(id=member_id, display_name=nickname) for member_id, nickname in cursor.fetchall()]
+    return SimpleNamespace(members=members)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill historical Formstack CSV exports into the database.')
+    parser.add_argument('branch_id', help="the branch the export belongs to, e.g. '007'")
+    parser.add_argument('kind', choices=BACKFILL_KINDS.keys())
+    parser.add_argument('path', help='path to the Formstack CSV export')
+    parser.add_argument('--database', default='ymca_aquatics.db')
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from settings import SETTINGS_DICT
+    from .branch import Branch
+    from .database import YMCADatabase
+
+    database = YMCADatabase(None, args.database)
+    database.migrate()
+    branch = Branch(None, args.branch_id, SETTINGS_DICT['branches'][args.branch_id])
+    branch.guild = stored_guild(database, args.branch_id)
+    branch.update_name_index()
+    try:
+        CSVBackfill(database, branch, args.chunk_size).run(args.kind, args.path)
+    finally:
+        database.close()
+
+
+if __name__ == '__main__':
+    main()
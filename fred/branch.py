@@ -1,17 +1,19 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
 from typing import TYPE_CHECKING, List, Dict, Optional, Union
 
 from whentowork import Employee
 
+from .database_helper import IdentityCache, NameIndex
 from .pool_group import PoolGroup
-from .w2w import YMCAW2WClient
+from .w2w import DEFAULT_SHIFT_CACHE_TTL, AsyncYMCAW2WClient
 
 if TYPE_CHECKING:
     from .ymca import YMCA
     from .pool import Pool
-    from .types.w2w import YMCAW2WClientPayload
     from discord import Guild, Member
 
 log = logging.getLogger(__name__)
@@ -28,6 +30,8 @@ class Branch:
 
         self.guild_id: int = branch['guild_id']
         self.guild: Union[Guild, None] = None
+        self.name_index: Optional[NameIndex] = None
+        self.identity_cache: IdentityCache = ymca.identity_cache if ymca else IdentityCache()
         self.guild_role_ids: Dict[str, Dict[str, int]] = branch['discord_role_ids']
         self.test_guild_id: int = branch['test_guild_id']
         self.test_guild = None
@@ -35,7 +39,10 @@ class Branch:
 
         self.pool_groups: List[PoolGroup] = [PoolGroup(branch_id, pool_group_id, pool_group) for
                                              pool_group_id, pool_group in branch['pool_groups'].items()]
-        self._update_w2w_client(branch['w2w_custom_hostname'], branch['w2w_token'], branch['w2w_position_ids'])
+        # WhenToWork is not contacted here; start() connects the client once the event loop is running.
+        self.async_w2w_client: AsyncYMCAW2WClient = AsyncYMCAW2WClient(
+            branch['w2w_custom_hostname'], branch['w2w_token'], branch['w2w_position_ids'],
+            branch.get('w2w_shift_cache_ttl', DEFAULT_SHIFT_CACHE_TTL))
 
         self.rss_links: Dict[str, str] = branch['rss_links']
         self.last_chem_id: int = 0
@@ -44,6 +51,26 @@ class Branch:
         self.last_closing_id: int = 0
         self.last_in_service_id: int = 0
 
+    def update_name_index(self):
+        self.name_index = NameIndex(self.guild.members) if self.guild else None
+
+    def refresh_identities(self, joined: Optional[Member] = None, left: Optional[Member] = None):
+        """
+        Rebuilds the name index after a membership or display name change and
+        drops only the cached identities the change could affect.
+
+        Args:
+            joined (Member, optional): The member as they now appear, if they
+                joined or were renamed.
+            left (Member, optional): The member as they previously appeared,
+                if they left or were renamed.
+        """
+        self.update_name_index()
+        if left:
+            self.identity_cache.invalidate_member(self.branch_id, left.id)
+        if joined:
+            self.identity_cache.invalidate_display_name(self.branch_id, joined.display_name)
+
     def get_pool_by_pool_id(self, pool_id: str) -> Optional[Pool]:
         for pool_group in self.pool_groups:
             for pool in pool_group.pools:
@@ -55,23 +82,45 @@ class Branch:
         user = self.guild.get_member(discord_user_id)
         return user if user else None
 
-    def get_w2w_employee_by_id(self, w2w_employee_id: int) -> Optional[Employee]:
-        employee = self.w2w_client.get_employee_by_id(w2w_employee_id)
+    async def get_w2w_employee_by_id(self, w2w_employee_id: int) -> Optional[Employee]:
+        employee = await self.async_w2w_client.get_employee_by_id(w2w_employee_id)
         return employee if employee else None
         # employee = self.ymca.database.select_w2w_employee(w2w_employee_id)
 
-    def _update_w2w_client(self, w2w_custom_hostname: str, w2w_token: str, w2w_position_ids: YMCAW2WClientPayload):
+    async def init_async_w2w_client(self):
         try:
-            self.w2w_client = YMCAW2WClient(w2w_custom_hostname, w2w_token, w2w_position_ids)
+            await self.async_w2w_client.setup()
         except Exception as e:
-            log.error(msg=f'W2W Client not connected for branch {self.name}: {str(e)}')
-
-    def init_w2w_positions(self):
+            log.error(msg=f'Async W2W Client not connected for branch {self.name}: {str(e)}')
+
+    async def start(self, timings: Dict[str, float]):
+        """
+        Connects the branch's WhenToWork client, then loads its pool group
+        positions and today's pool hours. Each phase's duration is recorded in
+        timings as it finishes, so a branch that times out still reports how
+        far it got.
+        """
+        phase_start = time.perf_counter()
+        await self.init_async_w2w_client()
+        timings['w2w'] = time.perf_counter() - phase_start
+        if not self.async_w2w_client.ready:
+            return
+        phase_start = time.perf_counter()
+        await self.init_w2w_positions()
+        timings['positions'] = time.perf_counter() - phase_start
+        phase_start = time.perf_counter()
+        await self.update_pool_groups()
+        timings['pool_hours'] = time.perf_counter() - phase_start
+
+    async def init_w2w_positions(self):
         for pool_group in self.pool_groups:
-            pool_group.w2w_lifeguard_position = self.w2w_client.get_position_by_id(pool_group.w2w_lifeguard_position_id)
-            pool_group.w2w_supervisor_position = self.w2w_client.get_position_by_id(
+            pool_group.w2w_lifeguard_position = await self.async_w2w_client.get_position_by_id(
+                pool_group.w2w_lifeguard_position_id)
+            pool_group.w2w_supervisor_position = await self.async_w2w_client.get_position_by_id(
                 pool_group.w2w_supervisor_position_id)
 
-    def update_pool_groups(self):
-        for pool_group in self.pool_groups:
-            pool_group.update_pools(self.w2w_client.get_shifts_today([pool_group.w2w_lifeguard_position]))
+    async def update_pool_groups(self):
+        for pool_group, shifts in zip(self.pool_groups, await asyncio.gather(*(
+                self.async_w2w_client.get_shifts_today([pool_group.w2w_lifeguard_position])
+                for pool_group in self.pool_groups))):
+            pool_group.update_pools(shifts)
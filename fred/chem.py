@@ -78,7 +78,8 @@ class ChemCheck:
         return 7.0 < self.ph < 8.0
 
     @classmethod
-    def from_csv_row(cls, branch: Branch, row: Dict[str, str]) -> ChemCheck:
+    def from_csv_row(cls, branch: Branch, row: Dict[str, str],
+                     discord_ids: Optional[Dict[Tuple[str, str], Optional[int]]] = None) -> ChemCheck:
         """
         Factory method that initializes an instance of ChemCheck from a CSV 
         export from Formstack.
@@ -86,13 +87,16 @@ class ChemCheck:
         Args:
             branch (Branch): The YMCA Branch the CSV file is filtered for.
             row (Dict[str, str]): A single row from the CSV file.
+            discord_ids (Dict[Tuple[str, str], Optional[int]], optional):
+                Names already resolved to Discord ids, such as one chunk of a
+                backfill. Names missing from it are matched individually.
 
         Returns:
             ChemCheck: An instance of ChemCheck
         """
         chem_uuid = int(row['Unique ID'])
-        discord_id = dbh.match_discord_id(branch, row['Your Name (First)'], row['Your Name (Last)'])
-        name = dbh.handle_quotes(row['Your Name (First)'], row['Your Name (Last)'])
+        discord_id = dbh.resolve_discord_id(branch, row['Your Name (First)'], row['Your Name (Last)'], discord_ids)
+        name = dbh.handle_names(row['Your Name (First)'], row['Your Name (Last)'])
         pool_id = dbh.match_pool_id_from_dict(branch, row)
         sample_location = row.get('Location of Water Sample, Western', 'NULL')
         time = dbh.handle_fs_rss_datetime(row['Date/Time'])
@@ -120,12 +124,12 @@ class ChemCheck:
         """
         chem_uuid = int(entry['Unique ID'])
         discord_id = dbh.match_discord_id(branch, entry['Your Name'])
-        name = dbh.handle_quotes(entry['Your Name'])
+        name = dbh.handle_names(entry['Your Name'])
         pool_id = dbh.match_pool_id_from_dict(branch, entry)
         sample_location_key = match_sample_location_key(entry.keys())
         sample_location = entry.get(sample_location_key, '')
         time = dbh.handle_fs_rss_datetime(entry['Date/Time'])
-        submit_time = entry['Time']
+        submit_time = dbh.handle_datetime(entry['Time'])
         chlorine = float(entry['Chlorine'])
         ph = float(entry['PH'])
         water_temp = handle_water_temp(entry['Water Temperature'])
@@ -155,8 +159,8 @@ class ChemCheck:
         branch_id = db_tup[3]
         pool_id = db_tup[4]
         sample_location = db_tup[5]
-        time = datetime.datetime.fromisoformat(db_tup[6])
-        submit_time = datetime.datetime.fromisoformat(db_tup[7])
+        time = dbh.handle_datetime(db_tup[6])
+        submit_time = dbh.handle_datetime(db_tup[7])
         chlorine = float(db_tup[8])
         ph = float(db_tup[9])
         water_temp = int(db_tup[10])
@@ -41,6 +41,26 @@ class FormstackCommands(discord.app_commands.Group):
         await self.fred.tree.sync()
         await interaction.response.send_message("All commands loaded", ephemeral=True)
 
+    @discord.app_commands.command(description="Clears cached WhenToWork shifts so the next lookup refetches them")
+    async def refresh_schedule(self, interaction: discord.Interaction):
+        branch = self.fred.ymca.get_branch_by_guild_id(interaction.guild_id)
+        branch.async_w2w_client.invalidate_shifts()
+        await interaction.response.send_message("Cached schedule cleared", ephemeral=True)
+
+    @discord.app_commands.command(description="Shows how often WhenToWork shifts are served without a new request")
+    async def schedule_cache_stats(self, interaction: discord.Interaction):
+        w2w_client = self.fred.ymca.get_branch_by_guild_id(interaction.guild_id).async_w2w_client
+        await interaction.response.send_message(
+            f"Schedule cache: {w2w_client.shift_cache_hits} day hits, {w2w_client.shift_cache_misses} day misses, "
+            f"{w2w_client.shift_fetches_coalesced} requests saved by sharing in-flight fetches", ephemeral=True)
+
+    @discord.app_commands.command(description="Shows how often names are resolved without fuzzy matching")
+    async def identity_cache_stats(self, interaction: discord.Interaction):
+        identity_cache = self.fred.ymca.identity_cache
+        await interaction.response.send_message(
+            f"Identity cache: {len(identity_cache)} names, {identity_cache.hits} hits, {identity_cache.misses} "
+            f"misses ({identity_cache.hit_rate:.1%} hit rate)", ephemeral=True)
+
 
 async def setup(fred: Fred):
     fred.tree.add_command(FormstackCommands(name="admin", description="test", fred=fred))
@@ -49,7 +49,7 @@ class ScheduleCommands(discord.app_commands.Group):
         ]
 
     @staticmethod
-    def get_shifts_from_auto(
+    async def get_shifts_from_auto(
             int_branch: Branch,
             int_dt: datetime.datetime,
             position_auto: str) -> Dict[Position, List[Shift]]:
@@ -64,7 +64,7 @@ class ScheduleCommands(discord.app_commands.Group):
         Returns:
             Dict[Position, List[Shift]]: Current shifts, sorted by Position
         """
-        int_w2w_client = int_branch.w2w_client
+        int_w2w_client = int_branch.async_w2w_client
         positions: List[Position] = []
         if position_auto in ('guard', 'all'):
             for pos in int_w2w_client.lifeguard_positions:
@@ -75,7 +75,7 @@ class ScheduleCommands(discord.app_commands.Group):
         for pos in int_w2w_client.leadership_positions:
             positions.append(pos)
 
-        return int_w2w_client.shifts_sorted_by_position(
+        return await int_w2w_client.shifts_sorted_by_position(
             int_dt - datetime.timedelta(minutes=15),
             int_dt + datetime.timedelta(minutes=15),
             positions)
@@ -107,14 +107,14 @@ class ScheduleCommands(discord.app_commands.Group):
         """
         int_branch = self.fred.ymca.get_branch_by_guild_id(interaction.guild_id)
         now = datetime.datetime.now()
-        w2w_shifts_by_pos = self.get_shifts_from_auto(int_branch, now, position)
+        w2w_shifts_by_pos = await self.get_shifts_from_auto(int_branch, now, position)
         mobile = platform == 'desktop'
         if w2w_shifts_by_pos and mobile:
-            content = self.format_employees(
+            content = await self.format_employees(
                 int_branch, w2w_shifts_by_pos, position, mobile)
             await interaction.response.send_message(content, ephemeral=True)
         elif w2w_shifts_by_pos and not mobile:
-            content = self.format_employees(
+            content = await self.format_employees(
                 int_branch, w2w_shifts_by_pos, position, mobile)
             title = ("Current Schedule on WhenToWork (Positions: "
                      f"{position.capitalize().replace('-', ' ')})")
@@ -126,7 +126,7 @@ class ScheduleCommands(discord.app_commands.Group):
                 "Please adjust your parameters.",
                 ephemeral=True)
 
-    def format_employees(
+    async def format_employees(
             self,
             int_branch: Branch,
             w2w_shifts_by_pos: Dict[Position, List[Shift]],
@@ -143,11 +143,12 @@ class ScheduleCommands(discord.app_commands.Group):
                     content += f'{w2w_guard_name}, {w2w_shift_time}\n'
             return content[:2000]
         content = ''
+        discord_users = await self.fred.ymca.async_database.resolve_many(
+            int_branch, [shift.employee for shifts in w2w_shifts_by_pos.values() for shift in shifts if shift.employee])
         for pos, shifts in w2w_shifts_by_pos.items():
             content += f'**{pos.position_name}**\n'
             for shift in shifts:
-                discord_user = self.fred.ymca.database.select_discord_user(int_branch,
-                                                                           shift.employee) if shift.employee else None
+                discord_user = discord_users.get(shift.employee.id) if shift.employee else None
                 mention = discord_user.mention if discord_user else discord_user
                 w2w_shift_time = (f"{shift.start_datetime.strftime('%I:%M%p')}-"
                                   f"{shift.end_datetime.strftime('%I:%M%p')}")
@@ -11,6 +11,7 @@ from fred.dashboard import SupervisorReport, GuardReport, ReportType
 if TYPE_CHECKING:
     from fred.fred import Fred
     from fred.chem import ChemCheck
+    from fred.pool import Pool
     from typing import List
 
 
@@ -39,14 +40,16 @@ class FormstackCommands(discord.app_commands.Group):
     @discord.app_commands.autocomplete(pool=chems_pool_auto, platform=platform_auto)
     async def chems(self, interaction: discord.Interaction, pool: str, platform: str):
         int_branch = self.fred.ymca.get_branch_by_guild_id(interaction.guild_id)
-        selected_chems: List[ChemCheck] = []
+        selected_pools: List[Pool] = []
         for pool_group in int_branch.pool_groups:
             if pool in pool_group.aliases:
-                selected_chems.extend(self.fred.ymca.database.select_last_chems(int_branch, pool_group.pools))
+                selected_pools.extend(pool_group.pools)
                 continue
             for pool_obj in pool_group.pools:
                 if pool in pool_obj.aliases or pool == 'all':
-                    selected_chems.append(self.fred.ymca.database.select_last_chem(int_branch, pool_obj))
+                    selected_pools.append(pool_obj)
+        selected_chems: List[ChemCheck] = await self.fred.ymca.async_database.select_last_chems(int_branch,
+                                                                                              selected_pools)
 
         chems_formatted = []
         for chem in selected_chems:
@@ -80,7 +83,7 @@ class FormstackCommands(discord.app_commands.Group):
         int_branch = self.fred.ymca.get_branch_by_guild_id(interaction.guild_id)
         now = datetime.datetime.now()
         if group == 'last':
-            vat = self.fred.ymca.database.select_last_vat(int_branch)
+            vat = await self.fred.ymca.async_database.select_last_vat(int_branch)
             pool = int_branch.get_pool_by_pool_id(vat.pool_id)
             pool_name = pool.name if pool else 'Pool Name Error'
             vat_formatted = (f'Guard Name: <@{vat.guard_discord_id}>\n Supervisor Name: <@{vat.sup_discord_id}>\n'
@@ -93,14 +96,14 @@ class FormstackCommands(discord.app_commands.Group):
                 report = GuardReport(ReportType.MTD, now)
             else:
                 report = SupervisorReport(ReportType.MTD, now)
-            report.run_report(int_branch, interaction.user, include_vats=True)
+            await report.run_report(int_branch, interaction.user, include_vats=True)
             await report.send_report_plot(interaction=interaction)
         else:
             if group == 'guard-dashboard':
                 report = GuardReport(ReportType.MTD, now)
             else:
                 report = SupervisorReport(ReportType.MTD, now)
-            report.run_report(int_branch, interaction.user, include_vats=True)
+            await report.run_report(int_branch, interaction.user, include_vats=True)
             await report.send_report(interaction=interaction, mobile=(platform == 'mobile'))
 
 
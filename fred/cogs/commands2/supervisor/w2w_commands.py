@@ -38,45 +38,45 @@ class W2WCommands(discord.app_commands.Group):
         ]
 
     @staticmethod
-    def get_shifts_from_auto(int_branch: Branch, position_auto: str, time_auto: str) -> List[Shift]:
-        int_w2w_client = int_branch.w2w_client
+    async def get_shifts_from_auto(int_branch: Branch, position_auto: str, time_auto: str) -> List[Shift]:
+        int_w2w_client = int_branch.async_w2w_client
         positions: List[Position] = [int_w2w_client.specialist, int_w2w_client.supervisor]
         for pool_group in int_branch.pool_groups:
             if position_auto == 'all':
-                positions.append(int_w2w_client.get_position_by_id(pool_group.w2w_lifeguard_position_id))
+                positions.append(await int_w2w_client.get_position_by_id(pool_group.w2w_lifeguard_position_id))
             elif position_auto in pool_group.aliases:
-                positions.append(int_w2w_client.get_position_by_id(pool_group.w2w_lifeguard_position_id))
+                positions.append(await int_w2w_client.get_position_by_id(pool_group.w2w_lifeguard_position_id))
 
         if time_auto == 'now':
-            return int_w2w_client.get_shifts_now(positions)
+            return await int_w2w_client.get_shifts_now(positions)
         elif time_auto == 'today':
-            return int_w2w_client.get_shifts_today(positions)
+            return await int_w2w_client.get_shifts_today(positions)
         elif time_auto == 'later-today':
-            return int_w2w_client.get_shifts_later(positions)
+            return await int_w2w_client.get_shifts_later(positions)
         elif time_auto == 'earlier-today':
-            return int_w2w_client.get_shifts_earlier(positions)
+            return await int_w2w_client.get_shifts_earlier(positions)
         elif time_auto == 'today-closers':
             today = datetime.date.today()
-            return int_w2w_client.get_shifts_extreme(today, today, positions, False)
+            return await int_w2w_client.get_shifts_extreme(today, today, positions, False)
 
         elif time_auto == 'tomorrow':
-            return int_w2w_client.get_shifts_tomorrow(positions)
+            return await int_w2w_client.get_shifts_tomorrow(positions)
         elif time_auto == 'tomorrow-openers':
             tomorrow = datetime.date.today() + datetime.timedelta(1)
-            return int_w2w_client.get_shifts_extreme(tomorrow, tomorrow, positions, True)
+            return await int_w2w_client.get_shifts_extreme(tomorrow, tomorrow, positions, True)
         elif time_auto == 'tomorrow-closers':
             tomorrow = datetime.date.today() + datetime.timedelta(1)
-            return int_w2w_client.get_shifts_extreme(tomorrow, tomorrow, positions, False)
+            return await int_w2w_client.get_shifts_extreme(tomorrow, tomorrow, positions, False)
 
         elif time_auto == 'week':
             today = datetime.date.today()
-            return int_w2w_client.get_shifts(today, today + datetime.timedelta(7), positions)
+            return await int_w2w_client.get_shifts(today, today + datetime.timedelta(7), positions)
         elif time_auto == 'week-openers':
             today = datetime.date.today()
-            return int_w2w_client.get_shifts_extreme(today, today + datetime.timedelta(7), positions, True)
+            return await int_w2w_client.get_shifts_extreme(today, today + datetime.timedelta(7), positions, True)
         elif time_auto == 'week-closers':
             today = datetime.date.today()
-            return int_w2w_client.get_shifts_extreme(today, today + datetime.timedelta(7), positions, False)
+            return await int_w2w_client.get_shifts_extreme(today, today + datetime.timedelta(7), positions, False)
 
         else:
             return []
@@ -87,9 +87,9 @@ class W2WCommands(discord.app_commands.Group):
     @discord.app_commands.autocomplete(time=guards_time_auto, position=guards_pos_auto)
     async def guards(self, interaction: discord.Interaction, time: str, position: str, message: str):
         int_branch = self.fred.ymca.get_branch_by_guild_id(interaction.guild_id)
-        shifts = self.get_shifts_from_auto(int_branch, position, time)
-        w2w_employees = int_branch.w2w_client.unique_employees(shifts)
-        discord_users = self.fred.ymca.database.select_discord_users(int_branch, w2w_employees)
+        shifts = await self.get_shifts_from_auto(int_branch, position, time)
+        w2w_employees = int_branch.async_w2w_client.unique_employees(shifts)
+        discord_users = await self.fred.ymca.async_database.select_discord_users(int_branch, w2w_employees)
         if discord_users:
             await interaction.response.send_message(
                 f"Notification: {' '.join([user.mention for user in discord_users])}: {message}")
@@ -112,8 +112,8 @@ class W2WCommands(discord.app_commands.Group):
         ]
 
     @staticmethod
-    def get_instructor_shifts_from_auto(int_branch: Branch, position_auto: str, time_auto: str) -> List[Shift]:
-        int_w2w_client = int_branch.w2w_client
+    async def get_instructor_shifts_from_auto(int_branch: Branch, position_auto: str, time_auto: str) -> List[Shift]:
+        int_w2w_client = int_branch.async_w2w_client
         positions: List[Position] = []
         if position_auto == 'group' or position_auto == 'all':
             positions.append(int_w2w_client.swim_instructor)
@@ -123,16 +123,16 @@ class W2WCommands(discord.app_commands.Group):
             positions.append(int_w2w_client.swam)
 
         if time_auto == 'now':
-            return int_w2w_client.get_shifts_now(positions)
+            return await int_w2w_client.get_shifts_now(positions)
         elif time_auto == 'today':
-            return int_w2w_client.get_shifts_today(positions)
+            return await int_w2w_client.get_shifts_today(positions)
         elif time_auto == 'later-today':
-            return int_w2w_client.get_shifts_later(positions)
+            return await int_w2w_client.get_shifts_later(positions)
         elif time_auto == 'earlier-today':
-            return int_w2w_client.get_shifts_earlier(positions)
+            return await int_w2w_client.get_shifts_earlier(positions)
 
         elif time_auto == 'tomorrow':
-            return int_w2w_client.get_shifts_tomorrow(positions)
+            return await int_w2w_client.get_shifts_tomorrow(positions)
 
         else:
             return []
@@ -144,9 +144,9 @@ class W2WCommands(discord.app_commands.Group):
         description="Sends a notification to a group of swim instructors, filtered by time and position")
     async def instructors(self, interaction: discord.Interaction, time: str, position: str, message: str):
         int_branch = self.fred.ymca.get_branch_by_guild_id(interaction.guild_id)
-        shifts = self.get_instructor_shifts_from_auto(int_branch, position, time)
-        w2w_employees = int_branch.w2w_client.unique_employees(shifts)
-        discord_users = self.fred.ymca.database.select_discord_users(int_branch, w2w_employees)
+        shifts = await self.get_instructor_shifts_from_auto(int_branch, position, time)
+        w2w_employees = int_branch.async_w2w_client.unique_employees(shifts)
+        discord_users = await self.fred.ymca.async_database.select_discord_users(int_branch, w2w_employees)
         if discord_users:
             await interaction.response.send_message(
                 f"Notification: {' '.join([user.mention for user in discord_users])}: {message}")
@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
+import asyncio
 import datetime
+import logging
+import time
 from typing import TYPE_CHECKING
 
 import pytz
@@ -11,12 +14,21 @@ from discord.ext import commands, tasks
 from fred.dashboard import SupervisorReport, ReportType
 
 if TYPE_CHECKING:
-    from typing import List
-    from fred import Fred, Branch, PoolGroup, Pool
+    from typing import List, Dict
+    from fred import Fred, Branch, PoolGroup, Pool, ChemCheck, OpeningChecklist
     from whentowork import Position
     from discord import TextChannel
 
 
+log = logging.getLogger(__name__)
+
+# Seconds one branch's ingestion and adherence check may take before update_tables gives up on it for that run.
+BRANCH_UPDATE_TIMEOUT = 600.0
+
+# Seconds one branch's schedule prefetch may take, kept under the task's one-minute interval so a stalled branch is
+# dropped before the next run starts.
+BRANCH_PREFETCH_TIMEOUT = 45.0
+
 # from itertools import cycle
 # status = cycle(['status 1', 'status 2', 'status 3'])
 
@@ -33,7 +45,8 @@ class FredTasks(commands.Cog):
         self.tasks = [
             self.update_tables,
             self.send_vats_to_sups,
-            self.check_pool_extreme_times
+            self.check_pool_extreme_times,
+            self.prefetch_schedules
         ]
         for task in self.tasks:
             task.start()
@@ -47,7 +60,9 @@ class FredTasks(commands.Cog):
             branch: Branch,
             pool_group: PoolGroup,
             pool: Pool,
-            channel: TextChannel) -> None:
+            channel: TextChannel,
+            last_chems: Dict[str, ChemCheck],
+            last_openings: Dict[str, OpeningChecklist]) -> None:
         """
         Checks that a chemical check has been completed in the last 2.5 hours
         and that an opening checklist was submitted. If one or more of those
@@ -61,20 +76,21 @@ class FredTasks(commands.Cog):
             pool (Pool): The pool group's specific pool to check.
             channel (TextChannel): The channel to send a message in. Typically,
             'fred-lg-notifs'.
+            last_chems (Dict[str, ChemCheck]): The branch's latest chemical
+            check for each pool, keyed by pool ID.
+            last_openings (Dict[str, OpeningChecklist]): The branch's latest
+            opening checklist for each checklist group.
         """
-        last_chem = self.fred.ymca.database.select_last_chem(
-            branch,
-            pool
-        )
+        last_chem = last_chems.get(pool.pool_id)
         now = datetime.datetime.now()
         positions: List[Position] = [
-            branch.w2w_client.specialist,
-            branch.w2w_client.supervisor,
+            branch.async_w2w_client.specialist,
+            branch.async_w2w_client.supervisor,
             pool_group.w2w_lifeguard_position
         ]
-        shifts = branch.w2w_client.get_shifts_now(positions)
-        w2w_employees = branch.w2w_client.unique_employees(shifts)
-        discord_users = self.fred.ymca.database.select_discord_users(
+        shifts = await branch.async_w2w_client.get_shifts_now(positions)
+        w2w_employees = branch.async_w2w_client.unique_employees(shifts)
+        discord_users = await self.fred.ymca.async_database.select_discord_users(
             branch,
             w2w_employees
         )
@@ -89,10 +105,7 @@ class FredTasks(commands.Cog):
             )
         last_opening = None
         for checklist in pool.checklists:
-            lo_candidate = self.fred.ymca.database.select_last_opening(
-                branch,
-                checklist
-            )
+            lo_candidate = last_openings.get(checklist)
             if lo_candidate:
                 if not last_opening:
                     last_opening = lo_candidate
@@ -111,22 +124,61 @@ class FredTasks(commands.Cog):
     @tasks.loop(minutes=30)
     async def update_tables(self):
         """
-        discord.py task that loops through all the branches every 30
-        minutes, and for each pool that is currently open, 
+        discord.py task that ingests every branch's Formstack feeds every 30
+        minutes, a few branches at a time, then reminds each open pool of any
+        missing chemical check or opening checklist. A branch that fails or
+        stalls is logged and skipped until the next run.
         """
-        for branch in self.fred.ymca.branches.values():
-            self.fred.ymca.database.update_rss(branch)
-            for pool_group in branch.pool_groups:
-                for pool in pool_group.pools:
-                    if pool.is_open and branch.guild:
-                        for channel in branch.guild.text_channels:
-                            if channel.name == 'fred-lg-notif':
-                                await self.check_form_adherence(
-                                    branch,
-                                    pool_group,
-                                    pool,
-                                    channel
-                                )
+        await self.fred.ymca.run_branches(self.update_branch_tables, 'update_tables', timeout=BRANCH_UPDATE_TIMEOUT)
+
+    async def update_branch_tables(self, branch: Branch, timings: Dict[str, float]):
+        phase_start = time.perf_counter()
+        await self.fred.ymca.async_database.update_rss(branch)
+        timings['ingest'] = time.perf_counter() - phase_start
+        phase_start = time.perf_counter()
+        last_chems, last_openings = await asyncio.gather(
+            self.fred.ymca.async_database.select_last_chems_by_pool(branch),
+            self.fred.ymca.async_database.select_last_openings_by_checklist(branch))
+        for pool_group in branch.pool_groups:
+            for pool in pool_group.pools:
+                if pool.is_open and branch.guild:
+                    for channel in branch.guild.text_channels:
+                        if channel.name == 'fred-lg-notif':
+                            await self.check_form_adherence(
+                                branch,
+                                pool_group,
+                                pool,
+                                channel,
+                                last_chems,
+                                last_openings
+                            )
+        timings['adherence'] = time.perf_counter() - phase_start
+
+    @tasks.loop(minutes=1)
+    async def prefetch_schedules(self):
+        """
+        discord.py task that keeps each branch's WhenToWork shifts for today
+        and the next seven days in memory, refetching near-term days more
+        often than later ones, so schedule commands rarely wait on WhenToWork.
+        A branch that fails or stalls is logged and skipped until the next run.
+        """
+        await self.fred.ymca.run_branches(self.prefetch_branch_schedules, 'prefetch_schedules',
+                                          timeout=BRANCH_PREFETCH_TIMEOUT)
+
+    async def prefetch_branch_schedules(self, branch: Branch, timings: Dict[str, float]):
+        if not branch.async_w2w_client.ready:
+            return
+        phase_start = time.perf_counter()
+        await branch.async_w2w_client.prefetch_shifts()
+        timings['prefetch'] = time.perf_counter() - phase_start
+
+    @prefetch_schedules.before_loop
+    async def before_prefetch_schedules(self):
+        """
+        Waits for FRED to be logged in before running prefetch_schedules for
+        the first time.
+        """
+        await self.fred.wait_until_ready()
 
     @update_tables.before_loop
     async def before_update_tables(self):
@@ -152,7 +204,7 @@ class FredTasks(commands.Cog):
                     for channel in branch.guild.text_channels:
                         if channel.name == 'sup-general':
                             report = SupervisorReport(ReportType.MTD, now)
-                            report.run_report(
+                            await report.run_report(
                                 branch,
                                 run_by=self.fred.user,
                                 include_vats=True
@@ -182,7 +234,7 @@ class FredTasks(commands.Cog):
         is open.
         """
         for branch in self.fred.ymca.branches.values():
-            branch.update_pool_groups()
+            await branch.update_pool_groups()
             for guild in self.fred.guilds:
                 for channel in guild.text_channels:
                     if channel.name == 'test3':
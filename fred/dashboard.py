@@ -8,6 +8,7 @@ import discord
 import matplotlib.pyplot as plt
 
 from fred import ChemCheck, VAT
+from fred.w2w import ShiftFrame
 
 if TYPE_CHECKING:
     from fred import Branch, ScanningAudit, InService
@@ -32,21 +33,30 @@ class ReportType(Enum):
 
 class ShiftReport:
     def __init__(self):
-        self.shifts: List[Shift] = []
+        self.frame: ShiftFrame = ShiftFrame()
+        self._total_hours: Optional[float] = None
+
+    @property
+    def shifts(self) -> List[Shift]:
+        return self.frame.shifts
+
+    @shifts.setter
+    def shifts(self, shifts: Union[List[Shift], ShiftFrame]):
+        self.frame = shifts if isinstance(shifts, ShiftFrame) else ShiftFrame(shifts)
+        self._total_hours = None
 
     @property
     def num_of_shifts(self) -> int:
-        return len(self.shifts)
+        return len(self.frame)
 
     @property
     def total_hours(self) -> float:
-        return sum(shift.duration for shift in self.shifts)
+        if self._total_hours is None:
+            self._total_hours = self.frame.total_hours
+        return self._total_hours
 
     def during_shifts(self, dt: datetime.datetime) -> bool:
-        for shift in self.shifts:
-            if shift.start_datetime <= dt <= shift.end_datetime:
-                return True
-        return False
+        return self.frame.during(dt)
 
 
 class ComplianceStrategy:
@@ -151,14 +161,9 @@ class ReportItem:
     def num_shifts_with_unique(self) -> int:
         if self.shift_report.num_of_shifts == 0:
             return 0
-        num_shifts = 0
-        for shift in self.shift_report.shifts:
-            # Generator that loops over all the items and increments num_shifts if any of the items happened
-            # during the current shift.
-            if any(shift.start_datetime <= item.time <= shift.end_datetime for item in self.items if
-                   isinstance(item.time, datetime.datetime)):
-                num_shifts += 1
-        return num_shifts
+        # Shifts during which at least one of the items happened.
+        return self.shift_report.frame.count_covering(
+            item.time for item in self.items if isinstance(item.time, datetime.datetime))
 
     @property
     def shift_unique_percentage(self):
@@ -321,7 +326,7 @@ class Report:
         return self.num_of_shifts_with_unique_item(
             item_name) / self.total_num_of_shifts if self.total_num_of_shifts else 'N/A'
 
-    def run_report(self, branch: Branch, run_by: discord.User, **kwargs) -> None:
+    async def run_report(self, branch: Branch, run_by: discord.User, **kwargs) -> None:
         self.footer = f'Run by {run_by.display_name} at {self.footer}'
         if branch.guild:
             discord_users = branch.guild.members
@@ -339,20 +344,21 @@ class Report:
                                   }[self.position_type](discord_user.id, discord_user.display_name, self.report_type,
                                                         **kwargs))
 
+        w2w_client = branch.async_w2w_client
         positions = {
-            PositionType.LIFEGUARD: branch.w2w_client.lifeguard_positions,
-            PositionType.SUPERVISOR: [branch.w2w_client.supervisor],
-            PositionType.INSTRUCTOR: [branch.w2w_client.swim_instructor]
+            PositionType.LIFEGUARD: w2w_client.lifeguard_positions,
+            PositionType.SUPERVISOR: [w2w_client.supervisor],
+            PositionType.INSTRUCTOR: [w2w_client.swim_instructor]
         }[self.position_type]
-        shift_dict_by_emp = branch.w2w_client.shifts_sorted_by_employee(
-            self.start_dt, self.end_dt, positions)
-        for w2w_employee, shift_list in shift_dict_by_emp.items():
-            discord_user = branch.ymca.database.select_discord_user(
-                branch, branch.get_w2w_employee_by_id(w2w_employee.id)) if branch.guild else None
-            if discord_user:
-                for emp in self.users:
-                    if emp.discord_id == discord_user.id:
-                        emp.shift_report.shifts = shift_list
+        frames_by_emp = ShiftFrame(await w2w_client.query_shifts(
+            self.start_dt.date(), self.end_dt.date(), self.start_dt, self.end_dt, positions)).group_by_employee()
+        frames_by_emp.pop(None, None)
+        discord_users = await branch.ymca.async_database.resolve_many(branch, frames_by_emp) if branch.guild else {}
+        users_by_discord_id = {emp.discord_id: emp for emp in self.users}
+        for w2w_employee, frame in frames_by_emp.items():
+            discord_user = discord_users.get(w2w_employee.id)
+            if discord_user and discord_user.id in users_by_discord_id:
+                users_by_discord_id[discord_user.id].shift_report.shifts = frame
 
     async def send_report(self, channel: Optional[discord.TextChannel] = None,
                           interaction: Optional[discord.Interaction] = None, mobile: bool = True) -> None:
@@ -502,9 +508,10 @@ class SupervisorReport(Report):
         super().__init__(users=self.supervisors, position_type=PositionType.SUPERVISOR, report_type=report_type,
                          report_dt=report_dt, **kwargs)
 
-    def run_report(self, branch: Branch, run_by: discord.User, include_vats: bool = False, include_chems: bool = False,
-                   include_scan_auds: bool = False, include_in_servs: bool = False) -> None:
-        super().run_report(
+    async def run_report(self, branch: Branch, run_by: discord.User, include_vats: bool = False,
+                         include_chems: bool = False, include_scan_auds: bool = False,
+                         include_in_servs: bool = False) -> None:
+        await super().run_report(
             branch,
             run_by,
             include_vats=include_vats,
@@ -512,9 +519,9 @@ class SupervisorReport(Report):
             include_scan_auds=include_scan_auds,
             include_in_servs=include_in_servs)
         if include_vats:
-            self.vat_report(branch)
+            await self.vat_report(branch)
         if include_chems:
-            self.chem_report(branch)
+            await self.chem_report(branch)
         if include_scan_auds:
             pass
             # TODO
@@ -523,9 +530,9 @@ class SupervisorReport(Report):
             # TODO
         self.sort_users()
 
-    def vat_report(self, branch: Branch) -> None:
-        database = branch.ymca.database
-        vats = database.select_vats(branch, self.start_dt, self.end_dt)
+    async def vat_report(self, branch: Branch) -> None:
+        database = branch.ymca.async_database
+        vats = await database.select_vats(branch, self.start_dt, self.end_dt)
 
         # Adding VATs to each sup
         for vat in vats:
@@ -533,9 +540,9 @@ class SupervisorReport(Report):
                 if vat.sup_discord_id == sup.discord_id:
                     sup.vats.items.append(vat)
 
-    def chem_report(self, branch: Branch) -> None:
-        database = branch.ymca.database
-        chems = database.select_chems(branch, self.start_dt, self.end_dt)
+    async def chem_report(self, branch: Branch) -> None:
+        database = branch.ymca.async_database
+        chems = await database.select_chems(branch, self.start_dt, self.end_dt)
 
         # Adding chems to each sup
         for chem in chems:
@@ -550,17 +557,17 @@ class GuardReport(Report):
         super().__init__(users=self.guards, position_type=PositionType.LIFEGUARD, report_type=report_type,
                          report_dt=report_dt, **kwargs)
 
-    def run_report(self, branch: Branch, run_by: discord.User, include_vats: bool = False,
-                   include_scan_auds: bool = False,
-                   include_in_servs: bool = False) -> None:
-        super().run_report(
+    async def run_report(self, branch: Branch, run_by: discord.User, include_vats: bool = False,
+                         include_scan_auds: bool = False,
+                         include_in_servs: bool = False) -> None:
+        await super().run_report(
             branch,
             run_by,
             include_vats=include_vats,
             include_scan_auds=include_scan_auds,
             include_in_servs=include_in_servs)
         if include_vats:
-            self.vat_report(branch)
+            await self.vat_report(branch)
         if include_scan_auds:
             pass
             # TODO
@@ -569,9 +576,9 @@ class GuardReport(Report):
             # TODO
         self.sort_users()
 
-    def vat_report(self, branch: Branch) -> None:
-        database = branch.ymca.database
-        vats = database.select_vats(branch, self.start_dt, self.end_dt)
+    async def vat_report(self, branch: Branch) -> None:
+        database = branch.ymca.async_database
+        vats = await database.select_vats(branch, self.start_dt, self.end_dt)
 
         # Adding VATs to each sup
         for vat in vats:
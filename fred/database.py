@@ -1,20 +1,31 @@
 from __future__ import annotations
 
-import csv
+import asyncio
+import contextlib
 import datetime
+import functools
 import logging
+import os
+import queue
+import re
 import sqlite3
-from typing import TYPE_CHECKING, List, Union
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Union
 
 import discord
 
 import fred.database_helper as dbh
 import fred.rss as rss
+from .backfill import CSVBackfill
 from .chem import ChemCheck
 from .oc import OpeningChecklist, ClosingChecklist
 from .vat import VAT
 
 if TYPE_CHECKING:
+    from typing import Any, Callable, Iterable, Iterator, Tuple
     from .ymca import YMCA
     from .branch import Branch
     from .pool_group import PoolGroup
@@ -23,36 +34,267 @@ if TYPE_CHECKING:
 
 log = logging.getLogger()
 
+# Timestamps are stored as integer epoch seconds in columns declared 'EPOCH'. Datetimes are bound as that integer
+# explicitly (dbh.to_epoch / dbh.to_epoch_row), and reading an 'EPOCH' column hands back a datetime without any string
+# parsing. Converters are process-wide in sqlite3, but this one only applies to connections opened with
+# PARSE_DECLTYPES that read a column declared 'EPOCH', which only this schema uses.
+sqlite3.register_converter('EPOCH', lambda value: dbh.from_epoch(int(value)))
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), 'migrations')
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+# Maps each ingestion feed to the Branch attribute holding its in-memory high-water mark.
+INGESTION_FEEDS = {
+    'chems': 'last_chem_id',
+    'vats': 'last_vat_id',
+    'opening': 'last_opening_id',
+    'closing': 'last_closing_id',
+    'in_service': 'last_in_service_id'
+}
+
+# Formstack question that tells the entries of the shared opening/closing checklist feed apart.
+CHECKLIST_TYPE_KEY = 'What checklist do you need to submit?'
+
+# Maps each ingestion feed read from RSS to the rss_links key of its feed, the checklist type its entries must have
+# (None for every entry) and the class decoding them. Feeds sharing a link are fetched and parsed once per cycle.
+RSS_FEEDS = {
+    'chems': ('chems', None, ChemCheck),
+    'vats': ('vats', None, VAT),
+    'opening': ('oc', 'Opening Checklist', OpeningChecklist),
+    'closing': ('oc', 'Closing Checklist', ClosingChecklist)
+}
+
+SELECT_LAST_CHEM = """
+    SELECT * FROM chem_checks
+    WHERE branch_id = ? AND pool_id = ?
+    ORDER BY sample_time DESC
+    LIMIT 1;
+"""
+
+SELECT_LAST_OPENING = """
+    SELECT * FROM opening_checklists
+    WHERE branch_id = ? AND checklist_group = ?
+    ORDER BY submit_time DESC
+    LIMIT 1;
+"""
+
+SELECT_LAST_VAT = """
+    SELECT * FROM vats
+    WHERE branch_id = ?
+    ORDER BY vat_time DESC
+    LIMIT 1;
+"""
+
+SELECT_LAST_CHEMS_BY_POOL = """
+    SELECT * FROM (
+        SELECT *, ROW_NUMBER() OVER (PARTITION BY pool_id ORDER BY sample_time DESC) AS recency
+        FROM chem_checks
+        WHERE branch_id = ?
+    )
+    WHERE recency = 1;
+"""
+
+SELECT_LAST_OPENINGS_BY_CHECKLIST = """
+    SELECT * FROM (
+        SELECT *, ROW_NUMBER() OVER (PARTITION BY checklist_group ORDER BY submit_time DESC) AS recency
+        FROM opening_checklists
+        WHERE branch_id = ?
+    )
+    WHERE recency = 1;
+"""
+
+SELECT_VATS = """
+    SELECT * FROM vats
+    WHERE branch_id = ? AND vat_time >= ? AND vat_time <= ?;
+"""
+
+SELECT_CHEMS = """
+    SELECT * FROM chem_checks
+    WHERE branch_id = ? AND sample_time >= ? AND sample_time <= ?;
+"""
+
+ROSTER_PROCESS_POOL_WORKERS = 4
+
 
 class YMCADatabase(object):
-    def __init__(self, ymca: YMCA):
+    def __init__(self, ymca: YMCA, path: str = 'ymca_aquatics.db', read_pool_size: int = 4):
         self.ymca: YMCA = ymca
+        self.path: str = path
+        self.read_pool_size: int = read_pool_size
+        # Every write goes through this one connection, serialized by write_lock. Reads use the pool below so that
+        # they run in parallel with each other and, under WAL, with an in-progress write.
         self.connection: sqlite3.Connection = None
+        self.write_lock: threading.RLock = threading.RLock()
+        self._read_pool: queue.Queue = queue.Queue()
+        self._read_pool_lock: threading.Lock = threading.Lock()
+        self._read_connections: List[sqlite3.Connection] = []
+        # Every stored W2W employee's matched Discord id (None if unmatched), so resolving shifts to members needs no
+        # queries. Loaded by init_database and updated by insert_w2w_employee.
+        self.w2w_discord_ids: Dict[int, Optional[int]] = {}
+        # Rosters with fewer employees to match than this are matched in-process, where the pool isn't worth starting.
+        self.roster_process_pool_threshold: int = 500
         try:
-            self.connection = sqlite3.connect("ymca_aquatics.db")
+            self.connection = sqlite3.connect(path, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+            self._apply_pragmas(self.connection, writer=True)
         except Exception as e:
-            log.log(logging.WARN, f"Error: Connection to database 'ymca_aquatics.db' not established. {e}")
+            log.log(logging.WARN, f"Error: Connection to database '{path}' not established. {e}")
         else:
-            log.log(logging.INFO, "Connection to database 'ymca_aquatics.db' established.")
+            log.log(logging.INFO, f"Connection to database '{path}' established.")
 
-    def init_database(self):
-        self.init_tables()
+    @property
+    def in_memory(self) -> bool:
+        return self.path == ':memory:'
 
-    def init_tables(self):
-        cursor = self.connection.cursor()
-        with open('fred/migrations/01_INIT.sql') as file:
-            init_sql = file.read()
+    @staticmethod
+    def _apply_pragmas(connection: sqlite3.Connection, writer: bool = False) -> None:
+        if writer:
+            connection.execute("PRAGMA journal_mode = WAL;")
+            connection.execute("PRAGMA synchronous = NORMAL;")
+        else:
+            connection.execute("PRAGMA query_only = ON;")
+        connection.execute("PRAGMA busy_timeout = 5000;")
+        connection.execute("PRAGMA temp_store = MEMORY;")
+        connection.execute("PRAGMA cache_size = -16000;")
+
+    def _open_read_connection(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True, check_same_thread=False,
+                                     detect_types=sqlite3.PARSE_DECLTYPES)
+        self._apply_pragmas(connection)
+        return connection
+
+    @contextlib.contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrows a read-only connection from the pool, opening a new one if
+        fewer than read_pool_size exist and otherwise waiting for one to be
+        returned. In-memory databases cannot be shared between connections,
+        so they read through the writer connection instead.
+        """
+        if self.in_memory:
+            with self.write_lock:
+                yield self.connection
+            return
         try:
-            cursor.executescript(init_sql)
-        except Exception as e:
-            log.log(logging.WARN, f"Error: Could not initialize database. {e}")
+            connection = self._read_pool.get_nowait()
+        except queue.Empty:
+            with self._read_pool_lock:
+                if len(self._read_connections) < self.read_pool_size:
+                    connection = self._open_read_connection()
+                    self._read_connections.append(connection)
+                else:
+                    connection = None
+            if connection is None:
+                connection = self._read_pool.get()
+        try:
+            yield connection
+        finally:
+            self._read_pool.put(connection)
+
+    def close(self) -> None:
+        with self._read_pool_lock:
+            for connection in self._read_connections:
+                connection.close()
+            self._read_connections.clear()
+        with self.write_lock:
+            self.connection.close()
+
+    def init_database(self):
+        self.migrate()
+        self.init_w2w_discord_ids()
+
+    def init_w2w_discord_ids(self) -> None:
+        with self.reader() as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT id, discord_id FROM w2w_users;")
+            self.w2w_discord_ids = dict(cursor.fetchall())
+        log.log(logging.INFO, f"{len(self.w2w_discord_ids)} W2W employees loaded")
+
+    @staticmethod
+    def available_migrations() -> List[Tuple[int, str]]:
+        migrations = []
+        for file_name in os.listdir(MIGRATIONS_DIR):
+            match = MIGRATION_FILE_PATTERN.match(file_name)
+            if match:
+                migrations.append((int(match.group(1)), file_name))
+        return sorted(migrations)
+
+    def applied_migrations(self) -> set:
+        with self.write_lock:
+            cursor = self.connection.cursor()
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version(
+                    version INT PRIMARY KEY NOT NULL,
+                    name TEXT NOT NULL,
+                    applied_time TEXT NOT NULL
+                );
+            """)
+            cursor.execute("SELECT version FROM schema_version;")
+            return {row[0] for row in cursor.fetchall()}
+
+    def migrate(self) -> List[int]:
+        """
+        Applies every numbered migration in fred/migrations that is not yet
+        recorded in 'schema_version', in order, each in its own transaction.
+        Stops at the first failure so later migrations never run against a
+        partially migrated schema, and re-raises it so the caller does not go
+        on to use that schema.
+
+        Returns:
+            List[int]: The versions applied by this call.
+
+        Raises:
+            Exception: Whatever the failing migration raised, after its
+                transaction is rolled back.
+        """
+        with self.write_lock:
+            applied = self.applied_migrations()
+            pending = [(version, file_name) for version, file_name in self.available_migrations()
+                       if version not in applied]
+            if not pending:
+                log.log(logging.INFO, f"Database schema is current (version {max(applied, default=0)}).")
+                return []
+
+            # Lets migration SQL convert timestamps stored in any legacy format, see 04_EPOCH_TIMESTAMPS.sql.
+            self.connection.create_function('legacy_to_epoch', 1, dbh.legacy_to_epoch, deterministic=True)
+            cursor = self.connection.cursor()
+            applied_now = []
+            for version, file_name in pending:
+                with open(os.path.join(MIGRATIONS_DIR, file_name)) as file:
+                    migration_sql = file.read()
+                try:
+                    cursor.executescript(f"BEGIN;\n{migration_sql}")
+                    cursor.execute("INSERT INTO schema_version VALUES(?, ?, ?);",
+                                   (version, file_name, datetime.datetime.now().isoformat(sep=' ')))
+                    self.connection.commit()
+                except Exception as e:
+                    self.connection.rollback()
+                    log.log(logging.ERROR, f"Error: Could not apply migration {file_name}. {e}")
+                    raise
+                else:
+                    log.log(logging.INFO, f"Migration {file_name} applied.")
+                    applied_now.append(version)
+            return applied_now
 
     def init_database_from_branch(self, branch: Branch):
-        self.init_branches(branch)
-        self.init_discord_users(branch)
-        self.init_w2w_users(branch)
-        # self.load_chems(branch)
-        # self.load_vats(branch)
+        with self.write_lock:
+            self.init_branches(branch)
+            self.init_ingestion_state(branch)
+            self.init_discord_users(branch)
+            self.init_w2w_users(branch)
+            # self.load_chems(branch)
+            # self.load_vats(branch)
+
+    def init_ingestion_state(self, branch: Branch) -> None:
+        with self.reader() as connection:
+            cursor = connection.cursor()
+            cursor.execute("""
+                SELECT feed, high_water_mark FROM ingestion_state
+                WHERE branch_id = ?;
+            """, (branch.branch_id,))
+            high_water_marks = dict(cursor.fetchall())
+        for feed, attribute in INGESTION_FEEDS.items():
+            setattr(branch, attribute, max(getattr(branch, attribute), high_water_marks.get(feed, 0)))
+        log.log(logging.INFO, f"Ingestion state for branch {branch.name} loaded: {high_water_marks}")
 
     def init_branches(self, branch: Branch):
         cursor = self.connection.cursor()
@@ -112,308 +354,523 @@ class YMCADatabase(object):
                 log.log(logging.INFO, f"Pool {pool.name} (ID: {pool.pool_id}) inserted into table 'pools'")
 
     def init_discord_users(self, branch: Branch) -> None:
-        for user in branch.guild.members:
-            self.insert_discord_user(branch, user)
+        """
+        Brings discord_users in line with the branch's guild, writing only
+        members who are new or whose names changed and detaching members who
+        have left. Member events keep the table current after this.
+        """
+        members = branch.guild.members if branch.guild else []
+        with self.reader() as connection:
+            cursor = connection.cursor()
+            cursor.execute("SELECT id, username, nickname, branch_id FROM discord_users;")
+            stored = {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+        changed = [member for member in members
+                   if stored.get(member.id) != (member.name, member.display_name, branch.branch_id)]
+        member_ids = {member.id for member in members}
+        departed = [discord_id for discord_id, (_, _, branch_id) in stored.items()
+                    if branch_id == branch.branch_id and discord_id not in member_ids]
+        self.upsert_discord_users(branch, changed)
+        self.remove_discord_users(branch, departed)
+        log.log(logging.INFO, f"Discord users for branch {branch.name} synced: {len(changed)} written, "
+                              f"{len(departed)} departed, {len(members) - len(changed)} unchanged")
 
     def init_w2w_users(self, branch: Branch) -> None:
-        for employee in branch.w2w_client.employees:
-            self.insert_w2w_employee(branch, employee)
+        """
+        Matches the branch's W2W roster to Discord members. Employees whose
+        stored match is still a member of the guild are skipped; the rest are
+        matched (across a process pool for large rosters) and written in one
+        transaction.
+        """
+        start = time.perf_counter()
+        employees = branch.async_w2w_client.employees
+        unmatched = [employee for employee in employees if not self._has_valid_match(branch, employee)]
+        self.upsert_w2w_employees(branch, unmatched, self._match_employees(branch, unmatched))
+        log.log(logging.INFO, f"W2W roster for branch {branch.name} synced in {time.perf_counter() - start:.2f}s: "
+                              f"{len(unmatched)} matched, {len(employees) - len(unmatched)} already matched")
+
+    def _has_valid_match(self, branch: Branch, employee: whentowork.Employee) -> bool:
+        discord_id = self.w2w_discord_ids.get(employee.id)
+        return bool(discord_id and branch.guild and branch.guild.get_member(discord_id))
+
+    def _match_employees(self, branch: Branch, employees: List[whentowork.Employee]) -> List[Optional[int]]:
+        names = [(employee.first_name, employee.last_name) for employee in employees]
+        if len(names) < self.roster_process_pool_threshold or not branch.name_index:
+            return [dbh.match_discord_id(branch, name, last_name) for name, last_name in names]
+        workers = min(os.cpu_count() or 1, ROSTER_PROCESS_POOL_WORKERS)
+        chunk_size = -(-len(names) // workers)
+        chunks = [names[i:i + chunk_size] for i in range(0, len(names), chunk_size)]
+        # Spawned rather than forked, since the bot process is running other threads. The index is pickled once per
+        # worker by the initializer, and each task carries only its chunk of names.
+        with ProcessPoolExecutor(len(chunks), mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=dbh.init_match_worker, initargs=(branch.name_index,)) as executor:
+            return [discord_id for chunk in executor.map(dbh.match_names_in_worker, chunks) for discord_id in chunk]
+
+    def upsert_w2w_employees(self, branch: Branch, employees: List[whentowork.Employee],
+                             discord_ids: List[Optional[int]]) -> None:
+        if not employees:
+            return
+        # discord_id is unique, so a member already claimed by another employee is left unmatched.
+        rematched = {employee.id for employee in employees}
+        claimed = {discord_id: w2w_id for w2w_id, discord_id in self.w2w_discord_ids.items()
+                   if discord_id and w2w_id not in rematched}
+        rows = []
+        for employee, discord_id in zip(employees, discord_ids):
+            if discord_id and claimed.setdefault(discord_id, employee.id) != employee.id:
+                discord_id = None
+            rows.append((employee.id, discord_id, employee.first_name, employee.last_name, branch.branch_id,
+                         employee.emails[0] if employee.emails else '', employee.custom_field_2))
+        with self.write_lock:
+            try:
+                with self.connection:
+                    self.connection.executemany("""
+                        INSERT INTO w2w_users VALUES(?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(id) DO UPDATE SET
+                            discord_id = excluded.discord_id,
+                            first_name = excluded.first_name,
+                            last_name = excluded.last_name,
+                            branch_id = excluded.branch_id,
+                            email = excluded.email,
+                            cert_expiration_date = excluded.cert_expiration_date;
+                    """, rows)
+            except Exception as e:
+                log.log(logging.ERROR, f"Issue writing {len(rows)} W2W Employee(s) to table 'w2w_users'. Error: {e}")
+                return
+            for row in rows:
+                self.w2w_discord_ids[row[0]] = row[1]
 
     def insert_discord_user(self, branch: Branch, user: discord.Member):
-        cursor = self.connection.cursor()
-        try:
-            cursor.executescript(f"""
-                BEGIN;
-                INSERT INTO discord_users
-                VALUES(
-                    {user.id},
-                    '{user.name}',
-                    '{user.display_name}',
-                    '{branch.branch_id}'
-                );
-                COMMIT;
-            """)
-        except sqlite3.IntegrityError:
-            log.log(logging.WARN, f"Discord User {user.display_name} (ID: {user.id}) already in table 'discord_users'")
-        else:
-            log.log(logging.DEBUG,
-                    f"Discord User {user.display_name} (ID: {user.id}) inserted into table 'discord_users'")
+        self.upsert_discord_users(branch, [user])
+
+    def upsert_discord_users(self, branch: Branch, members: List[discord.Member]) -> None:
+        if not members:
+            return
+        with self.write_lock:
+            try:
+                with self.connection:
+                    self.connection.executemany("""
+                        INSERT INTO discord_users VALUES(?, ?, ?, ?)
+                        ON CONFLICT(id) DO UPDATE SET
+                            username = excluded.username,
+                            nickname = excluded.nickname,
+                            branch_id = excluded.branch_id;
+                    """, [(member.id, member.name, member.display_name, branch.branch_id) for member in members])
+            except Exception as e:
+                log.log(logging.ERROR, f"Issue writing {len(members)} Discord User(s) to table 'discord_users'. "
+                                       f"Error: {e}")
+            else:
+                log.log(logging.DEBUG, f"Discord Users (IDs: {[member.id for member in members]}) written to table "
+                                       f"'discord_users'")
+
+    def remove_discord_users(self, branch: Branch, discord_ids: List[int]) -> None:
+        """
+        Detaches members who left the branch's guild. Their rows are kept,
+        since past submissions reference them.
+        """
+        if not discord_ids:
+            return
+        with self.write_lock:
+            try:
+                with self.connection:
+                    self.connection.executemany("""
+                        UPDATE discord_users SET branch_id = NULL
+                        WHERE id = ? AND branch_id = ?;
+                    """, [(discord_id, branch.branch_id) for discord_id in discord_ids])
+            except Exception as e:
+                log.log(logging.ERROR, f"Issue detaching {len(discord_ids)} Discord User(s) from branch "
+                                       f"{branch.branch_id}. Error: {e}")
 
     def insert_w2w_employee(self, branch: Branch, employee: whentowork.Employee):
-        cursor = self.connection.cursor()
         discord_id = dbh.match_discord_id(branch, employee.first_name, employee.last_name)
-        discord_id = discord_id if discord_id else 'NULL'
         email = employee.emails[0] if employee.emails else ''
-        try:
-            cursor.executescript(f"""
-                BEGIN;
-                INSERT INTO w2w_users
-                VALUES(
-                    {employee.id},
-                    {discord_id},
-                    '{employee.first_name}',
-                    '{employee.last_name}',
-                    '{branch.branch_id}',
-                    '{email}',
-                    '{employee.custom_field_2}'
-                );
-                COMMIT;
-            """)
-        except sqlite3.IntegrityError:
-            log.log(logging.WARN,
-                    f"W2W Employee {employee.first_name} {employee.last_name} "
-                    f"(ID: {employee.id}) already in table 'w2w_users'")
-        else:
-            log.log(logging.INFO,
-                    f"W2W Employee {employee.first_name} {employee.last_name} "
-                    f"(ID: {employee.id}) inserted into table 'w2w_users'")
+        with self.write_lock:
+            cursor = self.connection.cursor()
+            try:
+                with self.connection:
+                    cursor.execute("""
+                        INSERT INTO w2w_users VALUES(?, ?, ?, ?, ?, ?, ?);
+                    """, (employee.id, discord_id, employee.first_name, employee.last_name, branch.branch_id, email,
+                          employee.custom_field_2))
+            except sqlite3.IntegrityError:
+                log.log(logging.WARN,
+                        f"W2W Employee {employee.first_name} {employee.last_name} "
+                        f"(ID: {employee.id}) already in table 'w2w_users'")
+                # Either the employee is already stored, or their match is already claimed by another employee.
+                cursor.execute("SELECT discord_id FROM w2w_users WHERE id = ?;", (employee.id,))
+                stored = cursor.fetchone()
+                discord_id = stored[0] if stored else None
+            else:
+                log.log(logging.INFO,
+                        f"W2W Employee {employee.first_name} {employee.last_name} "
+                        f"(ID: {employee.id}) inserted into table 'w2w_users'")
+            self.w2w_discord_ids[employee.id] = discord_id
 
     def insert_chem(self, branch: Branch, chem: ChemCheck) -> bool:
-        cursor = self.connection.cursor()
-        chem_di = chem.discord_id if chem.discord_id else 'NULL'
-        try:
-            cursor.executescript(f"""
-                BEGIN;
-                INSERT INTO chem_checks
-                VALUES(
-                    {chem.chem_uuid}, {chem_di}, '{chem.name}', '{branch.branch_id}',
-                    '{chem.pool_id}', '{chem.sample_location}', '{chem.time}',
-                    '{chem.submit_time}', {chem.chlorine}, {chem.ph}, {chem.water_temp},
-                    {chem.num_of_swimmers}
-                );
-                COMMIT;
-            """)
-        except sqlite3.IntegrityError:
-            log.log(logging.WARN, f"Chem Check (ID: {chem.chem_uuid}) already in table 'chem_checks'")
-        except Exception as e:
-            log.log(logging.ERROR, f"Issue inserting Chem Check (ID: {chem.chem_uuid}). Error: {e}")
-        else:
-            log.log(logging.INFO, f"Chem Check (ID: {chem.chem_uuid}) inserted into table 'chem_checks'")
-            return True
-        return False
+        return bool(self.insert_chems(branch, [chem]))
 
     def insert_vat(self, branch: Branch, vat: VAT) -> bool:
-        cursor = self.connection.cursor()
-        vat_gdi = vat.guard_discord_id if vat.guard_discord_id else 'NULL'
-        vat_sdi = vat.sup_discord_id if vat.sup_discord_id else 'NULL'
-        try:
-            cursor.executescript(f"""
-                BEGIN;
-                INSERT INTO vats
-                VALUES(
-                    {vat.vat_uuid}, {vat_gdi}, '{vat.guard_name}', {vat_sdi}, '{vat.sup_name}', '{branch.branch_id}',
-                    '{vat.pool_id}', '{vat.time}', '{vat.submit_time}', {vat.num_of_swimmers}, {vat.num_of_guards},
-                    '{vat.stimuli}', {vat.depth}, {vat.response_time}
-                );
-                COMMIT;
-            """)
-        except sqlite3.IntegrityError:
-            log.log(logging.WARN, f"VAT (ID: {vat.vat_uuid}) already in table 'vats'")
-        except Exception as e:
-            log.log(logging.ERROR, f"Issue inserting VAT (ID: {vat.vat_uuid}). Error: {e}")
-        else:
-            log.log(logging.INFO, f"VAT (ID: {vat.vat_uuid}) inserted into table 'vats'")
-            return True
-        return False
+        return bool(self.insert_vats(branch, [vat]))
 
     def insert_opening_checklist(self, branch: Branch, o: OpeningChecklist) -> bool:
-        cursor = self.connection.cursor()
-        oc_di = o.discord_id if o.discord_id else 'NULL'
-        try:
-            cursor.executescript(f"""
-                BEGIN;
-                INSERT INTO opening_checklists
-                VALUES(
-                    {o.oc_uuid}, {oc_di}, '{o.name}', '{branch.branch_id}', '{o.checklist_group}',
-                    '{o.time}', '{o.submit_time}', '{o.regulatory_info}', '{o.aed_info}',
-                    '{o.adult_pads_expiration_date}', '{o.pediatric_pads_expiration_date}',
-                    '{o.aspirin_expiration_date}', '{o.sup_oxygen_info}', '{o.sup_oxygen_psi}', '{o.first_aid_info}',
-                    {o.chlorine}, {o.ph}, {o.water_temp}, '{o.lights_function}', '{o.handicap_chair_function}',
-                    '{o.spare_battery_present}', '{o.vacuum_present}'
-                );
-                COMMIT;
-            """)
-        except sqlite3.IntegrityError:
-            log.log(logging.WARN, f"Opening Checklist (ID: {o.oc_uuid}) already in table 'opening_checklists'")
-        except Exception as e:
-            log.log(logging.ERROR, f"Issue inserting Opening Checklist (ID: {o.oc_uuid}). Error: {e}")
-        else:
-            log.log(logging.INFO, f"Opening Checklist (ID: {o.oc_uuid}) inserted into table 'opening_checklists'")
-            return True
-        return False
+        return bool(self.insert_opening_checklists(branch, [o]))
 
     def insert_closing_checklist(self, branch: Branch, c: ClosingChecklist) -> bool:
-        cursor = self.connection.cursor()
-        oc_di = c.discord_id if c.discord_id else 'NULL'
-        try:
-            cursor.executescript(f"""
-                BEGIN;
-                INSERT INTO closing_checklists
-                VALUES(
-                    {c.oc_uuid}, {oc_di}, '{c.name}', '{branch.branch_id}', '{c.checklist_group}',
-                    '{c.time}', '{c.submit_time}', '{c.regulatory_info}', {c.chlorine}, {c.ph},
-                    {c.water_temp}, '{c.lights_function}', '{c.vacuum_function}'
-                );
-                COMMIT;
-            """)
-        except sqlite3.IntegrityError:
-            log.log(logging.WARN, f"Closing Checklist (ID: {c.oc_uuid}) already in table 'closing_checklists'")
-        except Exception as e:
-            log.log(logging.ERROR, f"Issue inserting Closing Checklist (ID: {c.oc_uuid}). Error: {e}")
-        else:
-            log.log(logging.INFO, f"Closing Checklist (ID: {c.oc_uuid}) inserted into table 'closing_checklists'")
-            return True
-        return False
+        return bool(self.insert_closing_checklists(branch, [c]))
+
+    def insert_chems(self, branch: Branch, chems: List[ChemCheck], feed: Optional[str] = None,
+                     high_water_mark: Optional[int] = None) -> List[int]:
+        rows = [(chem.chem_uuid, chem.discord_id, chem.name, branch.branch_id, chem.pool_id, chem.sample_location,
+                 chem.time, chem.submit_time, chem.chlorine, chem.ph, chem.water_temp, chem.num_of_swimmers)
+                for chem in chems]
+        return self._insert_many('chem_checks', 'chem_uuid', 'Chem Check', rows, branch, feed, high_water_mark)
+
+    def insert_vats(self, branch: Branch, vats: List[VAT], feed: Optional[str] = None,
+                    high_water_mark: Optional[int] = None) -> List[int]:
+        rows = [(vat.vat_uuid, vat.guard_discord_id, vat.guard_name, vat.sup_discord_id, vat.sup_name,
+                 branch.branch_id, vat.pool_id, vat.time, vat.submit_time, vat.num_of_swimmers, vat.num_of_guards,
+                 vat.stimuli, vat.depth, vat.response_time)
+                for vat in vats]
+        return self._insert_many('vats', 'vat_uuid', 'VAT', rows, branch, feed, high_water_mark)
+
+    def insert_opening_checklists(self, branch: Branch, openings: List[OpeningChecklist],
+                                  feed: Optional[str] = None, high_water_mark: Optional[int] = None) -> List[int]:
+        rows = [(o.oc_uuid, o.discord_id, o.name, branch.branch_id, o.checklist_group, o.time, o.submit_time,
+                 o.regulatory_info, o.aed_info, o.adult_pads_expiration_date, o.pediatric_pads_expiration_date,
+                 o.aspirin_expiration_date, o.sup_oxygen_info, o.sup_oxygen_psi, o.first_aid_info, o.chlorine, o.ph,
+                 o.water_temp, o.lights_function, o.handicap_chair_function, o.spare_battery_present,
+                 o.vacuum_present)
+                for o in openings]
+        return self._insert_many('opening_checklists', 'oc_uuid', 'Opening Checklist', rows, branch, feed,
+                                 high_water_mark)
+
+    def insert_closing_checklists(self, branch: Branch, closings: List[ClosingChecklist],
+                                  feed: Optional[str] = None, high_water_mark: Optional[int] = None) -> List[int]:
+        rows = [(c.oc_uuid, c.discord_id, c.name, branch.branch_id, c.checklist_group, c.time, c.submit_time,
+                 c.regulatory_info, c.chlorine, c.ph, c.water_temp, c.lights_function, c.vacuum_function)
+                for c in closings]
+        return self._insert_many('closing_checklists', 'oc_uuid', 'Closing Checklist', rows, branch, feed,
+                                 high_water_mark)
+
+    def _insert_many(self, table: str, uuid_column: str, item_name: str, rows: List[tuple],
+                     branch: Optional[Branch] = None, feed: Optional[str] = None,
+                     high_water_mark: Optional[int] = None) -> List[int]:
+        """
+        Writes every row with one prepared statement inside a single
+        transaction. Rows whose UUID (or other unique key) already exists are
+        skipped rather than aborting the batch. If a feed is given, the
+        branch's high-water mark for that feed is advanced to the largest
+        UUID in the batch, or to high_water_mark when one is supplied (e.g. a
+        CSV row offset), as part of the same transaction.
+
+        Returns:
+            List[int]: The UUIDs that were new to the table, in input order.
+        """
+        if not rows:
+            return []
+        uuids = [row[0] for row in rows]
+        if high_water_mark is None:
+            high_water_mark = max(uuids)
+        placeholders = ', '.join('?' * len(rows[0]))
+        with self.write_lock:
+            cursor = self.connection.cursor()
+            try:
+                with self.connection:
+                    cursor.execute("BEGIN;")
+                    existing = self._select_existing_uuids(cursor, table, uuid_column, uuids)
+                    cursor.executemany(f"INSERT OR IGNORE INTO {table} VALUES({placeholders});",
+                                       [dbh.to_epoch_row(row) for row in rows if row[0] not in existing])
+                    inserted = self._select_existing_uuids(cursor, table, uuid_column, uuids) - existing
+                    if feed:
+                        self._advance_ingestion_state(cursor, branch.branch_id, feed, high_water_mark)
+            except Exception as e:
+                log.log(logging.ERROR, f"Issue inserting {len(rows)} {item_name}(s) into table '{table}'. Error: {e}")
+                return []
+            new_uuids = list(dict.fromkeys(uuid for uuid in uuids if uuid in inserted))
+            if feed in INGESTION_FEEDS:
+                attribute = INGESTION_FEEDS[feed]
+                setattr(branch, attribute, max(getattr(branch, attribute), high_water_mark))
+            if new_uuids:
+                log.log(logging.INFO, f"{item_name}s (IDs: {new_uuids}) inserted into table '{table}'")
+            if len(new_uuids) < len(rows):
+                log.log(logging.WARN, f"{len(rows) - len(new_uuids)} {item_name}(s) already in table '{table}'")
+            return new_uuids
+
+    @staticmethod
+    def _advance_ingestion_state(cursor: sqlite3.Cursor, branch_id: str, feed: str, high_water_mark: int) -> None:
+        cursor.execute("""
+            INSERT INTO ingestion_state VALUES(?, ?, ?, ?)
+            ON CONFLICT(branch_id, feed) DO UPDATE SET
+                high_water_mark = MAX(high_water_mark, excluded.high_water_mark),
+                updated_time = excluded.updated_time;
+        """, (branch_id, feed, high_water_mark, datetime.datetime.now()))
+
+    @staticmethod
+    def _select_existing_uuids(cursor: sqlite3.Cursor, table: str, uuid_column: str, uuids: List[int],
+                               chunk_size: int = 500) -> set:
+        existing = set()
+        for i in range(0, len(uuids), chunk_size):
+            chunk = uuids[i:i + chunk_size]
+            cursor.execute(f"SELECT {uuid_column} FROM {table} WHERE {uuid_column} IN ({', '.join('?' * len(chunk))});",
+                           chunk)
+            existing.update(row[0] for row in cursor.fetchall())
+        return existing
 
     def load_chems(self, branch: Branch) -> None:
-        with open('fred/data/chems.csv', newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                chem = ChemCheck.from_csv_row(branch, row)
-                if self.insert_chem(branch, chem):
-                    branch.last_chem_id = chem.chem_uuid
+        CSVBackfill(self, branch).run('chems', 'fred/data/chems.csv')
 
     def load_vats(self, branch: Branch) -> None:
-        with open('fred/data/vats.csv', newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                vat = VAT.from_csv_row(branch, row)
-                if self.insert_vat(branch, vat):
-                    branch.last_chem_id = vat.vat_uuid
+        CSVBackfill(self, branch).run('vats', 'fred/data/vats.csv')
 
     def update_rss(self, branch: Branch):
-        self.update_chems_rss(branch)
-        self.update_vats_rss(branch)
-        self.update_opening_rss(branch)
-        self.update_closing_rss(branch)
+        self.insert_rss(branch, self.collect_rss(branch))
+
+    def collect_rss(self, branch: Branch) -> Dict[str, list]:
+        """
+        Fetches the branch's Formstack feeds and decodes the submissions newer
+        than the last ones ingested, keyed by ingestion feed. Each distinct
+        link is fetched and parsed once, and its entries are routed to every
+        feed reading it. Reads no tables, so branches can collect concurrently
+        outside the writer thread.
+        """
+        links = {branch.rss_links[link_key] for link_key, _, _ in RSS_FEEDS.values()}
+        entries_by_link = {link: rss.form_rss_to_dict(link) for link in links}
+        return {feed: self.submissions_from_rss(branch, feed, entries_by_link[branch.rss_links[RSS_FEEDS[feed][0]]])
+                for feed in RSS_FEEDS}
+
+    def insert_rss(self, branch: Branch, collected: Dict[str, list]):
+        self.insert_chems(branch, collected['chems'], feed='chems')
+        self.insert_vats(branch, collected['vats'], feed='vats')
+        self.insert_opening_checklists(branch, collected['opening'], feed='opening')
+        self.insert_closing_checklists(branch, collected['closing'], feed='closing')
 
     def update_chems_rss(self, branch: Branch):
-        chems_rss = rss.form_rss_to_dict(branch.rss_links['chems'])
-        for entry in chems_rss:
-            if entry['Unique ID'] > branch.last_chem_id:
-                chem = ChemCheck.from_rss_entry(branch, entry)
-                if self.insert_chem(branch, chem):
-                    branch.last_chem_id = chem.chem_uuid
+        self.insert_chems(branch, self.submissions_from_rss(branch, 'chems'), feed='chems')
 
     def update_vats_rss(self, branch: Branch):
-        vats_rss = rss.form_rss_to_dict(branch.rss_links['vats'])
-        for entry in vats_rss:
-            if entry['Unique ID'] > branch.last_vat_id:
-                vat = VAT.from_rss_entry(branch, entry)
-                if self.insert_vat(branch, vat):
-                    branch.last_vat_id = vat.vat_uuid
+        self.insert_vats(branch, self.submissions_from_rss(branch, 'vats'), feed='vats')
 
     def update_opening_rss(self, branch: Branch):
-        opening_rss = rss.form_rss_to_dict(branch.rss_links['oc'])
-        opening_rss: List[dict] = list(
-            filter(lambda entry: entry['What checklist do you need to submit?'] == 'Opening Checklist', opening_rss))
-        for entry in opening_rss:
-            if entry['Unique ID'] > branch.last_opening_id:
-                opening_checklist = OpeningChecklist.from_rss_entry(branch, entry)
-                if self.insert_opening_checklist(branch, opening_checklist):
-                    branch.last_opening_id = opening_checklist.oc_uuid
+        self.insert_opening_checklists(branch, self.submissions_from_rss(branch, 'opening'), feed='opening')
 
     def update_closing_rss(self, branch: Branch):
-        closing_rss = rss.form_rss_to_dict(branch.rss_links['oc'])
-        closing_rss: List[dict] = list(
-            filter(lambda entry: entry['What checklist do you need to submit?'] == 'Closing Checklist', closing_rss))
-        for entry in closing_rss:
-            if entry['Unique ID'] > branch.last_closing_id:
-                closing_checklist = ClosingChecklist.from_rss_entry(branch, entry)
-                if self.insert_closing_checklist(branch, closing_checklist):
-                    branch.last_closing_id = closing_checklist.oc_uuid
+        self.insert_closing_checklists(branch, self.submissions_from_rss(branch, 'closing'), feed='closing')
+
+    @staticmethod
+    def submissions_from_rss(branch: Branch, feed: str, entries: Optional[List[dict]] = None) -> list:
+        """
+        Decodes the entries of one ingestion feed that are newer than its
+        high-water mark, fetching the feed's link unless its parsed entries
+        are given. Entries of a shared link are kept only if their checklist
+        type is the one the feed reads.
+        """
+        link_key, checklist, decoder = RSS_FEEDS[feed]
+        if entries is None:
+            entries = rss.form_rss_to_dict(branch.rss_links[link_key])
+        last_id = getattr(branch, INGESTION_FEEDS[feed])
+        return [decoder.from_rss_entry(branch, entry) for entry in entries if entry['Unique ID'] > last_id and
+                (checklist is None or entry.get(CHECKLIST_TYPE_KEY) == checklist)]
+
+    def resolve_many(self, branch: Branch, employees: Iterable[whentowork.Employee]
+                     ) -> Dict[int, Union[discord.Member, None]]:
+        """
+        Resolves W2W employees to the Discord members they were matched to.
+        Stored employees are dictionary lookups; employees seen for the first
+        time are matched and stored before being resolved, so this writes and
+        belongs on the writer thread. AsyncYMCADatabase.resolve_many sends
+        only those inserts there.
+
+        Args:
+            branch (Branch): The YMCA Branch whose guild the members belong to.
+            employees (Iterable[whentowork.Employee]): The employees, e.g. from
+                a list of shifts. Repeats are resolved once.
+
+        Returns:
+            Dict[int, Union[discord.Member, None]]: Each employee's member (or
+                None) keyed by W2W employee id, in input order.
+        """
+        employees = list(employees)
+        self.insert_new_w2w_employees(branch, self.new_w2w_employees(employees))
+        return self.resolve_stored(branch, employees)
+
+    def new_w2w_employees(self, employees: Iterable[whentowork.Employee]) -> List[whentowork.Employee]:
+        """The employees not yet stored, each once. Runs no SQL."""
+        return list({employee.id: employee for employee in employees
+                     if employee.id not in self.w2w_discord_ids}.values())
+
+    def insert_new_w2w_employees(self, branch: Branch, employees: List[whentowork.Employee]) -> None:
+        for employee in employees:
+            self.insert_w2w_employee(branch, employee)
+
+    def resolve_stored(self, branch: Branch, employees: Iterable[whentowork.Employee]
+                       ) -> Dict[int, Union[discord.Member, None]]:
+        """Resolves employees from the in-memory identity map alone; unstored employees resolve to None."""
+        return {employee.id: self._discord_member(branch, self.w2w_discord_ids.get(employee.id))
+                for employee in employees}
+
+    @staticmethod
+    def _discord_member(branch: Branch, discord_id: Optional[int]) -> Union[discord.Member, None]:
+        return branch.guild.get_member(discord_id) if discord_id and branch.guild else None
 
     def select_discord_user(self, branch: Branch, employee: whentowork.Employee) -> Union[discord.Member, None]:
-        cursor = self.connection.cursor()
-        try:
-            cursor.execute(f"""
-                SELECT discord_id FROM w2w_users
-                WHERE id = {employee.id};
-            """)
-        except Exception as e:
-            print(e)
-        else:
-            user = cursor.fetchone()
-            if user:
-                discord_user = branch.guild.get_member(user[0])
-                return discord_user if discord_user else None
-            else:
-                self.insert_w2w_employee(branch, employee)
-                return self.select_discord_user(branch, employee)
+        return self.resolve_many(branch, [employee])[employee.id]
 
     def select_discord_users(self, branch: Branch, employees: List[whentowork.Employee]) -> List[discord.Member]:
-        selected_users = []
-        for employee in employees:
-            discord_user = self.select_discord_user(branch, employee)
-            if discord_user:
-                selected_users.append(discord_user)
-        return selected_users
+        return [discord_user for discord_user in self.resolve_many(branch, employees).values() if discord_user]
 
     def select_last_chem(self, branch: Branch, pool: Pool) -> ChemCheck:
-        cursor = self.connection.cursor()
-        try:
-            cursor.execute(f"""
-                SELECT *, MAX(sample_time) FROM chem_checks
-                WHERE pool_id = '{pool.pool_id}' AND branch_id = '{branch.branch_id}';
-            """)
-        except Exception as e:
-            print(e)
-        else:
-            return ChemCheck.from_database(cursor.fetchone())
+        with self.reader() as connection:
+            chem = connection.execute(SELECT_LAST_CHEM, (branch.branch_id, pool.pool_id)).fetchone()
+        return ChemCheck.from_database(chem or ())
 
     def select_last_chems(self, branch: Branch, pools: List[Pool]) -> List[ChemCheck]:
-        return [self.select_last_chem(branch, pool) for pool in pools]
+        last_chems = self.select_last_chems_by_pool(branch)
+        return [last_chems.get(pool.pool_id) or ChemCheck.from_database(()) for pool in pools]
+
+    def select_last_chems_by_pool(self, branch: Branch) -> Dict[str, ChemCheck]:
+        with self.reader() as connection:
+            chems = [ChemCheck.from_database(chem) for chem in
+                     connection.execute(SELECT_LAST_CHEMS_BY_POOL, (branch.branch_id,)).fetchall()]
+        return {chem.pool_id: chem for chem in chems}
+
+    def select_last_openings_by_checklist(self, branch: Branch) -> Dict[str, OpeningChecklist]:
+        with self.reader() as connection:
+            openings = [OpeningChecklist.from_database(opening) for opening in
+                        connection.execute(SELECT_LAST_OPENINGS_BY_CHECKLIST, (branch.branch_id,)).fetchall()]
+        return {opening.checklist_group: opening for opening in openings}
 
     def select_last_opening(self, branch: Branch, checklist: str):
-        cursor = self.connection.cursor()
-        try:
-            cursor.execute(f"""
-                SELECT *, MAX(submit_time)
-                FROM opening_checklists
-                WHERE checklist_group = '{checklist}' AND branch_id = '{branch.branch_id}';
-            """)
-        except Exception as e:
-            print(e)
-        else:
-            return OpeningChecklist.from_database(cursor.fetchone())
+        with self.reader() as connection:
+            opening = connection.execute(SELECT_LAST_OPENING, (branch.branch_id, checklist)).fetchone()
+        return OpeningChecklist.from_database(opening or ())
 
     def select_last_vat(self, branch: Branch) -> VAT:
-        cursor = self.connection.cursor()
-        try:
-            cursor.execute(f"""
-                SELECT *, MAX(vat_time)
-                FROM vats
-                WHERE branch_id = '{branch.branch_id}';
-            """)
-        except Exception as e:
-            print(e)
-        else:
-            return VAT.from_database(cursor.fetchone())
+        with self.reader() as connection:
+            vat = connection.execute(SELECT_LAST_VAT, (branch.branch_id,)).fetchone()
+        return VAT.from_database(vat or ())
 
     def select_vats(self, branch: Branch, start_dt: datetime.datetime, end_dt: datetime.datetime) -> List[VAT]:
-        cursor = self.connection.cursor()
-        try:
-            cursor.execute(f"""
-                SELECT * FROM vats
-                WHERE branch_id = '{branch.branch_id}'
-                AND vat_time >= '{start_dt}'
-                AND vat_time <= '{end_dt}';
-            """)
-        except Exception as e:
-            print(e)
-        else:
-            return [VAT.from_database(vat) for vat in cursor.fetchall()]
+        with self.reader() as connection:
+            vats = connection.execute(SELECT_VATS, (branch.branch_id, dbh.to_epoch(start_dt),
+                                                    dbh.to_epoch(end_dt))).fetchall()
+        return [VAT.from_database(vat) for vat in vats]
 
     def select_chems(self, branch: Branch, start_dt: datetime.datetime, end_dt: datetime.datetime) -> List[ChemCheck]:
-        cursor = self.connection.cursor()
-        try:
-            cursor.execute(f"""
-                SELECT * FROM chem_checks
-                WHERE branch_id = '{branch.branch_id}'
-                AND sample_time >= '{start_dt}'
-                AND sample_time <= '{end_dt}';
-            """)
-        except Exception as e:
-            print(e)
-        else:
-            return [ChemCheck.from_database(chem) for chem in cursor.fetchall()]
+        with self.reader() as connection:
+            chems = connection.execute(SELECT_CHEMS, (branch.branch_id, dbh.to_epoch(start_dt),
+                                                      dbh.to_epoch(end_dt))).fetchall()
+        return [ChemCheck.from_database(chem) for chem in chems]
+
+
+class AsyncYMCADatabase(object):
+    """
+    Awaitable facade over YMCADatabase, so no SQL runs on the event loop
+    thread. Writes are handed to a single writer thread; reads are spread
+    over a pool of reader threads, one per pooled read-only connection.
+    """
+
+    def __init__(self, database: YMCADatabase):
+        self.database: YMCADatabase = database
+        self.write_executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=1,
+                                                                     thread_name_prefix='fred-db-writer')
+        self.read_executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=database.read_pool_size,
+                                                                    thread_name_prefix='fred-db-reader')
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.read_executor, functools.partial(func, *args, **kwargs))
+
+    async def run_write(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.write_executor, functools.partial(func, *args, **kwargs))
+
+    def close(self) -> None:
+        self.write_executor.shutdown(wait=True)
+        self.read_executor.shutdown(wait=True)
+        self.database.close()
+
+    async def init_database(self) -> None:
+        await self.run_write(self.database.init_database)
+
+    async def init_database_from_branch(self, branch: Branch) -> None:
+        await self.run_write(self.database.init_database_from_branch, branch)
+
+    async def upsert_discord_users(self, branch: Branch, members: List[discord.Member]) -> None:
+        await self.run_write(self.database.upsert_discord_users, branch, members)
+
+    async def remove_discord_users(self, branch: Branch, discord_ids: List[int]) -> None:
+        await self.run_write(self.database.remove_discord_users, branch, discord_ids)
+
+    async def update_rss(self, branch: Branch) -> None:
+        # Fetching and decoding is network-bound and touches no connection, so it runs on the default executor and
+        # only the inserts queue for the writer thread.
+        collected = await asyncio.to_thread(self.database.collect_rss, branch)
+        await self.run_write(self.database.insert_rss, branch, collected)
+
+    async def insert_chem(self, branch: Branch, chem: ChemCheck) -> bool:
+        return await self.run_write(self.database.insert_chem, branch, chem)
+
+    async def insert_vat(self, branch: Branch, vat: VAT) -> bool:
+        return await self.run_write(self.database.insert_vat, branch, vat)
+
+    async def insert_opening_checklist(self, branch: Branch, o: OpeningChecklist) -> bool:
+        return await self.run_write(self.database.insert_opening_checklist, branch, o)
+
+    async def insert_closing_checklist(self, branch: Branch, c: ClosingChecklist) -> bool:
+        return await self.run_write(self.database.insert_closing_checklist, branch, c)
+
+    async def insert_chems(self, branch: Branch, chems: List[ChemCheck], feed: Optional[str] = None) -> List[int]:
+        return await self.run_write(self.database.insert_chems, branch, chems, feed)
+
+    async def insert_vats(self, branch: Branch, vats: List[VAT], feed: Optional[str] = None) -> List[int]:
+        return await self.run_write(self.database.insert_vats, branch, vats, feed)
+
+    async def insert_opening_checklists(self, branch: Branch, openings: List[OpeningChecklist],
+                                        feed: Optional[str] = None) -> List[int]:
+        return await self.run_write(self.database.insert_opening_checklists, branch, openings, feed)
+
+    async def insert_closing_checklists(self, branch: Branch, closings: List[ClosingChecklist],
+                                        feed: Optional[str] = None) -> List[int]:
+        return await self.run_write(self.database.insert_closing_checklists, branch, closings, feed)
+
+    async def select_discord_user(self, branch: Branch, employee: whentowork.Employee
+                                  ) -> Union[discord.Member, None]:
+        return (await self.resolve_many(branch, [employee]))[employee.id]
+
+    async def select_discord_users(self, branch: Branch, employees: List[whentowork.Employee]
+                                   ) -> List[discord.Member]:
+        return [discord_user for discord_user in (await self.resolve_many(branch, employees)).values() if discord_user]
+
+    async def resolve_many(self, branch: Branch, employees: Iterable[whentowork.Employee]
+                           ) -> Dict[int, Union[discord.Member, None]]:
+        # Stored employees are dictionary lookups with no SQL, so only first-seen employees are handed to the writer
+        # thread to be matched and inserted.
+        employees = list(employees)
+        new_employees = self.database.new_w2w_employees(employees)
+        if new_employees:
+            await self.run_write(self.database.insert_new_w2w_employees, branch, new_employees)
+        return self.database.resolve_stored(branch, employees)
+
+    async def select_last_chem(self, branch: Branch, pool: Pool) -> ChemCheck:
+        return await self.run(self.database.select_last_chem, branch, pool)
+
+    async def select_last_chems(self, branch: Branch, pools: List[Pool]) -> List[ChemCheck]:
+        return await self.run(self.database.select_last_chems, branch, pools)
+
+    async def select_last_chems_by_pool(self, branch: Branch) -> Dict[str, ChemCheck]:
+        return await self.run(self.database.select_last_chems_by_pool, branch)
+
+    async def select_last_openings_by_checklist(self, branch: Branch) -> Dict[str, OpeningChecklist]:
+        return await self.run(self.database.select_last_openings_by_checklist, branch)
+
+    async def select_last_opening(self, branch: Branch, checklist: str) -> OpeningChecklist:
+        return await self.run(self.database.select_last_opening, branch, checklist)
+
+    async def select_last_vat(self, branch: Branch) -> VAT:
+        return await self.run(self.database.select_last_vat, branch)
+
+    async def select_vats(self, branch: Branch, start_dt: datetime.datetime, end_dt: datetime.datetime
+                          ) -> List[VAT]:
+        return await self.run(self.database.select_vats, branch, start_dt, end_dt)
+
+    async def select_chems(self, branch: Branch, start_dt: datetime.datetime, end_dt: datetime.datetime
+                           ) -> List[ChemCheck]:
+        return await self.run(self.database.select_chems, branch, start_dt, end_dt)
@@ -2,31 +2,229 @@ from __future__ import annotations
 
 import datetime
 import logging
+import threading
+from collections import OrderedDict
 from difflib import SequenceMatcher
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from .branch import Branch, Union
+    from typing import Dict, Iterable, List, Optional, Tuple, Union
+    from discord import Member
+    from .branch import Branch
 
 
-def match_discord_id(branch: Branch, name: str, last_name: str = None) -> Union[int, None]:
+LAST_NAME_MATCH_THRESHOLD = 0.85
+
+
+class NameIndex:
+    """
+    Index of a guild's member display names for match_discord_id.
+
+    Members are bucketed by the length of their last name. A query only
+    scores the buckets whose lengths could still reach the last name
+    threshold, and within them skips any name that shares too few
+    characters with the query, before running SequenceMatcher. Every
+    bound is an upper bound on SequenceMatcher's ratio, so the matches are
+    exactly those of a full scan over guild.members, ties included.
+
+    Args:
+        members (Iterable[Member]): The guild members to index, in guild order.
+    """
+
+    def __init__(self, members: Iterable[Member]):
+        self.size: int = 0
+        self.buckets: Dict[int, List[Tuple[int, str, str, int]]] = {}
+        for position, member in enumerate(members):
+            discord_display_name_split = member.display_name.lower().split(' ', 1)
+            last_name = discord_display_name_split[-1]
+            self.buckets.setdefault(len(last_name), []).append(
+                (position, last_name, discord_display_name_split[0], member.id))
+            self.size += 1
+
+    def match(self, name: str, last_name: str) -> Union[int, None]:
+        name, last_name = name.lower(), last_name.lower()
+        last_name_length = len(last_name)
+        last_name_matcher = SequenceMatcher(None, '', last_name)
+        not_in_last_name = str.maketrans('', '', last_name)
+        candidates = []
+        for length, bucket in self.buckets.items():
+            total_length = length + last_name_length
+            if total_length and 2.0 * min(length, last_name_length) / total_length <= LAST_NAME_MATCH_THRESHOLD:
+                continue
+            for position, discord_last_name, discord_first_name, discord_id in bucket:
+                # Characters of the member's last name that never appear in the query can't be part of a match.
+                shared = length - len(discord_last_name.translate(not_in_last_name))
+                if total_length and 2.0 * shared / total_length <= LAST_NAME_MATCH_THRESHOLD:
+                    continue
+                last_name_matcher.set_seq1(discord_last_name)
+                if last_name_matcher.quick_ratio() > LAST_NAME_MATCH_THRESHOLD and \
+                        last_name_matcher.ratio() > LAST_NAME_MATCH_THRESHOLD:
+                    candidates.append((position, discord_first_name, discord_id))
+
+        potential_match = (0, 0)
+        first_name_matcher = SequenceMatcher(None, '', name)
+        for _, discord_first_name, discord_id in sorted(candidates):
+            first_name_matcher.set_seq1(discord_first_name)
+            first_name_match = first_name_matcher.ratio()
+            if first_name_match > potential_match[1]:
+                potential_match = discord_id, first_name_match
+        return potential_match[0] if potential_match[0] else None
+
+
+def split_name(name: str, last_name: str = None) -> Tuple[str, str]:
     if not last_name:
-        split_name = name.split(' ', 1)
-        if len(split_name) == 1:
-            name, last_name = (split_name[0], '')
+        names = name.split(' ', 1)
+        if len(names) == 1:
+            name, last_name = (names[0], '')
         else:
-            name, last_name = split_name
+            name, last_name = names
+    return name, last_name
+
+
+class IdentityCache:
+    """
+    Bounded LRU cache of match_discord_id results keyed by branch and
+    lowercased name, including names that matched no one.
+
+    Entries only go stale when the guild's members change, so rather than
+    expiring, they are dropped selectively: when a member leaves or is
+    renamed, the names that resolved to them; when a member joins or is
+    renamed, the names whose last name that member could now match.
+
+    Args:
+        maxsize (int, optional): Entries kept before the least recently
+            used is evicted.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict[Tuple[str, str, str], Union[int, None]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(branch_id: str, name: str, last_name: str) -> Tuple[str, str, str]:
+        return branch_id, name.lower(), last_name.lower()
+
+    def get(self, branch_id: str, name: str, last_name: str) -> Tuple[bool, Union[int, None]]:
+        key = self.key(branch_id, name, last_name)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, branch_id: str, name: str, last_name: str, discord_id: Union[int, None]) -> None:
+        with self._lock:
+            self._entries[self.key(branch_id, name, last_name)] = discord_id
+            self._entries.move_to_end(self.key(branch_id, name, last_name))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate_member(self, branch_id: str, discord_id: int) -> int:
+        with self._lock:
+            stale = [key for key, value in self._entries.items() if key[0] == branch_id and value == discord_id]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def invalidate_display_name(self, branch_id: str, display_name: str) -> int:
+        discord_last_name = display_name.lower().split(' ', 1)[-1]
+        last_name_matcher = SequenceMatcher(None, discord_last_name, '')
+        with self._lock:
+            stale = []
+            for key in self._entries:
+                if key[0] == branch_id:
+                    last_name_matcher.set_seq2(key[2])
+                    if last_name_matcher.ratio() > LAST_NAME_MATCH_THRESHOLD:
+                        stale.append(key)
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def match_discord_id(branch: Branch, name: str, last_name: str = None) -> Union[int, None]:
+    name, last_name = split_name(name, last_name)
+    identity_cache = getattr(branch, 'identity_cache', None)
+    if identity_cache is None:
+        return index_discord_id(branch, name, last_name)
+    hit, discord_id = identity_cache.get(branch.branch_id, name, last_name)
+    if not hit:
+        discord_id = index_discord_id(branch, name, last_name)
+        identity_cache.put(branch.branch_id, name, last_name, discord_id)
+    return discord_id
+
+
+def index_discord_id(branch: Branch, name: str, last_name: str) -> Union[int, None]:
+    name_index = getattr(branch, 'name_index', None)
+    if branch.guild and name_index:
+        return name_index.match(name, last_name)
+    return scan_discord_id(branch, name, last_name)
+
+
+def scan_discord_id(branch: Branch, name: str, last_name: str) -> Union[int, None]:
     potential_match = (0, 0)
     if branch.guild:
         for discord_user in branch.guild.members:
             discord_display_name_split = discord_user.display_name.lower().split(' ', 1)
             last_name_match = SequenceMatcher(None, discord_display_name_split[-1], last_name.lower()).ratio()
             first_name_match = SequenceMatcher(None, discord_display_name_split[0], name.lower()).ratio()
-            if last_name_match > 0.85 and first_name_match > potential_match[1]:
+            if last_name_match > LAST_NAME_MATCH_THRESHOLD and first_name_match > potential_match[1]:
                 potential_match = discord_user.id, first_name_match
     return potential_match[0] if potential_match[0] else None
 
 
+def match_names(name_index: NameIndex, names: List[Tuple[str, str]]) -> List[Union[int, None]]:
+    """Matches (first, last) name pairs against a NameIndex."""
+    return [name_index.match(*split_name(name, last_name)) for name, last_name in names]
+
+
+# The NameIndex of a roster sync worker process, set once by init_match_worker when the process starts.
+_worker_name_index: Optional[NameIndex] = None
+
+
+def init_match_worker(name_index: NameIndex) -> None:
+    """Process pool initializer for roster sync: receives the NameIndex once per worker."""
+    global _worker_name_index
+    _worker_name_index = name_index
+
+
+def match_names_in_worker(names: List[Tuple[str, str]]) -> List[Union[int, None]]:
+    """Matches name pairs against the worker's NameIndex. Runs in roster sync's worker processes."""
+    return match_names(_worker_name_index, names)
+
+
+def match_discord_ids(branch: Branch, names: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Union[int, None]]:
+    """
+    Resolves many (first, last) name pairs at once, matching each distinct
+    pair against the guild only one time no matter how often it repeats.
+    """
+    return {(first_name, last_name): match_discord_id(branch, first_name, last_name)
+            for first_name, last_name in dict.fromkeys(names)}
+
+
+def resolve_discord_id(branch: Branch, name: str, last_name: str,
+                       discord_ids: Optional[Dict[Tuple[str, str], Union[int, None]]] = None) -> Union[int, None]:
+    if discord_ids is not None and (name, last_name) in discord_ids:
+        return discord_ids[(name, last_name)]
+    return match_discord_id(branch, name, last_name)
+
+
 def match_pool_id(branch: Branch, pool_alias: str) -> str:
     for pool_group in branch.pool_groups:
         for pool in pool_group.pools:
@@ -48,6 +246,10 @@ def handle_quotes(*names: str) -> str:
     return ' '.join([name.strip().replace("'", "''") for name in names])
 
 
+def handle_names(*names: str) -> str:
+    return ' '.join([name.strip() for name in names])
+
+
 def handle_fs_rss_date(date_string: str) -> Union[datetime.date, None]:
     d_formatted = None
     try:
@@ -90,6 +292,81 @@ def handle_fs_csv_datetime(time_str: str) -> Union[datetime.datetime, None]:
     return dt_formatted
 
 
+EPOCH = datetime.datetime(1970, 1, 1)
+
+DATETIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%S.%f',
+                    '%Y-%m-%d %H:%M:%S%z', '%Y-%m-%d %H:%M:%S.%f%z', '%Y-%m-%dT%H:%M:%S%z',
+                    '%Y-%m-%dT%H:%M:%S.%f%z', '%a, %d %b %Y %X %z', '%b %d, %Y %I:%M %p', '%B %d, %Y %I:%M %p')
+
+# What the old insert paths stored for a missing timestamp; the EPOCH migration stores these as NULL.
+LEGACY_NULL_TIMESTAMPS = ('', 'None')
+
+
+def to_local(dt: datetime.datetime) -> datetime.datetime:
+    """
+    Returns dt as a naive local wall-clock datetime, converting aware
+    datetimes to the local timezone first rather than dropping their offset.
+    """
+    return dt.astimezone().replace(tzinfo=None) if dt.tzinfo else dt
+
+
+def to_epoch(dt: datetime.datetime) -> int:
+    """
+    Converts a naive (local wall-clock) datetime to whole seconds since
+    1970-01-01 00:00, the representation of every timestamp column in the
+    database. Naive values are not shifted, so they round-trip exactly and
+    day boundaries fall on multiples of 86400; aware values are converted to
+    local time first.
+    """
+    return (to_local(dt) - EPOCH) // datetime.timedelta(seconds=1)
+
+
+def from_epoch(seconds: int) -> datetime.datetime:
+    return EPOCH + datetime.timedelta(seconds=seconds)
+
+
+def to_epoch_row(row: tuple) -> tuple:
+    """Binds every datetime in a row of query parameters as epoch seconds."""
+    return tuple(to_epoch(value) if isinstance(value, datetime.datetime) else value for value in row)
+
+
+def legacy_to_epoch(value: Union[int, str, None]) -> Union[int, None]:
+    """
+    Converts a timestamp stored before timestamps were epoch seconds, in any
+    format handle_datetime knows, for the EPOCH migration. Missing values
+    (NULL or one of LEGACY_NULL_TIMESTAMPS) become NULL; anything else raises
+    ValueError so the migration fails rather than storing NULL.
+    """
+    if value is None or isinstance(value, int):
+        return value
+    if value.strip() in LEGACY_NULL_TIMESTAMPS:
+        return None
+    dt = handle_datetime(value)
+    if dt is None:
+        raise ValueError(f"Timestamp ({value}) not in a known format")
+    return to_epoch(dt)
+
+
+def handle_datetime(value: Union[datetime.datetime, int, str, None]) -> Union[datetime.datetime, None]:
+    """
+    Normalizes a timestamp from Formstack or the database into a naive
+    datetime. Datetimes pass straight through, integers are treated as
+    epoch seconds and strings are tried against every format Formstack is
+    known to produce.
+    """
+    if value is None or isinstance(value, datetime.datetime):
+        return value
+    if isinstance(value, int):
+        return from_epoch(value)
+    for dt_format in DATETIME_FORMATS:
+        try:
+            return to_local(datetime.datetime.strptime(value, dt_format))
+        except ValueError:
+            continue
+    logging.log(logging.WARN, f"Datetime ({value}) not formatted correctly")
+    return None
+
+
 def handle_num_of_guests(guests_string: str):
     guests_list = guests_string.split(' ')
     try:
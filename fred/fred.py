@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import logging
+from typing import Optional
 
+import discord
 from discord.ext.commands import Bot
 
 from .ymca import YMCA
@@ -21,20 +23,71 @@ class Fred(Bot):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.ymca: YMCA = None
+        self.initialized: bool = False
 
     async def setup_hook(self) -> None:
         self.ymca = YMCA('YMCA of Delaware')
 
     async def on_ready(self):
+        # on_ready fires again after every reconnect. Member events keep the database current in between, so setup
+        # only needs to run once.
+        if self.initialized:
+            log.log(logging.INFO, "Reconnected; skipping setup")
+            return
+        self.initialized = True
+        # Nothing may read or write a schema that is only partly migrated, so a failed migration stops the bot before
+        # any task or command is loaded.
+        try:
+            await self.ymca.async_database.init_database()
+        except Exception:
+            log.exception("Database migration failed; shutting down.")
+            await self.close()
+            return
         self.ymca.setup(self.guilds)
+        await self.ymca.start()
         for extension in extensions:
             try:
                 await self.load_extension(extension)
             except Exception as e:
                 log.exception(f"Failed to load exception {e}.")
-        self.ymca.database.init_database()
-        for branch in self.ymca.branches.values():
-            self.ymca.database.init_database_from_branch(branch)
+        await self.ymca.run_branches(lambda branch, timings: self.ymca.async_database.init_database_from_branch(branch),
+                                     'init_database')
 
         print(f'Logged in as {self.user} (ID: {self.user.id})')
         print('------')
+
+    async def close(self):
+        if self.ymca:
+            for branch in self.ymca.branches.values():
+                await branch.async_w2w_client.close()
+        await super().close()
+
+    async def on_member_join(self, member: discord.Member):
+        await self._sync_member(member.guild, joined=member)
+
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.display_name != after.display_name or before.name != after.name:
+            await self._sync_member(after.guild, joined=after, left=before)
+
+    async def on_member_remove(self, member: discord.Member):
+        await self._sync_member(member.guild, left=member)
+
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        if before.display_name != after.display_name or before.name != after.name:
+            for guild in after.mutual_guilds:
+                # Only guilds with the user cached as a Member are synced; a bare User has no guild to resolve.
+                member = guild.get_member(after.id)
+                if member:
+                    await self._sync_member(guild, joined=member, left=before)
+
+    async def _sync_member(self, guild: discord.Guild, joined: Optional[discord.Member] = None,
+                           left: Optional[discord.Member] = None):
+        branch = self.ymca.get_branch_by_guild_id(guild.id) if self.ymca else None
+        if not branch:
+            return
+        if not joined or not left or joined.display_name != left.display_name:
+            branch.refresh_identities(joined, left)
+        if joined:
+            await self.ymca.async_database.upsert_discord_users(branch, [joined])
+        else:
+            await self.ymca.async_database.remove_discord_users(branch, [left.id])
@@ -1,4 +1,3 @@
-BEGIN;
 CREATE TABLE IF NOT EXISTS branches(
     id TEXT PRIMARY KEY NOT NULL,
     name TEXT NOT NULL
@@ -130,4 +129,3 @@ CREATE TABLE IF NOT EXISTS closing_checklists(
     FOREIGN KEY(branch_id) REFERENCES branches(id),
     UNIQUE(discord_id, checklist_group, closing_time)
 );
-COMMIT;
\ No newline at end of file
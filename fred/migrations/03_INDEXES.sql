@@ -0,0 +1,8 @@
+CREATE INDEX IF NOT EXISTS idx_chem_checks_branch_pool_sample_time
+ON chem_checks(branch_id, pool_id, sample_time);
+CREATE INDEX IF NOT EXISTS idx_chem_checks_branch_sample_time
+ON chem_checks(branch_id, sample_time);
+CREATE INDEX IF NOT EXISTS idx_vats_branch_vat_time
+ON vats(branch_id, vat_time);
+CREATE INDEX IF NOT EXISTS idx_opening_checklists_branch_group_submit_time
+ON opening_checklists(branch_id, checklist_group, submit_time);
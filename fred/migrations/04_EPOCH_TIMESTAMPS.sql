@@ -0,0 +1,141 @@
+-- legacy_to_epoch is registered by YMCADatabase.migrate. It parses every timestamp format the old RSS and CSV paths
+-- stored and raises on anything else, and the copies use plain INSERTs, so a row that cannot be converted or that
+-- collides once converted aborts the migration instead of being dropped.
+DROP VIEW IF EXISTS test_view;
+
+CREATE TABLE chem_checks_epoch(
+    chem_uuid INT PRIMARY KEY NOT NULL,
+    discord_id INT,
+    name TEXT,
+    branch_id TEXT,
+    pool_id TEXT,
+    sample_location TEXT,
+    sample_time EPOCH,
+    submit_time EPOCH,
+    chlorine REAL,
+    ph REAL,
+    water_temp INT,
+    num_of_swimmers INT,
+    FOREIGN KEY(discord_id) REFERENCES discord_users(id),
+    FOREIGN KEY(branch_id) REFERENCES branches(id),
+    FOREIGN KEY(pool_id) REFERENCES pools(id),
+    UNIQUE(discord_id, sample_time, pool_id)
+);
+INSERT INTO chem_checks_epoch
+SELECT chem_uuid, discord_id, name, branch_id, pool_id, sample_location,
+       legacy_to_epoch(sample_time), legacy_to_epoch(submit_time),
+       chlorine, ph, water_temp, num_of_swimmers
+FROM chem_checks;
+DROP TABLE chem_checks;
+ALTER TABLE chem_checks_epoch RENAME TO chem_checks;
+
+CREATE TABLE vats_epoch(
+    vat_uuid INT PRIMARY KEY NOT NULL,
+    guard_discord_id INT,
+    guard_name TEXT,
+    sup_discord_id INT,
+    sup_name TEXT,
+    branch_id TEXT,
+    pool_id TEXT,
+    vat_time EPOCH,
+    submit_time EPOCH,
+    num_of_swimmers INT,
+    num_of_guards INT,
+    stimuli TEXT,
+    depth REAL,
+    response_time REAL,
+    FOREIGN KEY(guard_discord_id) REFERENCES discord_users(id),
+    FOREIGN KEY(sup_discord_id) REFERENCES discord_users(id),
+    FOREIGN KEY(branch_id) REFERENCES branches(id),
+    FOREIGN KEY(pool_id) REFERENCES pools(id),
+    UNIQUE(guard_discord_id, sup_discord_id, vat_time)
+);
+INSERT INTO vats_epoch
+SELECT vat_uuid, guard_discord_id, guard_name, sup_discord_id, sup_name, branch_id, pool_id,
+       legacy_to_epoch(vat_time), legacy_to_epoch(submit_time),
+       num_of_swimmers, num_of_guards, stimuli, depth, response_time
+FROM vats;
+DROP TABLE vats;
+ALTER TABLE vats_epoch RENAME TO vats;
+
+CREATE TABLE opening_checklists_epoch(
+    oc_uuid INT PRIMARY KEY NOT NULL,
+    discord_id INT,
+    name TEXT,
+    branch_id TEXT,
+    checklist_group TEXT,
+    opening_time EPOCH,
+    submit_time EPOCH,
+    regulatory_info TEXT,
+    aed_info TEXT,
+    adult_pads_expiration_date TEXT,
+    pediatric_pads_expiration_date TEXT,
+    aspirin_expiration_date TEXT,
+    sup_oxygen_info TEXT,
+    sup_oxygen_psi INT,
+    first_aid_info TEXT,
+    chlorine REAL,
+    ph REAL,
+    water_temp INT,
+    lights_function TEXT,
+    handicap_chair_function TEXT,
+    spare_battery_present TEXT,
+    vacuum_present TEXT,
+    FOREIGN KEY(discord_id) REFERENCES discord_users(id),
+    FOREIGN KEY(branch_id) REFERENCES branches(id),
+    UNIQUE(discord_id, checklist_group, opening_time)
+);
+INSERT INTO opening_checklists_epoch
+SELECT oc_uuid, discord_id, name, branch_id, checklist_group,
+       legacy_to_epoch(opening_time), legacy_to_epoch(submit_time),
+       regulatory_info, aed_info, adult_pads_expiration_date, pediatric_pads_expiration_date,
+       aspirin_expiration_date, sup_oxygen_info, sup_oxygen_psi, first_aid_info, chlorine, ph, water_temp,
+       lights_function, handicap_chair_function, spare_battery_present, vacuum_present
+FROM opening_checklists;
+DROP TABLE opening_checklists;
+ALTER TABLE opening_checklists_epoch RENAME TO opening_checklists;
+
+CREATE TABLE closing_checklists_epoch(
+    oc_uuid INT PRIMARY KEY NOT NULL,
+    discord_id INT,
+    name TEXT,
+    branch_id TEXT,
+    checklist_group TEXT,
+    closing_time EPOCH,
+    submit_time EPOCH,
+    regulatory_info TEXT,
+    chlorine REAL,
+    ph REAL,
+    water_temp INT,
+    lights_function TEXT,
+    vacuum_function TEXT,
+    FOREIGN KEY(discord_id) REFERENCES discord_users(id),
+    FOREIGN KEY(branch_id) REFERENCES branches(id),
+    UNIQUE(discord_id, checklist_group, closing_time)
+);
+INSERT INTO closing_checklists_epoch
+SELECT oc_uuid, discord_id, name, branch_id, checklist_group,
+       legacy_to_epoch(closing_time), legacy_to_epoch(submit_time),
+       regulatory_info, chlorine, ph, water_temp, lights_function, vacuum_function
+FROM closing_checklists;
+DROP TABLE closing_checklists;
+ALTER TABLE closing_checklists_epoch RENAME TO closing_checklists;
+
+CREATE INDEX IF NOT EXISTS idx_chem_checks_branch_pool_sample_time
+ON chem_checks(branch_id, pool_id, sample_time);
+CREATE INDEX IF NOT EXISTS idx_chem_checks_branch_sample_time
+ON chem_checks(branch_id, sample_time);
+CREATE INDEX IF NOT EXISTS idx_vats_branch_vat_time
+ON vats(branch_id, vat_time);
+CREATE INDEX IF NOT EXISTS idx_opening_checklists_branch_group_submit_time
+ON opening_checklists(branch_id, checklist_group, submit_time);
+
+CREATE VIEW IF NOT EXISTS test_view AS
+SELECT discord_users.id, discord_users.nickname, vats_sup_total.vat_total
+FROM
+(SELECT sup_discord_id, COUNT(sup_discord_id) AS vat_total
+FROM vats
+WHERE sup_discord_id IS NOT NULL
+GROUP BY sup_discord_id) AS vats_sup_total
+LEFT JOIN discord_users
+ON discord_users.id = vats_sup_total.sup_discord_id;
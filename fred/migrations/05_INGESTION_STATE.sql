@@ -0,0 +1,16 @@
+CREATE TABLE IF NOT EXISTS ingestion_state(
+    branch_id TEXT NOT NULL,
+    feed TEXT NOT NULL,
+    high_water_mark INT NOT NULL DEFAULT 0,
+    updated_time EPOCH,
+    PRIMARY KEY(branch_id, feed),
+    FOREIGN KEY(branch_id) REFERENCES branches(id)
+);
+INSERT OR IGNORE INTO ingestion_state
+SELECT branch_id, 'chems', MAX(chem_uuid), NULL FROM chem_checks WHERE branch_id IS NOT NULL GROUP BY branch_id;
+INSERT OR IGNORE INTO ingestion_state
+SELECT branch_id, 'vats', MAX(vat_uuid), NULL FROM vats WHERE branch_id IS NOT NULL GROUP BY branch_id;
+INSERT OR IGNORE INTO ingestion_state
+SELECT branch_id, 'opening', MAX(oc_uuid), NULL FROM opening_checklists WHERE branch_id IS NOT NULL GROUP BY branch_id;
+INSERT OR IGNORE INTO ingestion_state
+SELECT branch_id, 'closing', MAX(oc_uuid), NULL FROM closing_checklists WHERE branch_id IS NOT NULL GROUP BY branch_id;
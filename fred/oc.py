@@ -244,14 +244,14 @@ class OpeningChecklist:
         oc_uuid = entry['Unique ID']
         discord_id = dbh.match_discord_id(
             branch, entry['Name of the individual completing the inspection'])
-        name = dbh.handle_quotes(
+        name = dbh.handle_names(
             entry['Name of the individual completing the inspection'])
         checklist_group = entry.get('Which pool do you need to inspect?')
         time = dbh.handle_fs_rss_datetime_full_month(
             entry['Date & Time of Inspection'])
-        submit_time = entry['Time']
+        submit_time = dbh.handle_datetime(entry['Time'])
         # Below values optional, thus use of .get()
-        regulatory_info = dbh.handle_quotes(
+        regulatory_info = dbh.handle_names(
             entry.get(get_regulatory_key_from_rss_keys(keys), ''))
         aed_info = entry.get('AED Inspection', '')
         adult_pads_expiration_date = dbh.handle_fs_rss_date(
@@ -303,10 +303,8 @@ class OpeningChecklist:
         name = db_tup[2]
         branch_id = db_tup[3]
         checklist_group = db_tup[4]
-        time = datetime.datetime.fromisoformat(
-            db_tup[5]) if db_tup[5] else None
-        submit_time = datetime.datetime.fromisoformat(
-            db_tup[6]) if db_tup[6] else None
+        time = dbh.handle_datetime(db_tup[5])
+        submit_time = dbh.handle_datetime(db_tup[6])
         # Below values optional, thus use of .get()
         regulatory_info = db_tup[7]
         aed_info = db_tup[8]
@@ -375,14 +373,14 @@ class ClosingChecklist:
         oc_uuid = entry['Unique ID']
         discord_id = dbh.match_discord_id(
             branch, entry['Name of the individual completing the inspection'])
-        name = dbh.handle_quotes(
+        name = dbh.handle_names(
             entry['Name of the individual completing the inspection'])
         checklist_group = entry['Which pool do you need to inspect?']
         time = dbh.handle_fs_rss_datetime_full_month(
             entry['Date & Time of Inspection'])
-        submit_time = entry['Time']
+        submit_time = dbh.handle_datetime(entry['Time'])
         # Below values optional, thus use of .get()
-        regulatory_info = dbh.handle_quotes(
+        regulatory_info = dbh.handle_names(
             entry.get(get_regulatory_key_from_rss_keys(keys), ''))
         chlorine = handle_cl(entry.get(get_cl_key_from_rss_keys(keys), ''))
         ph = handle_ph(entry.get(get_ph_key_from_rss_keys(keys), ''))
@@ -414,8 +412,8 @@ class ClosingChecklist:
         name = db_tup[2]
         branch_id = db_tup[3]
         checklist_group = db_tup[4]
-        time = datetime.datetime.fromisoformat(db_tup[5])
-        submit_time = datetime.datetime.fromisoformat(db_tup[6])
+        time = dbh.handle_datetime(db_tup[5])
+        submit_time = dbh.handle_datetime(db_tup[6])
         regulatory_info = db_tup[7]
         chlorine = float(db_tup[8])
         ph = float(db_tup[9])
@@ -3,14 +3,22 @@
 from __future__ import annotations
 
 import datetime
+import gzip
+import hashlib
+import threading
+import urllib.error
+import urllib.request
 from html.parser import HTMLParser
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, NamedTuple, Optional
 
 import feedparser
 
 if TYPE_CHECKING:
     from typing import List, Union, Dict
 
+# Seconds to wait on Formstack before a feed fetch fails.
+DEFAULT_FEED_TIMEOUT = 30.0
+
 
 class FormstackHTMLParser(HTMLParser):
     """
@@ -47,8 +55,80 @@ class FormstackHTMLParser(HTMLParser):
             self.form_dict[self.last_key] = data.strip()
 
 
+class CachedFeed(NamedTuple):
+    etag: Optional[str]
+    modified: Optional[str]
+    digest: bytes
+    entries: List[Dict[str, Union[str, int, datetime]]]
+
+
+class FeedCache:
+    """
+    Remembers each RSS link's ETag, Last-Modified, body hash and parsed
+    entries, so refetching a feed nobody has submitted to costs a 304 (or, if
+    Formstack ignores the validators, a download without a parse).
+
+    The entry dicts are shared between calls and should not be modified.
+    """
+
+    def __init__(self, timeout: float = DEFAULT_FEED_TIMEOUT):
+        self.timeout: float = timeout
+        self.not_modified: int = 0
+        self.unchanged: int = 0
+        self.parsed: int = 0
+        self._feeds: Dict[str, CachedFeed] = {}
+        self._lock = threading.Lock()
+
+    def entries(self, link: str) -> List[Dict[str, Union[str, int, datetime]]]:
+        with self._lock:
+            cached = self._feeds.get(link)
+        request = urllib.request.Request(link, headers={'Accept-Encoding': 'gzip'})
+        if cached and cached.etag:
+            request.add_header('If-None-Match', cached.etag)
+        if cached and cached.modified:
+            request.add_header('If-Modified-Since', cached.modified)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                body = response.read()
+                if response.headers.get('Content-Encoding') == 'gzip':
+                    body = gzip.decompress(body)
+                etag, modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+        except urllib.error.HTTPError as e:
+            if e.code != 304 or not cached:
+                raise
+            with self._lock:
+                self.not_modified += 1
+            return list(cached.entries)
+
+        digest = hashlib.sha256(body).digest()
+        if cached and cached.digest == digest:
+            entries = cached.entries
+            with self._lock:
+                self.unchanged += 1
+        else:
+            entries = feed_to_dicts(feedparser.parse(body))
+            with self._lock:
+                self.parsed += 1
+        with self._lock:
+            self._feeds[link] = CachedFeed(etag, modified, digest, entries)
+        return list(entries)
+
+    def invalidate(self, link: Optional[str] = None):
+        with self._lock:
+            if link is None:
+                self._feeds.clear()
+            else:
+                self._feeds.pop(link, None)
+
+
+feed_cache = FeedCache()
+
+
 def form_rss_to_dict(link: str) -> List[Dict[str, Union[str, int, datetime]]]:
-    fp: feedparser.FeedParserDict = feedparser.parse(link)
+    return feed_cache.entries(link)
+
+
+def feed_to_dicts(fp: feedparser.FeedParserDict) -> List[Dict[str, Union[str, int, datetime]]]:
     parsed_entries: List[Dict[str, Union[str, int, datetime]]] = []
     for entry in fp.entries:
         form_parser = FormstackHTMLParser()
@@ -78,7 +78,8 @@ class VAT:
         return self.response_time >= 10.0
 
     @classmethod
-    def from_csv_row(cls, branch: Branch, row: Dict[str, str]) -> VAT:
+    def from_csv_row(cls, branch: Branch, row: Dict[str, str],
+                     discord_ids: Optional[Dict[Tuple[str, str], Optional[int]]] = None) -> VAT:
         """
         Factory method that initializes an instance of VAT from a CSV export
         from Formstack.
@@ -86,23 +87,28 @@ class VAT:
         Args:
             branch (Branch): The YMCA Branch the CSV file is filtered for.
             row (Dict[str, str]): A single row from the CSV file.
+            discord_ids (Dict[Tuple[str, str], Optional[int]], optional):
+                Names already resolved to Discord ids, such as one chunk of a
+                backfill. Names missing from it are matched individually.
 
         Returns:
             VAT: An instance of VAT
         """
         vat_uuid = int(row['Unique ID'])
-        guard_discord_id = dbh.match_discord_id(
+        guard_discord_id = dbh.resolve_discord_id(
             branch,
             row['Name of Lifeguard Vigilance Tested (First)'],
-            row['Name of Lifeguard Vigilance Tested (Last)'])
-        guard_name = dbh.handle_quotes(
+            row['Name of Lifeguard Vigilance Tested (Last)'],
+            discord_ids)
+        guard_name = dbh.handle_names(
             row['Name of Lifeguard Vigilance Tested (First)'],
             row['Name of Lifeguard Vigilance Tested (Last)'])
-        sup_discord_id = dbh.match_discord_id(
+        sup_discord_id = dbh.resolve_discord_id(
             branch,
             row['Who monitored & conducted the vigilance test? (First)'],
-            row['Who monitored & conducted the vigilance test? (Last)'])
-        sup_name = dbh.handle_quotes(
+            row['Who monitored & conducted the vigilance test? (Last)'],
+            discord_ids)
+        sup_name = dbh.handle_names(
             row['Who monitored & conducted the vigilance test? (First)'],
             row['Who monitored & conducted the vigilance test? (Last)'])
         if row['Which Pool? - Western']:
@@ -148,18 +154,18 @@ class VAT:
         guard_discord_id = dbh.match_discord_id(
             branch,
             entry['Name of Lifeguard Vigilance Tested'])
-        guard_name = dbh.handle_quotes(
+        guard_name = dbh.handle_names(
             entry['Name of Lifeguard Vigilance Tested'])
         sup_discord_id = dbh.match_discord_id(
             branch,
             entry['Who monitored & conducted the vigilance test?'])
-        sup_name = dbh.handle_quotes(
+        sup_name = dbh.handle_names(
             entry['Who monitored & conducted the vigilance test?'])
         pool_id = dbh.match_pool_id(branch, entry['Which Pool? '])
         time = dbh.handle_fs_rss_datetime(
             f"{entry['Date of Vigilance Test Conducted']}"
             f" {entry['Time of Vigilance Test Conducted ']}")
-        submit_time = entry['Time']
+        submit_time = dbh.handle_datetime(entry['Time'])
         num_of_swimmers = dbh.handle_num_of_guests(
             entry['How many guests do you believe were in the pool?'])
         num_of_guards = dbh.handle_num_of_guards(
@@ -196,8 +202,8 @@ class VAT:
         sup_name = db_tup[4]
         branch_id = db_tup[5]
         pool_id = db_tup[6]
-        time = datetime.datetime.fromisoformat(db_tup[7])
-        submit_time = datetime.datetime.fromisoformat(db_tup[8])
+        time = dbh.handle_datetime(db_tup[7])
+        submit_time = dbh.handle_datetime(db_tup[8])
         num_of_swimmers = int(db_tup[9])
         num_of_guards = int(db_tup[10])
         stimuli = db_tup[11]
@@ -1,31 +1,328 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from bisect import bisect_left, bisect_right
 from datetime import datetime, date, timedelta
-from typing import TYPE_CHECKING, List, Dict, Optional
+from typing import TYPE_CHECKING, Callable, Iterable, List, Dict, Optional, Tuple, Union
 
-from whentowork import Shift, Position, Client, Employee
+import aiohttp
+import numpy as np
+from whentowork import Category, Shift, Position, Client, Employee
+from whentowork.adapter import endpoint_return_classes
+from whentowork.exceptions.w2w_bad_request import W2WBadRequestException
+from whentowork.exceptions.w2w_bad_type import W2WBadType
 
 if TYPE_CHECKING:
     from .types.w2w import YMCAW2WClientPayload
 
 log = logging.getLogger(__name__)
 
+DEFAULT_SHIFT_CACHE_TTL = 300.0
+DEFAULT_W2W_TIMEOUT = 10.0
+DEFAULT_W2W_MAX_CONNECTIONS = 8
+DEFAULT_W2W_MAX_CONCURRENCY = 4
+DEFAULT_W2W_KEEPALIVE_TIMEOUT = 30.0
 
-class YMCAW2WClient(Client):
-    def __init__(self, hostname: str, token: str, position_ids: YMCAW2WClientPayload):
-        super().__init__(hostname, token, logger=log)
-        self._update_w2w_positions(position_ids)
+# Days ahead of today kept warm by prefetch_shifts, and how often each band of days is refetched: (last day offset,
+# refresh interval in seconds). Nearer days change more often, so they are refreshed sooner.
+SHIFT_PREFETCH_TIERS: Tuple[Tuple[int, float], ...] = ((1, 300.0), (7, 1800.0))
+
+
+class ShiftIndex:
+    """
+    Start-sorted shifts per position for a fixed list of shifts. Overlap queries bisect on start time, bounded below
+    by the longest shift of the position, and every query returns shifts in the order of the original list so results
+    match BaseYMCAW2WClient.filter_shifts exactly.
+    """
+
+    def __init__(self, shifts: List[Shift]):
+        self.shifts: List[Shift] = shifts
+        # position id -> (sorted start datetimes, original indices in the same order, longest duration)
+        self._by_position: Dict[Optional[int], Tuple[List[datetime], List[int], timedelta]] = {}
+        grouped: Dict[Optional[int], List[int]] = {}
+        for i, shift in enumerate(shifts):
+            grouped.setdefault(self._position_key(shift.position), []).append(i)
+        for key, indices in grouped.items():
+            indices.sort(key=lambda i: shifts[i].start_datetime)
+            self._by_position[key] = ([shifts[i].start_datetime for i in indices], indices,
+                                      max(shifts[i].end_datetime - shifts[i].start_datetime for i in indices))
+        self._extremes: Optional[Dict[bool, List[List[Shift]]]] = None
+
+    @staticmethod
+    def _position_key(position: Optional[Position]) -> Optional[int]:
+        return position.id if position is not None else None
+
+    def _keys(self, positions: Optional[Iterable[Optional[Position]]]) -> Iterable[Optional[int]]:
+        if not positions:
+            return self._by_position.keys()
+        return {self._position_key(position) for position in positions}
+
+    def overlapping(self, dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
+                    positions: Optional[List[Position]] = None) -> List[Shift]:
+        """
+        Gets every shift in positions (all positions if empty) that overlaps dt_start to dt_end, or every shift in
+        positions if either datetime is missing.
+        """
+        bounded = bool(dt_start and dt_end)
+        indices: List[int] = []
+        for key in self._keys(positions):
+            if key not in self._by_position:
+                continue
+            starts, position_indices, longest = self._by_position[key]
+            if not bounded:
+                indices.extend(position_indices)
+                continue
+            lo = bisect_right(starts, dt_start - longest)
+            hi = bisect_left(starts, dt_end)
+            indices.extend(i for i in position_indices[lo:hi] if self.shifts[i].end_datetime > dt_start)
+        indices.sort()
+        return [self.shifts[i] for i in indices]
+
+    def extremes(self, positions: Optional[List[Position]] = None, opener_flag: bool = True) -> List[Shift]:
+        """
+        Gets the openers (earliest start) or closers (latest end) of every start date and position, in the same order
+        as BaseYMCAW2WClient._get_extreme_shifts_from_sorted.
+        """
+        if self._extremes is None:
+            self._extremes = {True: [], False: []}
+            groups: Dict[Tuple[date, Optional[int]], List[int]] = {}
+            for i, shift in enumerate(self.shifts):
+                groups.setdefault((shift.start_datetime.date(), self._position_key(shift.position)), []).append(i)
+            for opener, attribute, pick in ((True, 'start_datetime', min), (False, 'end_datetime', max)):
+                for indices in groups.values():
+                    extreme = pick(getattr(self.shifts[i], attribute) for i in indices)
+                    self._extremes[opener].append(
+                        [self.shifts[i] for i in indices if getattr(self.shifts[i], attribute) == extreme])
+        keys = None if not positions else set(self._keys(positions))
+        return [shift for group in self._extremes[opener_flag]
+                if keys is None or self._position_key(group[0].position) in keys for shift in group]
+
+
+class ShiftFrame:
+    """
+    Columnar copy of a list of shifts: start and end times as epoch seconds, durations in hours, and employee and
+    position ids (0 where the shift has none) as NumPy arrays. Filters, group-bys, uniques and sums run on the arrays;
+    Shift objects are only touched again when a caller asks for them.
+    """
+
+    def __init__(self, shifts: Iterable[Shift] = ()):
+        shifts = list(shifts)
+        self._shifts = np.empty(len(shifts), dtype=object)
+        self._shifts[:] = shifts
+        self.starts: np.ndarray = np.array([shift.start_datetime for shift in shifts],
+                                           dtype='datetime64[s]').astype(np.int64)
+        self.ends: np.ndarray = np.array([shift.end_datetime for shift in shifts],
+                                         dtype='datetime64[s]').astype(np.int64)
+        self.durations: np.ndarray = np.fromiter((shift.duration for shift in shifts), dtype=np.float64,
+                                                 count=len(shifts))
+        self.employee_ids: np.ndarray = np.fromiter((shift.employee.id if shift.employee else 0 for shift in shifts),
+                                                    dtype=np.int64, count=len(shifts))
+        self.position_ids: np.ndarray = np.fromiter((shift.position.id if shift.position else 0 for shift in shifts),
+                                                    dtype=np.int64, count=len(shifts))
+
+    def __len__(self) -> int:
+        return len(self._shifts)
+
+    @property
+    def shifts(self) -> List[Shift]:
+        return self._shifts.tolist()
+
+    @staticmethod
+    def _epoch(dt: datetime) -> int:
+        return int(np.datetime64(dt, 's').astype(np.int64))
+
+    def take(self, selection: np.ndarray) -> ShiftFrame:
+        """Gets a new frame with the rows picked by a boolean mask or an array of row numbers."""
+        frame = ShiftFrame.__new__(ShiftFrame)
+        for column in ('_shifts', 'starts', 'ends', 'durations', 'employee_ids', 'position_ids'):
+            setattr(frame, column, getattr(self, column)[selection])
+        return frame
+
+    def filter(self, dt_start: Optional[datetime] = None, dt_end: Optional[datetime] = None,
+               positions: Optional[List[Position]] = None) -> ShiftFrame:
+        """Same rows, in the same order, as BaseYMCAW2WClient.filter_shifts."""
+        mask = np.ones(len(self), dtype=bool)
+        if positions:
+            mask &= np.isin(self.position_ids, [position.id if position is not None else 0 for position in positions])
+        if dt_start and dt_end:
+            mask &= (self.starts < self._epoch(dt_end)) & (self.ends > self._epoch(dt_start))
+        return self.take(mask)
+
+    @property
+    def total_hours(self) -> float:
+        return float(self.durations.sum())
+
+    def during(self, dt: datetime) -> bool:
+        epoch = self._epoch(dt)
+        return bool(np.any((self.starts <= epoch) & (epoch <= self.ends)))
+
+    def count_covering(self, dts: Iterable[datetime]) -> int:
+        """Counts the shifts that contain at least one of dts, inclusive of both ends."""
+        epochs = np.sort(np.array(list(dts), dtype='datetime64[s]').astype(np.int64))
+        if not len(epochs) or not len(self):
+            return 0
+        first_after_start = np.searchsorted(epochs, self.starts, side='left')
+        covered = first_after_start < len(epochs)
+        covered[covered] = epochs[first_after_start[covered]] <= self.ends[covered]
+        return int(covered.sum())
+
+    def _groups(self, keys: np.ndarray) -> List[np.ndarray]:
+        # Row numbers per distinct key, groups ordered by first appearance and rows kept in their original order.
+        if not len(keys):
+            return []
+        _, first_rows, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        order = np.argsort(inverse, kind='stable')
+        groups = np.split(order, np.cumsum(np.bincount(inverse))[:-1])
+        return [groups[group] for group in np.argsort(first_rows, kind='stable')]
+
+    def unique_employee_ids(self) -> np.ndarray:
+        _, first_rows = np.unique(self.employee_ids, return_index=True)
+        return self.employee_ids[np.sort(first_rows)]
+
+    def unique_employees(self) -> List[Optional[Employee]]:
+        """Same employees, in the same order, as BaseYMCAW2WClient.unique_employees."""
+        _, first_rows = np.unique(self.employee_ids, return_index=True)
+        return [shift.employee for shift in self._shifts[np.sort(first_rows)]]
+
+    def group_by_employee(self) -> Dict[Optional[Employee], ShiftFrame]:
+        return {self._shifts[rows[0]].employee: self.take(rows) for rows in self._groups(self.employee_ids)}
+
+    def group_by_position(self) -> Dict[Optional[Position], ShiftFrame]:
+        return {self._shifts[rows[0]].position: self.take(rows) for rows in self._groups(self.position_ids)}
+
+
+class BaseYMCAW2WClient:
+    """
+    Shift cache, position lookups and shift helpers behind AsyncYMCAW2WClient. Nothing here talks to WhenToWork;
+    subclasses claim the days _missing_shift_days reports with _claim_shift_days, fetch the runs they were handed,
+    and settle each with _finish_shift_fetch.
+    """
+    employees: List[Employee]
+    positions: List[Position]
+    categories: List[Category]
+
+    def _init_shift_cache(self, shift_cache_ttl: float):
+        # Indexed shifts keyed by the day they start on, with the monotonic time they were fetched and, for prefetched
+        # days, a ttl of their own in place of shift_cache_ttl.
+        self.shift_cache_ttl: float = shift_cache_ttl
+        self.shift_cache_hits: int = 0
+        self.shift_cache_misses: int = 0
+        # Upstream fetches avoided by waiting on another caller's in-flight fetch of the same days.
+        self.shift_fetches_coalesced: int = 0
+        self._shift_cache: Dict[date, Tuple[float, Optional[float], ShiftIndex]] = {}
+        self._shift_fetches: Dict[date, asyncio.Future] = {}
+
+    def invalidate_shifts(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> None:
+        """Drops cached shifts between two dates (inclusive), or every cached shift if no dates are given."""
+        if start_date is None and end_date is None:
+            self._shift_cache.clear()
+            return
+        for day in list(self._shift_cache):
+            if (start_date is None or day >= start_date) and (end_date is None or day <= end_date):
+                del self._shift_cache[day]
+
+    def _missing_shift_days(self, start_date: date, end_date: date) -> Tuple[List[date], List[date]]:
+        Client.validate_dates(start_date, end_date)
+        days = [start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1)]
+        now = time.monotonic()
+        missing = [day for day in days if day not in self._shift_cache or
+                   self._shift_cache_expired(self._shift_cache[day], now)]
+        self.shift_cache_hits += len(days) - len(missing)
+        self.shift_cache_misses += len(missing)
+        return days, missing
+
+    def _shift_cache_expired(self, cached: Tuple[float, Optional[float], ShiftIndex], now: float) -> bool:
+        return now - cached[0] >= (self.shift_cache_ttl if cached[1] is None else cached[1])
+
+    def _store_shift_days(self, start_date: date, end_date: date, shifts: List[Shift],
+                          ttl: Optional[float] = None) -> None:
+        shifts_by_day: Dict[date, List[Shift]] = {
+            start_date + timedelta(days=offset): [] for offset in range((end_date - start_date).days + 1)}
+        for shift in shifts:
+            shift_date = shift.start_datetime.date()
+            shifts_by_day[shift_date if shift_date in shifts_by_day else start_date].append(shift)
+        fetched = time.monotonic()
+        for day, cached in list(self._shift_cache.items()):
+            if self._shift_cache_expired(cached, fetched):
+                del self._shift_cache[day]
+        for day, day_shifts in shifts_by_day.items():
+            self._shift_cache[day] = (fetched, ttl, ShiftIndex(day_shifts))
+
+    def _claim_shift_days(self, missing: List[date], new_fetch: Callable[[], asyncio.Future]
+                          ) -> Tuple[List[Tuple[date, date, asyncio.Future]], List[asyncio.Future]]:
+        """
+        Splits missing days into runs this caller must fetch, each with a new future registered for its days, and the
+        futures of fetches already in flight for the rest, which the caller should wait on instead.
+        """
+        joined: List[asyncio.Future] = []
+        unclaimed: List[date] = []
+        for day in missing:
+            in_flight = self._shift_fetches.get(day)
+            if in_flight is None:
+                unclaimed.append(day)
+            elif all(in_flight is not fetch for fetch in joined):
+                joined.append(in_flight)
+        runs = [(run_start, run_end, new_fetch()) for run_start, run_end in self._consecutive_runs(unclaimed)]
+        for run_start, run_end, fetch in runs:
+            for offset in range((run_end - run_start).days + 1):
+                self._shift_fetches[run_start + timedelta(days=offset)] = fetch
+        self.shift_fetches_coalesced += len(joined)
+        return runs, joined
+
+    def _finish_shift_fetch(self, start_date: date, end_date: date, fetch: asyncio.Future,
+                            error: Optional[BaseException] = None) -> None:
+        for offset in range((end_date - start_date).days + 1):
+            if self._shift_fetches.get(start_date + timedelta(days=offset)) is fetch:
+                del self._shift_fetches[start_date + timedelta(days=offset)]
+        if error is None:
+            fetch.set_result(None)
+        else:
+            fetch.set_exception(error)
+            # Only the callers that joined this fetch need to see the error; the fetching caller re-raises it.
+            fetch.exception()
+
+    def _cached_shift_indexes(self, days: List[date]) -> List[ShiftIndex]:
+        return [self._shift_cache[day][2] for day in days if day in self._shift_cache]
+
+    @staticmethod
+    def _consecutive_runs(days: List[date]) -> List[Tuple[date, date]]:
+        runs: List[Tuple[date, date]] = []
+        for day in days:
+            if runs and day - runs[-1][1] == timedelta(days=1):
+                runs[-1] = (runs[-1][0], day)
+            else:
+                runs.append((day, day))
+        return runs
+
+    @staticmethod
+    def _unique_shifts(shift_lists: Iterable[List[Shift]]) -> List[Shift]:
+        shifts: Dict[int, Shift] = {}
+        for shift_list in shift_lists:
+            for shift in shift_list:
+                shifts.setdefault(shift.id, shift)
+        return list(shifts.values())
+
+    @staticmethod
+    def _find_by_id(items: List[Union[Employee, Position, Category]], item_id: int
+                    ) -> Optional[Union[Employee, Position, Category]]:
+        if item_id == 0:
+            return None
+        for item in items:
+            if item_id == item.id:
+                return item
+        return None
 
     def _update_w2w_positions(self, position_ids: YMCAW2WClientPayload):
-        self.director: Optional[Position] = self.get_position_by_id(position_ids['director'])
-        self.specialist: Optional[Position] = self.get_position_by_id(position_ids['specialist'])
-        self.supervisor: Optional[Position] = self.get_position_by_id(position_ids['supervisor'])
-        self.swim_instructor: Optional[Position] = self.get_position_by_id(position_ids["swim_instructor"])
-        self.private_swim_instructor: Optional[Position] = self.get_position_by_id(
-            position_ids["private_swim_instructor"])
-        self.swam: Optional[Position] = self.get_position_by_id(position_ids["swam"])
-        self._lifeguards: Optional[List[Position]] = [self.get_position_by_id(v) for v in
+        self.director: Optional[Position] = self._find_by_id(self.positions, position_ids['director'])
+        self.specialist: Optional[Position] = self._find_by_id(self.positions, position_ids['specialist'])
+        self.supervisor: Optional[Position] = self._find_by_id(self.positions, position_ids['supervisor'])
+        self.swim_instructor: Optional[Position] = self._find_by_id(self.positions, position_ids["swim_instructor"])
+        self.private_swim_instructor: Optional[Position] = self._find_by_id(
+            self.positions, position_ids["private_swim_instructor"])
+        self.swam: Optional[Position] = self._find_by_id(self.positions, position_ids["swam"])
+        self._lifeguards: Optional[List[Position]] = [self._find_by_id(self.positions, v) for v in
                                                       position_ids['lifeguard'].values()]
 
     @property
@@ -40,56 +337,6 @@ class YMCAW2WClient(Client):
     def leadership_positions(self) -> List[Position]:
         return [pos for pos in [self.director, self.specialist, self.supervisor] if pos]
 
-    def get_shifts_now(self, positions: List[Position]) -> List[Shift]:
-        now = datetime.now()
-        today_shifts = self.get_shifts_by_date(now.date(), now.date())
-        return self.filter_shifts(today_shifts, now, now, positions)
-
-    def get_shifts_today(self, positions: List[Position]) -> List[Shift]:
-        now = datetime.now()
-        today_shifts = self.get_shifts_by_date(now.date(), now.date())
-        return self.filter_shifts(today_shifts, datetime(now.year, now.month, now.day),
-                                  datetime(now.year, now.month, now.day, 23, 59), positions)
-
-    def get_shifts_tomorrow(self, positions: List[Position]) -> List[Shift]:
-        tomorrow = datetime.now() + timedelta(days=1)
-        today_shifts = self.get_shifts_by_date(tomorrow.date(), tomorrow.date())
-        return self.filter_shifts(today_shifts, datetime(tomorrow.year, tomorrow.month, tomorrow.day),
-                                  datetime(tomorrow.year, tomorrow.month, tomorrow.day, 23, 59), positions)
-
-    def get_shifts_later(self, positions: List[Position]) -> List[Shift]:
-        now = datetime.now()
-        today_shifts = self.get_shifts_by_date(now.date(), now.date())
-        return self.filter_shifts(today_shifts, now, datetime(now.year, now.month, now.day, 23, 59), positions)
-
-    def get_shifts_earlier(self, positions: List[Position]) -> List[Shift]:
-        now = datetime.now()
-        today_shifts = self.get_shifts_by_date(now.date(), now.date())
-        return self.filter_shifts(today_shifts, datetime(now.year, now.month, now.day), now, positions)
-
-    def get_shifts(self, date_start: date, date_end: date, positions: List[Position]) -> List[Shift]:
-        range_shifts = self.get_shifts_by_date(date_start, date_end)
-        return self.filter_shifts(range_shifts, positions=positions)
-
-    def get_shifts_extreme(self, date_start: date, date_end: date, positions: List[Position],
-                           opener_flag: bool = True) -> List[Shift]:
-        range_shifts = self.get_shifts_by_date(date_start, date_end)
-        rs_filtered_to_position = self.filter_shifts(range_shifts, positions=positions)
-        rs_filtered_dict = self._sort_shifts_by_date_and_position(rs_filtered_to_position)
-        return self._get_extreme_shifts_from_sorted(rs_filtered_dict, opener_flag)
-
-    def shifts_sorted_by_employee(self, dt_start: datetime, dt_end: datetime, positions: List[Position]) -> Dict[
-        Employee, List[Shift]]:
-        range_shifts = self.get_shifts_by_date(dt_start.date(), dt_end.date())
-        rs_filtered_to_position = self.filter_shifts(range_shifts, dt_start, dt_end, positions)
-        return self._sort_shifts_by_employee(rs_filtered_to_position)
-
-    def shifts_sorted_by_position(self, dt_start: datetime, dt_end: datetime, positions: List[Position]) -> Dict[
-        Position, List[Shift]]:
-        range_shifts = self.get_shifts_by_date(dt_start.date(), dt_end.date())
-        rs_filtered_to_position = self.filter_shifts(range_shifts, dt_start, dt_end, positions)
-        return self._sort_shifts_by_position(rs_filtered_to_position)
-
     @staticmethod
     def filter_shifts(shifts: List[Shift], dt_start: datetime = None, dt_end: datetime = None,
                       positions: List[Position] = None):
@@ -171,8 +418,258 @@ class YMCAW2WClient(Client):
 
     @staticmethod
     def unique_employees(shifts: List[Shift]):
-        unique_employees: List[Employee] = []
+        unique_employees: Dict[int, Optional[Employee]] = {}
+        for shift in shifts:
+            unique_employees.setdefault(shift.employee.id if shift.employee else 0, shift.employee)
+        return list(unique_employees.values())
+
+
+class AsyncW2WAdapter:
+    """
+    aiohttp counterpart of whentowork.Adapter. The adapter keeps one pooled session, so connections to the WhenToWork
+    host stay alive between requests. A semaphore bounds how many requests are in flight at once, and every request
+    gives up after timeout seconds.
+    """
+
+    def __init__(self, url: str, api_key: str, timeout: float = DEFAULT_W2W_TIMEOUT,
+                 max_connections: int = DEFAULT_W2W_MAX_CONNECTIONS,
+                 max_concurrency: int = DEFAULT_W2W_MAX_CONCURRENCY,
+                 keepalive_timeout: float = DEFAULT_W2W_KEEPALIVE_TIMEOUT, ssl_verify: bool = True,
+                 logger: logging.Logger = None):
+        self.url: str = url
+        self._api_key: str = api_key
+        self._timeout = aiohttp.ClientTimeout(total=timeout)
+        self._max_connections: int = max_connections
+        self._keepalive_timeout: float = keepalive_timeout
+        self._ssl_verify: bool = ssl_verify
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._logger = logger or log
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # Created on first use so the session binds to the running event loop.
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self._max_connections, keepalive_timeout=self._keepalive_timeout,
+                                             ssl=self._ssl_verify)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self._timeout)
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def _get(self, endpoint: str, ep_params: Dict = None) -> Dict:
+        full_url = self.url + endpoint
+        params = dict(ep_params or {}, key=self._api_key)
+        self._logger.debug(msg=f"method=GET, url={full_url}")
+        async with self._semaphore:
+            try:
+                async with self.session.get(full_url, params=params) as response:
+                    try:
+                        data_out = await response.json(content_type=None)
+                    except ValueError as e:
+                        raise W2WBadRequestException("Bad JSON in response") from e
+                    status, reason = response.status, response.reason
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self._logger.error(msg=f"method=GET, url={full_url}, error={e!r}")
+                raise W2WBadRequestException("Request failed") from e
+        if 299 >= status >= 200:
+            self._logger.debug(msg=f"{True}, {status}, {reason})")
+            return data_out
+        self._logger.error(msg=f"{False}, {status}, {reason})")
+        raise W2WBadRequestException(f"{status}: {reason}")
+
+    async def get_from_endpoint(self, endpoint: str, start_date: date = None, end_date: date = None):
+        if start_date and not isinstance(start_date, date):
+            raise W2WBadType(f"start_date ({start_date}) not valid date type")
+        if end_date and not isinstance(end_date, date):
+            raise W2WBadType(f"end_date ({end_date}) not valid date type")
+        if start_date and end_date:
+            ep_params = {'start_date': start_date.strftime('%m/%d/%Y'), 'end_date': end_date.strftime('%m/%d/%Y')}
+        else:
+            ep_params = None
+        stripped_data = (await self._get(endpoint=endpoint, ep_params=ep_params))[endpoint]
+        return [endpoint_return_classes[endpoint](data=item) for item in stripped_data]
+
+
+class AsyncYMCAW2WClient(BaseYMCAW2WClient):
+    """
+    WhenToWork client for coroutines. Queries are awaitable and go through a pooled AsyncW2WAdapter instead of
+    blocking the event loop. Nothing is fetched on construction: await setup() once before the first query, and
+    close() on shutdown.
+    """
+
+    def __init__(self, hostname: str, token: str, position_ids: YMCAW2WClientPayload,
+                 shift_cache_ttl: float = DEFAULT_SHIFT_CACHE_TTL, timeout: float = DEFAULT_W2W_TIMEOUT,
+                 max_connections: int = DEFAULT_W2W_MAX_CONNECTIONS,
+                 max_concurrency: int = DEFAULT_W2W_MAX_CONCURRENCY, url: Optional[str] = None):
+        self._init_shift_cache(shift_cache_ttl)
+        self._adapter = AsyncW2WAdapter(url or f"https://{hostname}/api/", token, timeout, max_connections,
+                                        max_concurrency, logger=log)
+        self._position_ids: YMCAW2WClientPayload = position_ids
+        self.company_id: int = 0
+        self.employees: List[Employee] = []
+        self.positions: List[Position] = []
+        self.categories: List[Category] = []
+        self.ready: bool = False
+        self._update_w2w_positions(position_ids)
+
+    async def setup(self) -> None:
+        """Loads the company's employees, positions and categories from WhenToWork."""
+        self.employees, self.positions, self.categories = await asyncio.gather(
+            self._adapter.get_from_endpoint('EmployeeList'), self._adapter.get_from_endpoint('PositionList'),
+            self._adapter.get_from_endpoint('CategoryList'))
+        self.company_id = self.employees[0].company_id if self.employees else 0
+        self._update_w2w_positions(self._position_ids)
+        self.ready = True
+
+    async def close(self) -> None:
+        await self._adapter.close()
+
+    async def _update_items(self, items_attr: str, endpoint: str) -> bool:
+        items = getattr(self, items_attr)
+        updated = False
+        for item in await self._adapter.get_from_endpoint(endpoint):
+            if item not in items:
+                items.append(item)
+                updated = True
+        return updated
+
+    async def _get_by_id(self, items_attr: str, endpoint: str, item_id: int):
+        if not isinstance(item_id, int):
+            raise TypeError(f"{items_attr[:-1]} id must be an integer")
+        item = self._find_by_id(getattr(self, items_attr), item_id)
+        if item is None and item_id != 0 and await self._update_items(items_attr, endpoint):
+            item = self._find_by_id(getattr(self, items_attr), item_id)
+        return item
+
+    async def get_employee_by_id(self, w2w_employee_id: int) -> Optional[Employee]:
+        return await self._get_by_id('employees', 'EmployeeList', w2w_employee_id)
+
+    async def get_position_by_id(self, position_id: int) -> Optional[Position]:
+        return await self._get_by_id('positions', 'PositionList', position_id)
+
+    async def get_category_by_id(self, category_id: int) -> Optional[Category]:
+        return await self._get_by_id('categories', 'CategoryList', category_id)
+
+    async def _fetch_shifts(self, start_date: date, end_date: date) -> List[Shift]:
+        partitions = await asyncio.gather(*(
+            self._adapter.get_from_endpoint('AssignedShiftList', partition_start, partition_end)
+            for partition_start, partition_end in Client.request_date_partitions(start_date, end_date)))
+        shifts = [shift for partition in partitions for shift in partition]
+        # Refresh each lookup list at most once per fetch rather than once per unknown shift.
+        for items_attr, endpoint, id_attr in (('employees', 'EmployeeList', 'w2w_employee_id'),
+                                              ('positions', 'PositionList', 'position_id'),
+                                              ('categories', 'CategoryList', 'category_id')):
+            known = {item.id for item in getattr(self, items_attr)}
+            if any(getattr(shift, id_attr) not in known for shift in shifts if getattr(shift, id_attr)):
+                await self._update_items(items_attr, endpoint)
+        employees = {employee.id: employee for employee in self.employees}
+        positions = {position.id: position for position in self.positions}
+        categories = {category.id: category for category in self.categories}
         for shift in shifts:
-            if shift.employee not in unique_employees:
-                unique_employees.append(shift.employee)
-        return unique_employees
+            shift.employee = employees.get(shift.w2w_employee_id)
+            shift.position = positions.get(shift.position_id)
+            shift.category = categories.get(shift.category_id)
+        return shifts
+
+    async def _shift_indexes(self, start_date: date, end_date: date) -> List[ShiftIndex]:
+        days, missing = self._missing_shift_days(start_date, end_date)
+        runs, joined = self._claim_shift_days(missing, asyncio.get_running_loop().create_future)
+        # Shielded so a caller that gets cancelled does not cancel a fetch other callers are waiting on.
+        await asyncio.gather(*(self._fetch_shift_run(run_start, run_end, fetch) for run_start, run_end, fetch in runs),
+                             *(asyncio.shield(fetch) for fetch in joined))
+        return self._cached_shift_indexes(days)
+
+    async def _fetch_shift_run(self, start_date: date, end_date: date, fetch: asyncio.Future,
+                               ttl: Optional[float] = None) -> None:
+        try:
+            self._store_shift_days(start_date, end_date, await self._fetch_shifts(start_date, end_date), ttl)
+        except asyncio.CancelledError:
+            self._finish_shift_fetch(start_date, end_date, fetch, W2WBadRequestException("Request cancelled"))
+            raise
+        except Exception as e:
+            self._finish_shift_fetch(start_date, end_date, fetch, e)
+            raise
+        self._finish_shift_fetch(start_date, end_date, fetch)
+
+    async def prefetch_shifts(self, today: Optional[date] = None) -> int:
+        """
+        Refetches every day from today through the last SHIFT_PREFETCH_TIERS offset whose copy is older than its
+        tier's refresh interval. Refreshed days stay valid for twice that interval, so queries keep reading them from
+        memory as long as prefetch_shifts runs more often than the shortest interval.
+
+        Returns:
+            int: The number of days refetched.
+        """
+        today = today or date.today()
+        now = time.monotonic()
+        first_offset = 0
+        due_by_interval: Dict[float, List[date]] = {}
+        for last_offset, interval in SHIFT_PREFETCH_TIERS:
+            for offset in range(first_offset, last_offset + 1):
+                day = today + timedelta(days=offset)
+                if day not in self._shift_cache or now - self._shift_cache[day][0] >= interval:
+                    due_by_interval.setdefault(interval, []).append(day)
+            first_offset = last_offset + 1
+        fetches = []
+        for interval, due in due_by_interval.items():
+            runs, joined = self._claim_shift_days(due, asyncio.get_running_loop().create_future)
+            fetches.extend(self._fetch_shift_run(run_start, run_end, fetch, interval * 2)
+                           for run_start, run_end, fetch in runs)
+            fetches.extend(asyncio.shield(fetch) for fetch in joined)
+        await asyncio.gather(*fetches)
+        return sum(len(due) for due in due_by_interval.values())
+
+    async def get_shifts_by_date(self, start_date: date, end_date: date) -> List[Shift]:
+        return self._unique_shifts(index.shifts for index in await self._shift_indexes(start_date, end_date))
+
+    async def query_shifts(self, start_date: date, end_date: date, dt_start: Optional[datetime] = None,
+                           dt_end: Optional[datetime] = None, positions: Optional[List[Position]] = None
+                           ) -> List[Shift]:
+        return self._unique_shifts(index.overlapping(dt_start, dt_end, positions)
+                                   for index in await self._shift_indexes(start_date, end_date))
+
+    async def get_shifts_now(self, positions: List[Position]) -> List[Shift]:
+        now = datetime.now()
+        return await self.query_shifts(now.date(), now.date(), now, now, positions)
+
+    async def get_shifts_today(self, positions: List[Position]) -> List[Shift]:
+        now = datetime.now()
+        return await self.query_shifts(now.date(), now.date(), datetime(now.year, now.month, now.day),
+                                       datetime(now.year, now.month, now.day, 23, 59), positions)
+
+    async def get_shifts_tomorrow(self, positions: List[Position]) -> List[Shift]:
+        tomorrow = datetime.now() + timedelta(days=1)
+        return await self.query_shifts(tomorrow.date(), tomorrow.date(),
+                                       datetime(tomorrow.year, tomorrow.month, tomorrow.day),
+                                       datetime(tomorrow.year, tomorrow.month, tomorrow.day, 23, 59), positions)
+
+    async def get_shifts_later(self, positions: List[Position]) -> List[Shift]:
+        now = datetime.now()
+        return await self.query_shifts(now.date(), now.date(), now, datetime(now.year, now.month, now.day, 23, 59),
+                                       positions)
+
+    async def get_shifts_earlier(self, positions: List[Position]) -> List[Shift]:
+        now = datetime.now()
+        return await self.query_shifts(now.date(), now.date(), datetime(now.year, now.month, now.day), now,
+                                       positions)
+
+    async def get_shifts(self, date_start: date, date_end: date, positions: List[Position]) -> List[Shift]:
+        return await self.query_shifts(date_start, date_end, positions=positions)
+
+    async def get_shifts_extreme(self, date_start: date, date_end: date, positions: List[Position],
+                                 opener_flag: bool = True) -> List[Shift]:
+        return self._unique_shifts(index.extremes(positions, opener_flag)
+                                   for index in await self._shift_indexes(date_start, date_end))
+
+    async def shifts_sorted_by_employee(self, dt_start: datetime, dt_end: datetime, positions: List[Position]
+                                        ) -> Dict[Employee, List[Shift]]:
+        return self._sort_shifts_by_employee(
+            await self.query_shifts(dt_start.date(), dt_end.date(), dt_start, dt_end, positions))
+
+    async def shifts_sorted_by_position(self, dt_start: datetime, dt_end: datetime, positions: List[Position]
+                                        ) -> Dict[Position, List[Shift]]:
+        return self._sort_shifts_by_position(
+            await self.query_shifts(dt_start.date(), dt_end.date(), dt_start, dt_end, positions))
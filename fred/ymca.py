@@ -1,23 +1,35 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import time
 from typing import TYPE_CHECKING
 
 from discord import Guild
 
-from fred import Branch, YMCADatabase
+from fred import Branch, IdentityCache, YMCADatabase, AsyncYMCADatabase
 from settings import SETTINGS_DICT
 
 if TYPE_CHECKING:
-    from typing import Dict, List
+    from typing import Awaitable, Callable, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+# Seconds a branch may spend connecting to WhenToWork and loading its pools before startup moves on without it.
+BRANCH_STARTUP_TIMEOUT = 60.0
+# Branches that may run a pipeline such as RSS ingestion at once, unless config.json sets branch_concurrency.
+DEFAULT_BRANCH_CONCURRENCY = 4
 
 
 class YMCA:
     def __init__(self, name: str):
         self.name: str = name
+        self.identity_cache: IdentityCache = IdentityCache()
         self.branches: Dict[str, Branch] = {
-            branch_id: Branch(self, branch_id, branch) for branch_id, branch in SETTINGS_DICT['branches'].items() if
-            branch_id == '007'}
+            branch_id: Branch(self, branch_id, branch) for branch_id, branch in SETTINGS_DICT['branches'].items()}
+        self.branch_concurrency: int = SETTINGS_DICT.get('branch_concurrency', DEFAULT_BRANCH_CONCURRENCY)
         self.database: YMCADatabase = YMCADatabase(self)
+        self.async_database: AsyncYMCADatabase = AsyncYMCADatabase(self.database)
 
     def get_branch_by_guild_id(self, guild_id: int):
         for branch in self.branches.values():
@@ -31,5 +43,51 @@ class YMCA:
                     branch.guild = guild
                 elif branch.test_guild_id == guild.id:
                     branch.test_guild = guild
-            branch.init_w2w_positions()
-            branch.update_pool_groups()
+            branch.update_name_index()
+        self.identity_cache.clear()
+
+    async def start(self, timeout: float = BRANCH_STARTUP_TIMEOUT):
+        """
+        Starts every branch at once, each limited to timeout seconds, so a
+        slow or unreachable branch does not hold up the others.
+        """
+        await self.run_branches(lambda branch, timings: branch.start(timings), 'startup',
+                                concurrency=max(len(self.branches), 1), timeout=timeout)
+
+    async def run_branches(self, func: Callable[[Branch, Dict[str, float]], Awaitable[None]], label: str,
+                           concurrency: Optional[int] = None, timeout: Optional[float] = None) -> Dict[str, bool]:
+        """
+        Runs func for every branch concurrently, at most concurrency
+        (default branch_concurrency) at a time. A branch that raises or runs
+        past timeout seconds is logged and does not affect the others. func
+        receives a dict to record its per-phase durations in, which are
+        logged with each branch's outcome.
+
+        Returns:
+            Dict[str, bool]: Whether each branch, by branch ID, finished.
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.branch_concurrency)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(self._run_branch(branch, func, label, semaphore, timeout)
+                                         for branch in self.branches.values()))
+        log.log(logging.INFO, f"{label}: {sum(results)} of {len(results)} branches finished in "
+                              f"{time.perf_counter() - start:.2f}s")
+        return dict(zip(self.branches, results))
+
+    @staticmethod
+    async def _run_branch(branch: Branch, func: Callable[[Branch, Dict[str, float]], Awaitable[None]], label: str,
+                          semaphore: asyncio.Semaphore, timeout: Optional[float]) -> bool:
+        async with semaphore:
+            timings: Dict[str, float] = {}
+            start = time.perf_counter()
+            level, outcome = logging.INFO, 'finished'
+            try:
+                await asyncio.wait_for(func(branch, timings), timeout)
+            except asyncio.TimeoutError:
+                level, outcome = logging.WARNING, f'timed out after {timeout:g}s'
+            except Exception as e:
+                level, outcome = logging.ERROR, f'failed: {str(e)}'
+            phases = ', '.join(f'{phase} {seconds:.2f}s' for phase, seconds in timings.items())
+            log.log(level, f"Branch {branch.name} {label} {outcome} in {time.perf_counter() - start:.2f}s "
+                           f"({phases or 'no phases'})")
+            return level == logging.INFO
@@ -0,0 +1,63 @@
+import csv
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import TestCase
+
+from fred import YMCADatabase, CSVBackfill
+
+CHEM_COLUMNS = ['Unique ID', 'Your Name (First)', 'Your Name (Last)', 'Date/Time', 'Time', 'Chlorine', 'PH',
+                'Water Temperature', 'Total Number of Swimmers']
+
+
+class CSVBackfillCase(TestCase):
+    def setUp(self):
+        self.database = YMCADatabase(None, ':memory:')
+        self.database.migrate()
+        self.branch = SimpleNamespace(
+            branch_id='007', name='Test', aliases=[], pool_groups=[],
+            guild=SimpleNamespace(members=[SimpleNamespace(id=1, display_name='Jane Doe')]),
+            last_chem_id=0, last_vat_id=0, last_opening_id=0, last_closing_id=0, last_in_service_id=0)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'chems.csv')
+
+    def tearDown(self):
+        self.database.connection.close()
+        self.directory.cleanup()
+
+    def write_chems(self, uuids):
+        with open(self.path, 'w', newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, CHEM_COLUMNS)
+            writer.writeheader()
+            for uuid in uuids:
+                writer.writerow({'Unique ID': uuid, 'Your Name (First)': 'Jane', 'Your Name (Last)': 'Doe',
+                                 'Date/Time': f'Jan {uuid:02}, 2024 08:00 AM', 'Time': f'2024-01-{uuid:02} 08:05:00',
+                                 'Chlorine': '1.0', 'PH': '7.4', 'Water Temperature': '82 degrees',
+                                 'Total Number of Swimmers': '3'})
+
+    def test_backfill_inserts_every_row(self):
+        self.write_chems(range(1, 6))
+        backfill = CSVBackfill(self.database, self.branch, chunk_size=2)
+        self.assertEqual(backfill.run('chems', self.path), 5)
+        self.assertEqual(backfill.discord_ids, {('Jane', 'Doe'): 1})
+        self.assertEqual(self.database.select_last_chem(self.branch, SimpleNamespace(pool_id='')).discord_id, 1)
+
+    def test_backfill_resumes_from_checkpoint(self):
+        self.write_chems(range(1, 4))
+        CSVBackfill(self.database, self.branch, chunk_size=2).run('chems', self.path)
+        self.write_chems(range(1, 6))
+        backfill = CSVBackfill(self.database, self.branch, chunk_size=2)
+        self.assertEqual(backfill.run('chems', self.path), 2)
+        self.assertEqual(backfill.select_checkpoint(backfill.checkpoint_feed('chems', self.path)), 5)
+
+    def test_exports_with_the_same_name_keep_separate_checkpoints(self):
+        self.write_chems(range(1, 4))
+        CSVBackfill(self.database, self.branch, chunk_size=2).run('chems', self.path)
+        first_path = self.path
+        os.mkdir(os.path.join(self.directory.name, 'other'))
+        self.path = os.path.join(self.directory.name, 'other', 'chems.csv')
+        self.write_chems(range(4, 6))
+        backfill = CSVBackfill(self.database, self.branch, chunk_size=2)
+        self.assertEqual(backfill.run('chems', self.path), 2)
+        self.assertEqual(backfill.select_checkpoint(backfill.checkpoint_feed('chems', first_path)), 3)
+        self.assertEqual(backfill.select_checkpoint(backfill.checkpoint_feed('chems', self.path)), 2)
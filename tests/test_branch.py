@@ -1,17 +1,21 @@
-from unittest import TestCase
+from unittest import IsolatedAsyncioTestCase
 from whentowork import Employee
 import fred
 from settings import SETTINGS_DICT
 
 
-class BranchTestCase(TestCase):
-    def setUp(self):
+class BranchTestCase(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
         ymca = fred.YMCA('YMCA of Delaware')
         self.branch_western = ymca.branches['007']
+        await self.branch_western.async_w2w_client.setup()
+
+    async def asyncTearDown(self):
+        await self.branch_western.async_w2w_client.close()
         
     def test_branch_name(self):
         self.assertEqual('Western', self.branch_western.name)
 
-    def test_get_w2w_employee_by_id(self):
-        test_emp = self.branch_western.get_w2w_employee_by_id(564685546)
+    async def test_get_w2w_employee_by_id(self):
+        test_emp = await self.branch_western.get_w2w_employee_by_id(564685546)
         self.assertIsInstance(test_emp, Employee)
\ No newline at end of file
@@ -1,19 +1,87 @@
 import datetime
-from unittest import TestCase
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase, TestCase
 from unittest.mock import MagicMock
 
-from fred import YMCA, SupervisorReport, ReportType
+from fred import YMCA, YMCADatabase, AsyncYMCADatabase, GuardReport, SupervisorReport, ReportType, VAT
+from fred.dashboard import ReportItem, ShiftReport
 
 
-class DashboardCase(TestCase):
-    def setUp(self):
+class DashboardCase(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
         ymca = YMCA('YMCA of Delaware')
         self.test_branch = ymca.branches['007']
+        await self.test_branch.async_w2w_client.setup()
+
+    async def asyncTearDown(self):
+        await self.test_branch.async_w2w_client.close()
 
-    def test_vat_supervisor_dashboard(self):
+    async def test_vat_supervisor_dashboard(self):
         test_dashboard = SupervisorReport(ReportType.MTD, datetime.datetime.now())
         test_user = MagicMock()
         test_user.display_name = "TEST"
-        test_dashboard.run_report(self.test_branch, test_user)
+        await test_dashboard.run_report(self.test_branch, test_user)
         test_dashboard.send_report_plot()
         self.assertIsNotNone(test_dashboard)
+
+
+class ShiftReportCase(TestCase):
+    def setUp(self):
+        start = datetime.datetime(2024, 1, 14, 9)
+        self.shift_report = ShiftReport()
+        self.shift_report.shifts = [
+            SimpleNamespace(start_datetime=start + datetime.timedelta(days=day),
+                            end_datetime=start + datetime.timedelta(days=day, hours=4), duration=4.0,
+                            employee=None, position=None) for day in range(3)]
+
+    def test_totals(self):
+        self.assertEqual(self.shift_report.num_of_shifts, 3)
+        self.assertEqual(self.shift_report.total_hours, 12.0)
+        self.assertTrue(self.shift_report.during_shifts(datetime.datetime(2024, 1, 15, 13)))
+        self.assertFalse(self.shift_report.during_shifts(datetime.datetime(2024, 1, 15, 14)))
+
+    def test_shifts_with_unique_items(self):
+        item = ReportItem(self.shift_report, 'VAT')
+        item.items = [SimpleNamespace(time=datetime.datetime(2024, 1, 14, 10)),
+                      SimpleNamespace(time=datetime.datetime(2024, 1, 14, 11)),
+                      SimpleNamespace(time=datetime.datetime(2024, 1, 16, 13)),
+                      SimpleNamespace(time=None)]
+        self.assertEqual(item.num_shifts_with_unique, 2)
+        self.assertAlmostEqual(item.shift_unique_percentage, 2 / 3)
+
+
+class FakeW2WClient:
+    lifeguard_positions = []
+    supervisor = swim_instructor = None
+
+    def __init__(self):
+        self.queries = []
+
+    async def query_shifts(self, start_date, end_date, dt_start=None, dt_end=None, positions=None):
+        self.queries.append((start_date, end_date))
+        return []
+
+
+class GuardReportCase(IsolatedAsyncioTestCase):
+    def setUp(self):
+        database = YMCADatabase(None, ':memory:')
+        database.migrate()
+        self.async_database = AsyncYMCADatabase(database)
+        role = SimpleNamespace(id=5)
+        guard = SimpleNamespace(id=1, display_name='John Smith', roles=[role])
+        guild = SimpleNamespace(members=[guard], get_role=lambda role_id: role, get_member=lambda member_id: guard)
+        self.branch = SimpleNamespace(branch_id='007', guild=guild, guild_role_ids={'lifeguard': 5},
+                                      async_w2w_client=FakeW2WClient(),
+                                      ymca=SimpleNamespace(async_database=self.async_database))
+        database.insert_vats(self.branch, [VAT(uuid, guard_discord_id=1, time=datetime.datetime(2024, 1, uuid, 12))
+                                           for uuid in range(1, 4)])
+
+    def tearDown(self):
+        self.async_database.close()
+
+    async def test_ytd_report_reads_async_client_and_vats(self):
+        report = GuardReport(ReportType.YTD, datetime.datetime(2024, 3, 1))
+        await report.run_report(self.branch, SimpleNamespace(display_name='Admin'), include_vats=True)
+        self.assertEqual(self.branch.async_w2w_client.queries, [(datetime.date(2024, 1, 1), datetime.date(2024, 3, 1))])
+        self.assertEqual([guard.vats.num for guard in report.guards], [3])
+        self.assertEqual([vat.vat_uuid for vat in report.guards[0].vats.items], [1, 2, 3])
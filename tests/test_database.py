@@ -1,12 +1,17 @@
-from unittest import TestCase
-from fred import YMCA
+import datetime
+import os
+import sqlite3
+import tempfile
+import threading
+from types import SimpleNamespace
+from unittest import TestCase, IsolatedAsyncioTestCase, mock
+from fred import YMCA, YMCADatabase, AsyncYMCADatabase, ChemCheck, VAT, database
 import discord
 
 class YMCADatabaseCase(TestCase):
     def setUp(self):
         ymca = YMCA('YMCA of Delaware')
         self.test_branch = ymca.branches['007']
-        self.test_employee = self.test_branch.w2w_client.employees[0]
         self.test_pool = self.test_branch.pool_groups[0].pools[0]
         self.database = ymca.database
 
@@ -17,4 +22,360 @@ class YMCADatabaseCase(TestCase):
     def test_select_last_chem(self):
         last_chem = self.database.select_last_chem(self.test_branch, self.test_pool)
         print(last_chem)
-        self.assertIsNotNone(last_chem)
\ No newline at end of file
+        self.assertIsNotNone(last_chem)
+
+class AsyncYMCADatabaseCase(IsolatedAsyncioTestCase):
+    def setUp(self):
+        database = YMCADatabase(None, ':memory:')
+        database.migrate()
+        self.async_database = AsyncYMCADatabase(database)
+        self.test_branch = IngestionStateCase.new_branch()
+        self.test_pool = SimpleNamespace(pool_id='007-01-01')
+
+    def tearDown(self):
+        self.async_database.close()
+
+    async def test_select_last_chem(self):
+        await self.async_database.insert_chems(self.test_branch, [
+            ChemCheck(1, 1.0, 7.4, pool_id='007-01-01', time=datetime.datetime(2024, 1, 1, 8)),
+            ChemCheck(2, 1.0, 7.4, pool_id='007-01-01', time=datetime.datetime(2024, 1, 1, 10))], feed='chems')
+        last_chem = await self.async_database.select_last_chem(self.test_branch, self.test_pool)
+        self.assertIsInstance(last_chem, ChemCheck)
+        self.assertEqual(2, last_chem.chem_uuid)
+
+    async def test_resolve_many_writes_new_employees_on_the_writer_thread(self):
+        member = SimpleNamespace(id=1, display_name='John Smith')
+        branch = SimpleNamespace(branch_id='007', name='Test', name_index=None,
+                                 guild=SimpleNamespace(members=[member], get_member={1: member}.get))
+        employee = SimpleNamespace(id=10, first_name='John', last_name='Smith', emails=[], custom_field_2='')
+        insert_threads = []
+        insert = self.async_database.database.insert_new_w2w_employees
+
+        def recording_insert(*args):
+            insert_threads.append(threading.current_thread().name)
+            insert(*args)
+
+        with mock.patch.object(self.async_database.database, 'insert_new_w2w_employees', recording_insert):
+            for _ in range(2):
+                self.assertEqual(await self.async_database.resolve_many(branch, [employee, employee]), {10: member})
+        self.assertEqual(len(insert_threads), 1)
+        self.assertTrue(insert_threads[0].startswith('fred-db-writer'))
+
+    async def test_writes_run_on_the_writer_thread(self):
+        thread_name = await self.async_database.run_write(lambda: threading.current_thread().name)
+        self.assertTrue(thread_name.startswith('fred-db-writer'))
+
+
+class MigrationCase(TestCase):
+    def setUp(self):
+        self.database = YMCADatabase(None, ':memory:')
+
+    def tearDown(self):
+        self.database.connection.close()
+
+    def test_migrate_applies_all_pending(self):
+        applied = self.database.migrate()
+        self.assertEqual([version for version, _ in self.database.available_migrations()], applied)
+
+    def test_migrate_skips_when_current(self):
+        self.database.migrate()
+        self.assertEqual([], self.database.migrate())
+
+    def migrate_before_epoch(self, *vat_times):
+        self.database.applied_migrations()
+        for version, file_name in self.database.available_migrations():
+            if version >= 4:
+                break
+            with open(os.path.join(database.MIGRATIONS_DIR, file_name)) as file:
+                self.database.connection.executescript(file.read())
+            self.database.connection.execute("INSERT INTO schema_version VALUES(?, ?, '');", (version, file_name))
+        self.database.connection.executemany(
+            "INSERT INTO vats VALUES(?, NULL, 'Guard', NULL, 'Sup', '007', '007-01-01', ?, ?, 10, 1, 'Manikin', 4.5, "
+            "10.0);", [(i + 1, vat_time, vat_time) for i, vat_time in enumerate(vat_times)])
+        self.database.connection.commit()
+
+    def test_epoch_migration_converts_text_timestamps(self):
+        self.migrate_before_epoch('2024-01-30 20:28:00')
+        self.database.migrate()
+        vat = self.database.select_last_vat(SimpleNamespace(branch_id='007'))
+        self.assertEqual(datetime.datetime(2024, 1, 30, 20, 28), vat.time)
+        self.assertEqual('integer',
+                         self.database.connection.execute("SELECT typeof(vat_time) FROM vats;").fetchone()[0])
+
+    def test_epoch_migration_converts_legacy_rss_timestamps(self):
+        self.migrate_before_epoch('Jan 29, 2024 08:15 AM', 'January 30, 2024 08:28 PM')
+        self.database.migrate()
+        self.assertEqual([datetime.datetime(2024, 1, 29, 8, 15), datetime.datetime(2024, 1, 30, 20, 28)],
+                         [row[0] for row in self.database.connection.execute(
+                             "SELECT vat_time FROM vats ORDER BY vat_uuid;")])
+
+    def test_epoch_migration_converts_iso_and_offset_timestamps(self):
+        self.migrate_before_epoch('2024-01-30T20:28:00', '2024-01-30T20:29:00.500000', '2024-01-30 20:30:00+00:00')
+        self.database.migrate()
+        self.assertEqual([datetime.datetime(2024, 1, 30, 20, 28), datetime.datetime(2024, 1, 30, 20, 29),
+                          database.dbh.to_local(datetime.datetime(2024, 1, 30, 20, 30, tzinfo=datetime.timezone.utc))],
+                         [row[0] for row in self.database.connection.execute(
+                             "SELECT vat_time FROM vats ORDER BY vat_uuid;")])
+
+    def test_epoch_migration_stores_missing_timestamps_as_null(self):
+        self.migrate_before_epoch('2024-01-30 20:28:00', 'None', '')
+        self.database.migrate()
+        self.assertIn(4, self.database.applied_migrations())
+        self.assertEqual([datetime.datetime(2024, 1, 30, 20, 28), None, None],
+                         [row[0] for row in self.database.connection.execute(
+                             "SELECT vat_time FROM vats ORDER BY vat_uuid;")])
+
+    def test_epoch_migration_fails_on_unknown_timestamps(self):
+        self.migrate_before_epoch('2024-01-30 20:28:00', 'last Tuesday')
+        with self.assertLogs(level='ERROR'), self.assertRaises(sqlite3.OperationalError):
+            self.database.migrate()
+        self.assertEqual(2, self.database.connection.execute("SELECT COUNT(*) FROM vats;").fetchone()[0])
+        self.assertNotIn(4, self.database.applied_migrations())
+
+
+class ConnectionPoolCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.database = YMCADatabase(None, os.path.join(self.directory.name, 'test.db'), read_pool_size=2)
+        self.database.migrate()
+
+    def tearDown(self):
+        self.database.close()
+        self.directory.cleanup()
+
+    def test_writer_uses_wal(self):
+        self.assertEqual('wal', self.database.connection.execute('PRAGMA journal_mode;').fetchone()[0])
+
+    def test_readers_are_read_only(self):
+        with self.database.reader() as connection:
+            with self.assertRaises(sqlite3.OperationalError):
+                connection.execute("INSERT INTO branches VALUES('999', 'Test');")
+
+    def test_read_pool_is_bounded(self):
+        with self.database.reader() as first, self.database.reader() as second:
+            self.assertIsNot(first, second)
+        with self.database.reader():
+            pass
+        self.assertEqual(2, len(self.database._read_connections))
+
+
+class LatestSubmissionsCase(TestCase):
+    def setUp(self):
+        self.database = YMCADatabase(None, ':memory:')
+        self.database.migrate()
+        self.branch = SimpleNamespace(branch_id='007')
+        self.database.insert_chems(self.branch, [
+            ChemCheck(1, 1.0, 7.4, pool_id='007-01-01', time=datetime.datetime(2024, 1, 1, 8),
+                      submit_time=datetime.datetime(2024, 1, 1, 8, 5)),
+            ChemCheck(2, 1.0, 7.4, pool_id='007-01-01', time=datetime.datetime(2024, 1, 1, 10),
+                      submit_time=datetime.datetime(2024, 1, 1, 10, 5)),
+            ChemCheck(3, 1.0, 7.4, pool_id='007-02-01', time=datetime.datetime(2024, 1, 1, 9),
+                      submit_time=datetime.datetime(2024, 1, 1, 9, 5))
+        ])
+
+    def tearDown(self):
+        self.database.connection.close()
+
+    def test_select_last_chems_by_pool(self):
+        last_chems = self.database.select_last_chems_by_pool(self.branch)
+        self.assertEqual({'007-01-01': 2, '007-02-01': 3},
+                         {pool_id: chem.chem_uuid for pool_id, chem in last_chems.items()})
+
+    def test_select_last_chems_missing_pool(self):
+        pools = [SimpleNamespace(pool_id='007-02-01'), SimpleNamespace(pool_id='007-03-01')]
+        self.assertEqual([3, 0], [chem.chem_uuid for chem in self.database.select_last_chems(self.branch, pools)])
+
+    def test_select_last_chems_by_pool_raises_database_errors(self):
+        self.database.connection.execute("DROP TABLE chem_checks;")
+        with self.assertRaises(sqlite3.OperationalError):
+            self.database.select_last_chems_by_pool(self.branch)
+
+    def test_single_and_range_selects_raise_database_errors(self):
+        self.database.connection.executescript("DROP TABLE chem_checks; DROP TABLE vats;")
+        start_dt, end_dt = datetime.datetime(2024, 1, 1), datetime.datetime(2024, 1, 2)
+        for select in (lambda: self.database.select_last_chem(self.branch, SimpleNamespace(pool_id='007-01-01')),
+                       lambda: self.database.select_last_vat(self.branch),
+                       lambda: self.database.select_vats(self.branch, start_dt, end_dt),
+                       lambda: self.database.select_chems(self.branch, start_dt, end_dt)):
+            with self.assertRaises(sqlite3.OperationalError):
+                select()
+
+
+class IngestionStateCase(TestCase):
+    def setUp(self):
+        self.database = YMCADatabase(None, ':memory:')
+        self.database.migrate()
+
+    def tearDown(self):
+        self.database.connection.close()
+
+    @staticmethod
+    def new_branch():
+        return SimpleNamespace(branch_id='007', name='Test', last_chem_id=0, last_vat_id=0, last_opening_id=0,
+                               last_closing_id=0, last_in_service_id=0)
+
+    def test_insert_advances_high_water_mark(self):
+        branch = self.new_branch()
+        self.database.insert_chems(branch, [ChemCheck(5, 1.0, 7.4), ChemCheck(9, 1.0, 7.4)], feed='chems')
+        self.assertEqual(branch.last_chem_id, 9)
+
+    def test_high_water_mark_survives_restart(self):
+        self.database.insert_chems(self.new_branch(), [ChemCheck(9, 1.0, 7.4)], feed='chems')
+        self.database.insert_chems(self.new_branch(), [ChemCheck(4, 1.0, 7.4)], feed='chems')
+        branch = self.new_branch()
+        self.database.init_ingestion_state(branch)
+        self.assertEqual(branch.last_chem_id, 9)
+        self.assertEqual(branch.last_vat_id, 0)
+
+
+class RSSRoutingCase(TestCase):
+    def setUp(self):
+        self.database = YMCADatabase(None, ':memory:')
+        self.branch = IngestionStateCase.new_branch()
+        self.branch.rss_links = {'chems': 'chems-link', 'vats': 'vats-link', 'oc': 'oc-link'}
+        self.branch.last_opening_id = 1
+        checklist_key = database.CHECKLIST_TYPE_KEY
+        self.feeds = {'chems-link': [{'Unique ID': 4}], 'vats-link': [],
+                      'oc-link': [{'Unique ID': 1, checklist_key: 'Opening Checklist'},
+                                  {'Unique ID': 2, checklist_key: 'Closing Checklist'},
+                                  {'Unique ID': 3, checklist_key: 'Opening Checklist'}]}
+        decoder = SimpleNamespace(from_rss_entry=lambda branch, entry: entry['Unique ID'])
+        self.enterContext(mock.patch.dict(database.RSS_FEEDS, {
+            feed: (link_key, checklist, decoder) for feed, (link_key, checklist, _) in database.RSS_FEEDS.items()}))
+        self.fetch = self.enterContext(mock.patch.object(database.rss, 'form_rss_to_dict',
+                                                         side_effect=lambda link: self.feeds[link]))
+
+    def tearDown(self):
+        self.database.connection.close()
+
+    def test_shared_link_is_fetched_once_and_routed(self):
+        collected = self.database.collect_rss(self.branch)
+        self.assertEqual(collected, {'chems': [4], 'vats': [], 'opening': [3], 'closing': [2]})
+        self.assertEqual(sorted(call.args[0] for call in self.fetch.call_args_list),
+                         ['chems-link', 'oc-link', 'vats-link'])
+
+    def test_single_feed_fetches_its_own_link(self):
+        self.assertEqual(YMCADatabase.submissions_from_rss(self.branch, 'closing'), [2])
+        self.fetch.assert_called_once_with('oc-link')
+
+
+class W2WIdentityCase(TestCase):
+    def setUp(self):
+        self.database = YMCADatabase(None, ':memory:')
+        self.database.init_database()
+        members = {1: SimpleNamespace(id=1, display_name='John Smith'),
+                   2: SimpleNamespace(id=2, display_name='Jane Doe')}
+        self.branch = SimpleNamespace(branch_id='007', name='Test', name_index=None,
+                                      guild=SimpleNamespace(members=list(members.values()), get_member=members.get))
+        self.employees = [SimpleNamespace(id=10, first_name='John', last_name='Smith', emails=[], custom_field_2=''),
+                          SimpleNamespace(id=11, first_name='Jane', last_name='Doe', emails=[], custom_field_2=''),
+                          SimpleNamespace(id=12, first_name='Nobody', last_name='Here', emails=[], custom_field_2='')]
+
+    def tearDown(self):
+        self.database.connection.close()
+
+    def test_resolve_many(self):
+        resolved = self.database.resolve_many(self.branch, self.employees + self.employees[:1])
+        self.assertEqual({w2w_id: member.id if member else None for w2w_id, member in resolved.items()},
+                         {10: 1, 11: 2, 12: None})
+
+    def test_identity_map_reloads_from_database(self):
+        self.database.resolve_many(self.branch, self.employees)
+        self.database.w2w_discord_ids = {}
+        self.database.init_w2w_discord_ids()
+        self.assertEqual(self.database.w2w_discord_ids, {10: 1, 11: 2, 12: None})
+
+    def test_roster_sync_skips_valid_matches(self):
+        self.branch.async_w2w_client = SimpleNamespace(employees=self.employees)
+        self.database.init_w2w_users(self.branch)
+        self.branch.guild.members[0].display_name = 'Someone Else'
+        self.database.init_w2w_users(self.branch)
+        self.assertEqual(self.database.w2w_discord_ids, {10: 1, 11: 2, 12: None})
+
+    def test_roster_sync_matches_across_process_pool(self):
+        self.database.roster_process_pool_threshold = 1
+        self.branch.name_index = database.dbh.NameIndex(self.branch.guild.members)
+        self.branch.async_w2w_client = SimpleNamespace(employees=self.employees)
+        self.database.init_w2w_users(self.branch)
+        self.assertEqual(self.database.w2w_discord_ids, {10: 1, 11: 2, 12: None})
+
+    def test_roster_sync_leaves_claimed_member_unmatched(self):
+        duplicate = SimpleNamespace(id=13, first_name='John', last_name='Smith', emails=[], custom_field_2='')
+        self.branch.async_w2w_client = SimpleNamespace(employees=self.employees + [duplicate])
+        self.database.init_w2w_users(self.branch)
+        self.assertEqual(self.database.w2w_discord_ids, {10: 1, 11: 2, 12: None, 13: None})
+
+    def test_claimed_match_does_not_recurse(self):
+        duplicate = SimpleNamespace(id=13, first_name='John', last_name='Smith', emails=[], custom_field_2='')
+        self.database.resolve_many(self.branch, self.employees[:1])
+        self.assertIsNone(self.database.select_discord_user(self.branch, duplicate))
+
+
+class DiscordUserSyncCase(TestCase):
+    def setUp(self):
+        self.database = YMCADatabase(None, ':memory:')
+        self.database.migrate()
+        self.members = [SimpleNamespace(id=1, name='jsmith', display_name='John Smith'),
+                        SimpleNamespace(id=2, name='jdoe', display_name='Jane Doe')]
+        self.branch = SimpleNamespace(branch_id='007', name='Test', guild=SimpleNamespace(members=self.members))
+        self.database.init_discord_users(self.branch)
+
+    def tearDown(self):
+        self.database.connection.close()
+
+    def select_users(self):
+        return self.database.connection.execute("SELECT * FROM discord_users ORDER BY id;").fetchall()
+
+    def test_unchanged_members_are_not_rewritten(self):
+        total_changes = self.database.connection.total_changes
+        self.database.init_discord_users(self.branch)
+        self.assertEqual(self.database.connection.total_changes, total_changes)
+
+    def test_changed_nickname_is_updated(self):
+        self.members[1] = SimpleNamespace(id=2, name='jdoe', display_name='Janet Doe')
+        self.database.init_discord_users(self.branch)
+        self.assertEqual(self.select_users(), [(1, 'jsmith', 'John Smith', '007'), (2, 'jdoe', 'Janet Doe', '007')])
+
+    def test_departed_member_is_detached(self):
+        self.members.pop()
+        self.database.init_discord_users(self.branch)
+        self.assertEqual(self.select_users(), [(1, 'jsmith', 'John Smith', '007'), (2, 'jdoe', 'Jane Doe', None)])
+
+
+class QueryPlanCase(TestCase):
+    """
+    Guards against the 'latest submission' and time-range queries falling
+    back to full table scans.
+    """
+
+    def setUp(self):
+        self.database = YMCADatabase(None, ':memory:')
+        self.database.migrate()
+        self.connection = self.database.connection
+        # Bound the same way select_vats and select_chems bind them.
+        self.epoch_range = (database.dbh.to_epoch(datetime.datetime(2024, 1, 1)),
+                            database.dbh.to_epoch(datetime.datetime(2024, 2, 1)))
+
+    def tearDown(self):
+        self.connection.close()
+
+    def assert_uses_index(self, query: str, params: tuple):
+        plan = [row[-1] for row in self.connection.execute(f'EXPLAIN QUERY PLAN {query}', params).fetchall()]
+        self.assertTrue(any('USING INDEX' in step or 'USING COVERING INDEX' in step for step in plan), plan)
+        self.assertFalse(any(step.startswith('SCAN') for step in plan), plan)
+        self.assertFalse(any('TEMP B-TREE' in step for step in plan), plan)
+
+    def test_select_last_chem_plan(self):
+        self.assert_uses_index(database.SELECT_LAST_CHEM, ('007', '007-01-01'))
+
+    def test_select_last_opening_plan(self):
+        self.assert_uses_index(database.SELECT_LAST_OPENING, ('007', 'Indoor Pool'))
+
+    def test_select_last_vat_plan(self):
+        self.assert_uses_index(database.SELECT_LAST_VAT, ('007',))
+
+    def test_select_vats_plan(self):
+        self.assert_uses_index(database.SELECT_VATS, ('007', *self.epoch_range))
+
+    def test_select_chems_plan(self):
+        self.assert_uses_index(database.SELECT_CHEMS, ('007', *self.epoch_range))
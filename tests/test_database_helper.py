@@ -1,3 +1,8 @@
+import datetime
+import random
+import string
+import time
+from types import SimpleNamespace
 from unittest import TestCase
 from fred import database_helper, YMCA
 
@@ -27,3 +32,115 @@ class TestHandleQuotes(TestCase):
 
     def test_handle_quotes_names_with_apostrophes(self):
         self.assertEqual(database_helper.handle_quotes('O\'Donnell', 'Mc\'Gee'), 'O\'Donnell Mc\'Gee')
+
+
+class TestEpoch(TestCase):
+
+    def test_naive_datetimes_round_trip(self):
+        dt = datetime.datetime(2024, 1, 30, 20, 28)
+        self.assertEqual(database_helper.from_epoch(database_helper.to_epoch(dt)), dt)
+
+    def test_aware_datetimes_are_converted_to_local_time(self):
+        dt = datetime.datetime(2024, 1, 30, 20, 28, tzinfo=datetime.timezone(datetime.timedelta(hours=-5)))
+        shift = dt.astimezone().utcoffset() - dt.utcoffset()
+        self.assertEqual(database_helper.to_epoch(dt) - database_helper.to_epoch(dt.replace(tzinfo=None)),
+                         shift.total_seconds())
+
+    def test_legacy_to_epoch_rejects_unknown_formats(self):
+        self.assertEqual(database_helper.legacy_to_epoch('Jan 30, 2024 08:28 PM'),
+                         database_helper.to_epoch(datetime.datetime(2024, 1, 30, 20, 28)))
+        with self.assertRaises(ValueError):
+            database_helper.legacy_to_epoch('last Tuesday')
+
+
+class TestHandleNames(TestCase):
+
+    def test_handle_names_strips_and_joins(self):
+        self.assertEqual(database_helper.handle_names(' John ', 'Doe '), 'John Doe')
+
+    def test_handle_names_keeps_apostrophes(self):
+        self.assertEqual(database_helper.handle_names('Shaq', 'O\'Neal'), 'Shaq O\'Neal')
+
+
+class TestNameIndex(TestCase):
+
+    def setUp(self):
+        rng = random.Random(7)
+        letters = 'aeiourstlnmkbdgh'
+
+        def word():
+            return rng.choice(string.ascii_uppercase) + ''.join(rng.choice(letters) for _ in range(rng.randint(2, 9)))
+
+        members = [SimpleNamespace(id=i + 1, display_name=f'{word()} {word()}') for i in range(1000)]
+        members += [SimpleNamespace(id=member_id, display_name=display_name) for member_id, display_name in
+                    [(1001, 'Jon Smith'), (1002, 'John Smith'), (1003, 'John Smyth'), (1004, 'Cher'), (1005, 'Jane '),
+                     (1006, 'Jon Smith')]]
+        self.branch = SimpleNamespace(guild=SimpleNamespace(members=members))
+        self.index = database_helper.NameIndex(members)
+        self.queries = [member.display_name for member in rng.sample(members, 100)]
+        self.queries += [f'{word()} {word()}' for _ in range(100)]
+        self.queries += ['John Smith', 'Jon Smith', 'Johnny Smithe', 'Cher', 'Jane', 'jane doe', '']
+
+    def test_matches_linear_scan(self):
+        for query in self.queries:
+            name, last_name = database_helper.split_name(query)
+            self.assertEqual(self.index.match(name, last_name),
+                             database_helper.scan_discord_id(self.branch, name, last_name), query)
+
+    def test_match_names(self):
+        names = [database_helper.split_name(query) for query in self.queries]
+        self.assertEqual(database_helper.match_names(self.index, names),
+                         [self.index.match(name, last_name) for name, last_name in names])
+
+    def test_match_names_in_worker_uses_initialized_index(self):
+        names = [database_helper.split_name(query) for query in self.queries]
+        database_helper.init_match_worker(self.index)
+        self.assertEqual(database_helper.match_names_in_worker(names), database_helper.match_names(self.index, names))
+
+    def test_ties_keep_first_member(self):
+        self.assertEqual(self.index.match('Jon', 'Smith'), 1001)
+        self.assertEqual(self.index.match('John', 'Smith'), 1002)
+
+    def test_lookup_is_sub_millisecond(self):
+        start = time.perf_counter()
+        for query in self.queries:
+            self.index.match(*database_helper.split_name(query))
+        self.assertLess((time.perf_counter() - start) / len(self.queries), 0.001)
+
+
+class TestIdentityCache(TestCase):
+
+    def setUp(self):
+        self.members = [SimpleNamespace(id=1, display_name='John Smith'),
+                        SimpleNamespace(id=2, display_name='Jane Doe')]
+        self.branch = SimpleNamespace(branch_id='007', guild=SimpleNamespace(members=self.members),
+                                      name_index=database_helper.NameIndex(self.members),
+                                      identity_cache=database_helper.IdentityCache())
+
+    def test_repeated_names_hit_cache(self):
+        for _ in range(3):
+            self.assertEqual(database_helper.match_discord_id(self.branch, 'John Smith'), 1)
+        self.assertEqual(database_helper.match_discord_id(self.branch, 'Nobody Here'), None)
+        self.assertEqual(database_helper.match_discord_id(self.branch, 'nobody here'), None)
+        self.assertEqual((self.branch.identity_cache.hits, self.branch.identity_cache.misses), (3, 2))
+
+    def test_cache_is_bounded(self):
+        identity_cache = database_helper.IdentityCache(maxsize=2)
+        for name in ['a', 'b', 'c']:
+            identity_cache.put('007', name, name, None)
+        self.assertEqual(identity_cache.get('007', 'a', 'a'), (False, None))
+        self.assertEqual(len(identity_cache), 2)
+
+    def test_leaving_member_invalidates_their_names(self):
+        database_helper.match_discord_id(self.branch, 'John Smith')
+        database_helper.match_discord_id(self.branch, 'Jane Doe')
+        self.assertEqual(self.branch.identity_cache.invalidate_member('007', 1), 1)
+        self.assertEqual(self.branch.identity_cache.get('007', 'Jane', 'Doe'), (True, 2))
+
+    def test_joining_member_invalidates_similar_names(self):
+        self.assertEqual(database_helper.match_discord_id(self.branch, 'Bob Jones'), None)
+        database_helper.match_discord_id(self.branch, 'Jane Doe')
+        self.assertEqual(self.branch.identity_cache.invalidate_display_name('007', 'Bobby Jones'), 1)
+        self.members.append(SimpleNamespace(id=3, display_name='Bobby Jones'))
+        self.branch.name_index = database_helper.NameIndex(self.members)
+        self.assertEqual(database_helper.match_discord_id(self.branch, 'Bob Jones'), 3)
@@ -1,5 +1,7 @@
 """test_rss module"""
 
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest import TestCase
 from typing import List
 import fred
@@ -24,3 +26,80 @@ class RSSTestCase(TestCase):
     def test_form_rss_in_service(self):
         print(fred.rss.form_rss_to_dict(self.is_rss_link))
         self.assertTrue(fred.rss.form_rss_to_dict(self.chems_rss_link))
+
+
+def feed_body(*unique_ids):
+    items = ''.join(f"""
+        <item>
+            <title>Chemical Check</title>
+            <link>https://ymcade.formstack.com/admin/submission/view/{unique_id}/</link>
+            <pubDate>Mon, 01 Jan 2024 08:0{i}:00 -0500</pubDate>
+            <content:encoded><![CDATA[<strong>Pool:</strong><p>Complex Lap Pool</p>]]></content:encoded>
+        </item>""" for i, unique_id in enumerate(unique_ids))
+    return (f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">
+    <channel><title>Chems</title>{items}
+    </channel>
+</rss>""").encode()
+
+
+class FeedServer(ThreadingHTTPServer):
+    """Serves one feed body, answering 304 to a matching If-None-Match unless etags are turned off."""
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), FeedHandler)
+        self.body = feed_body(2, 1)
+        self.etags = True
+        self.statuses = []
+
+    @property
+    def link(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/feed'
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        etag = f'"{hash(self.server.body)}"'
+        if self.server.etags and self.headers.get('If-None-Match') == etag:
+            self.server.statuses.append(304)
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.server.statuses.append(200)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/rss+xml')
+        if self.server.etags:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(self.server.body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FeedCacheTestCase(TestCase):
+    def setUp(self):
+        self.server = FeedServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.cache = fred.rss.FeedCache(timeout=5)
+
+    def test_parses_entries_oldest_first(self):
+        entries = self.cache.entries(self.server.link)
+        self.assertEqual([entry['Unique ID'] for entry in entries], [1, 2])
+        self.assertEqual(entries[0]['Pool'], 'Complex Lap Pool')
+
+    def test_unchanged_feed_is_not_refetched_or_reparsed(self):
+        first = self.cache.entries(self.server.link)
+        self.assertEqual(self.cache.entries(self.server.link), first)
+        self.assertEqual(self.server.statuses, [200, 304])
+        self.server.body = feed_body(3, 2, 1)
+        self.assertEqual([entry['Unique ID'] for entry in self.cache.entries(self.server.link)], [1, 2, 3])
+        self.assertEqual((self.cache.not_modified, self.cache.unchanged, self.cache.parsed), (1, 0, 2))
+
+    def test_identical_body_skips_parse_without_validators(self):
+        self.server.etags = False
+        self.cache.entries(self.server.link)
+        self.cache.entries(self.server.link)
+        self.assertEqual(self.server.statuses, [200, 200])
+        self.assertEqual((self.cache.unchanged, self.cache.parsed), (1, 1))
@@ -1,13 +1,21 @@
-from unittest import TestCase, skip
-from datetime import date, datetime
+import asyncio
+import random
+from unittest import IsolatedAsyncioTestCase, TestCase, skip
+from datetime import date, datetime, timedelta
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from whentowork.exceptions.w2w_bad_request import W2WBadRequestException
 import fred
-from whentowork import Position
+from whentowork import Employee, Position, Shift
 from settings import SETTINGS_DICT
 
-class W2WTestCase(TestCase):
-    def setUp(self):
-        ymca = fred.YMCA('YMCA of Delaware')
-        self.ymca_w2w_client_western = ymca.branches['007'].w2w_client
+class W2WTestCase(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        western = SETTINGS_DICT['branches']['007']
+        self.ymca_w2w_client_western = fred.AsyncYMCAW2WClient(western['w2w_custom_hostname'], western['w2w_token'],
+                                                               western['w2w_position_ids'])
+        self.addAsyncCleanup(self.ymca_w2w_client_western.close)
+        await self.ymca_w2w_client_western.setup()
         self.sample_start_date = date(2024, 1, 14)
         self.sample_end_date = date(2024, 1, 15)
         self.sample_start_date2 = date(2024, 1, 23)
@@ -15,21 +23,305 @@ class W2WTestCase(TestCase):
     def test_ymca_w2w_client_company_id(self):
         self.assertEqual(35181500, self.ymca_w2w_client_western.company_id)
 
-    def test_get_shifts_later(self):
-        positions = [self.ymca_w2w_client_western.get_position_by_id(self.ymca_w2w_client_western.swim_instructor)]
-        si_shifts_later = self.ymca_w2w_client_western.get_shifts_later(positions)
+    async def test_get_shifts_later(self):
+        positions = [self.ymca_w2w_client_western.swim_instructor]
+        si_shifts_later = await self.ymca_w2w_client_western.get_shifts_later(positions)
         self.assertGreater(len(si_shifts_later), 0)
 
-    def test_get_shifts_today(self):
-        positions = [self.ymca_w2w_client_western.get_position_by_id(self.ymca_w2w_client_western.swim_instructor)]
-        si_shifts_later = self.ymca_w2w_client_western.get_shifts_today(positions)
+    async def test_get_shifts_today(self):
+        positions = [self.ymca_w2w_client_western.swim_instructor]
+        si_shifts_later = await self.ymca_w2w_client_western.get_shifts_today(positions)
         self.assertGreater(len(si_shifts_later), 0)
 
-    def test_filter_shifts(self):
-        today_shifts = self.ymca_w2w_client_western.get_shifts_by_date(self.sample_start_date, self.sample_end_date)
+    async def test_filter_shifts(self):
+        today_shifts = await self.ymca_w2w_client_western.get_shifts_by_date(self.sample_start_date,
+                                                                             self.sample_end_date)
         start_dt = datetime(2024, 1, 14, 6, 30)
         end_dt = datetime(2024, 1, 14, 16, 30)
-        positions = [self.ymca_w2w_client_western.get_position_by_id(self.ymca_w2w_client_western.supervisor)]
+        positions = [self.ymca_w2w_client_western.supervisor]
         filtered_today_shifts = self.ymca_w2w_client_western.filter_shifts(today_shifts, start_dt, end_dt, positions)
         self.assertEqual(len(filtered_today_shifts), 1)
-          
\ No newline at end of file
+          
+
+class FakeAdapter:
+    def __init__(self):
+        self.requests = []
+        self.delay = 0
+
+    async def get_from_endpoint(self, endpoint, start_date=None, end_date=None):
+        if endpoint != 'AssignedShiftList':
+            return []
+        self.requests.append((start_date, end_date))
+        await asyncio.sleep(self.delay)
+        days = (end_date - start_date).days + 1
+        return [fake_shift(start_date + timedelta(days=offset)) for offset in range(days)]
+
+
+def shift_payload(day):
+    return {'COMPANY_ID': '1', 'SHIFT_ID': str(day.toordinal()), 'PUBLISHED': 'Y', 'W2W_EMPLOYEE_ID': '0',
+            'START_DATE': day.strftime('%m/%d/%Y'), 'START_TIME': '9am', 'END_DATE': day.strftime('%m/%d/%Y'),
+            'END_TIME': '5pm', 'DURATION': '8', 'DESCRIPTION': '', 'POSITION_ID': '0', 'CATEGORY_ID': '',
+            'COLOR_ID': '0', 'LAST_CHANGED_TS': '01/01/2024 9:00:00 AM'}
+
+
+def fake_shift(day):
+    return Shift(shift_payload(day))
+
+
+class ShiftCacheTestCase(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.client = fred.AsyncYMCAW2WClient(None, 'token', AsyncW2WClientTestCase.position_ids)
+        self.client._adapter = FakeAdapter()
+
+    async def test_repeated_range_is_served_from_memory(self):
+        first = await self.client.get_shifts_by_date(date(2024, 1, 14), date(2024, 1, 15))
+        second = await self.client.get_shifts_by_date(date(2024, 1, 14), date(2024, 1, 15))
+        self.assertEqual([shift.id for shift in first], [shift.id for shift in second])
+        self.assertEqual(self.client._adapter.requests, [(date(2024, 1, 14), date(2024, 1, 15))])
+
+    async def test_only_missing_days_are_fetched(self):
+        await self.client.get_shifts_by_date(date(2024, 1, 14), date(2024, 1, 15))
+        shifts = await self.client.get_shifts_by_date(date(2024, 1, 12), date(2024, 1, 17))
+        self.assertEqual(len(shifts), 6)
+        self.assertEqual(self.client._adapter.requests[1:], [(date(2024, 1, 12), date(2024, 1, 13)),
+                                                             (date(2024, 1, 16), date(2024, 1, 17))])
+
+    async def test_expired_and_invalidated_days_are_refetched(self):
+        await self.client.get_shifts_by_date(date(2024, 1, 14), date(2024, 1, 14))
+        self.client.invalidate_shifts()
+        await self.client.get_shifts_by_date(date(2024, 1, 14), date(2024, 1, 14))
+        self.client.shift_cache_ttl = 0
+        await self.client.get_shifts_by_date(date(2024, 1, 14), date(2024, 1, 14))
+        self.assertEqual(len(self.client._adapter.requests), 3)
+
+
+def fake_position(position_id):
+    return Position({'COMPANY_ID': '1', 'POSITION_ID': str(position_id), 'POSITION_NAME': f'Position {position_id}',
+                     'POSITION_CUSTOM1': '', 'POSITION_CUSTOM2': '', 'POSITION_CUSTOM3': '',
+                     'LAST_CHANGED_TS': '01/01/2024 9:00:00 AM'})
+
+
+def timed_shift(shift_id, start, end, position):
+    shift = Shift({'COMPANY_ID': '1', 'SHIFT_ID': str(shift_id), 'PUBLISHED': 'Y', 'W2W_EMPLOYEE_ID': '0',
+                   'START_DATE': start.strftime('%m/%d/%Y'), 'START_TIME': start.strftime('%I:%M%p'),
+                   'END_DATE': end.strftime('%m/%d/%Y'), 'END_TIME': end.strftime('%I:%M%p'),
+                   'DURATION': str((end - start).seconds / 3600), 'DESCRIPTION': '', 'POSITION_ID': str(position.id),
+                   'CATEGORY_ID': '', 'COLOR_ID': '0', 'LAST_CHANGED_TS': '01/01/2024 9:00:00 AM'})
+    shift.position = position
+    return shift
+
+
+class ShiftIndexTestCase(TestCase):
+    def setUp(self):
+        rng = random.Random(17)
+        self.positions = [fake_position(position_id) for position_id in range(1, 6)]
+        self.shifts = []
+        for shift_id in range(300):
+            start = datetime(2024, 1, 14, 5) + timedelta(minutes=15 * rng.randint(0, 68))
+            self.shifts.append(timed_shift(shift_id, start, start + timedelta(minutes=15 * rng.randint(1, 40)),
+                                           rng.choice(self.positions)))
+        self.index = fred.ShiftIndex(self.shifts)
+        self.windows = [(datetime(2024, 1, 14, 5) + timedelta(minutes=10 * i),
+                         datetime(2024, 1, 14, 5) + timedelta(minutes=10 * i + length)) for i in range(0, 120, 7)
+                        for length in (0, 30, 240)]
+        self.position_sets = [None, [], self.positions[:1], self.positions[1:4], [fake_position(99)]]
+
+    def test_overlapping_matches_filter_shifts(self):
+        for positions in self.position_sets:
+            self.assertEqual(self.index.overlapping(positions=positions),
+                             fred.BaseYMCAW2WClient.filter_shifts(self.shifts, positions=positions))
+            for dt_start, dt_end in self.windows:
+                self.assertEqual(self.index.overlapping(dt_start, dt_end, positions),
+                                 fred.BaseYMCAW2WClient.filter_shifts(self.shifts, dt_start, dt_end, positions))
+
+    def test_extremes_match_sorted_extremes(self):
+        client = fred.BaseYMCAW2WClient()
+        for positions in self.position_sets:
+            by_date_and_position = client._sort_shifts_by_date_and_position(
+                client.filter_shifts(self.shifts, positions=positions))
+            for opener_flag in (True, False):
+                self.assertEqual(self.index.extremes(positions, opener_flag),
+                                 client._get_extreme_shifts_from_sorted(by_date_and_position, opener_flag))
+
+
+class ShiftFrameTestCase(TestCase):
+    def setUp(self):
+        rng = random.Random(21)
+        positions = [fake_position(position_id) for position_id in range(1, 6)] + [None]
+        employees = [Employee(employee_payload(employee_id)) for employee_id in range(1, 30)] + [None]
+        self.shifts = []
+        for shift_id in range(2000):
+            start = datetime(2024, 1, 1, 5) + timedelta(minutes=15 * rng.randint(0, 35000))
+            shift = timed_shift(shift_id, start, start + timedelta(minutes=15 * rng.randint(1, 40)),
+                                fake_position(1))
+            shift.position, shift.employee = rng.choice(positions), rng.choice(employees)
+            self.shifts.append(shift)
+        self.frame = fred.ShiftFrame(self.shifts)
+        self.position_sets = [None, [], positions[:1], positions[1:4], [None], [fake_position(99)]]
+
+    def test_filter_matches_filter_shifts(self):
+        for positions in self.position_sets:
+            for dt_start, dt_end in [(None, None), (datetime(2024, 2, 1), datetime(2024, 2, 2)),
+                                     (datetime(2024, 3, 1, 12), datetime(2024, 3, 1, 12))]:
+                self.assertEqual(self.frame.filter(dt_start, dt_end, positions).shifts,
+                                 fred.BaseYMCAW2WClient.filter_shifts(self.shifts, dt_start, dt_end, positions))
+
+    def test_groups_and_uniques_match_list_helpers(self):
+        by_employee = self.frame.group_by_employee()
+        self.assertEqual(list(by_employee), list(fred.BaseYMCAW2WClient._sort_shifts_by_employee(self.shifts)))
+        self.assertEqual({employee: frame.shifts for employee, frame in by_employee.items()},
+                         fred.BaseYMCAW2WClient._sort_shifts_by_employee(self.shifts))
+        self.assertEqual({position: frame.shifts for position, frame in self.frame.group_by_position().items()},
+                         fred.BaseYMCAW2WClient._sort_shifts_by_position(self.shifts))
+        self.assertEqual(self.frame.unique_employees(), fred.BaseYMCAW2WClient.unique_employees(self.shifts))
+        self.assertEqual(len(self.frame.unique_employee_ids()), 30)
+
+    def test_sums_and_coverage(self):
+        self.assertAlmostEqual(self.frame.total_hours, sum(shift.duration for shift in self.shifts))
+        dts = [datetime(2024, 1, 1, 5) + timedelta(minutes=37 * i) for i in range(0, 20000, 13)]
+        self.assertEqual(self.frame.count_covering(dts), sum(
+            any(shift.start_datetime <= dt <= shift.end_datetime for dt in dts) for shift in self.shifts))
+        self.assertEqual(self.frame.count_covering([]), 0)
+        self.assertEqual(fred.ShiftFrame().count_covering(dts), 0)
+        self.assertTrue(self.frame.during(self.shifts[0].end_datetime))
+
+
+def employee_payload(employee_id):
+    return {'COMPANY_ID': '1', 'W2W_EMPLOYEE_ID': str(employee_id), 'EMPLOYEE_NUMBER': '', 'FIRST_NAME': 'Jane',
+            'LAST_NAME': f'Doe{employee_id}', 'PHONE': '', 'PHONE_2': '', 'MOBILE_PHONE': '', 'EMAILS': '',
+            'LAST_SIGN_IN': '', 'SIGN_IN_COUNT': '0', 'ADDRESS': '', 'ADDRESS_2': '', 'CITY': '', 'STATE': '',
+            'ZIP': '', 'COMMENTS': '', 'MAX_HRS_DAY': '0', 'MAX_SHIFTS_DAY': '0', 'MAX_HRS_WEEK': '0',
+            'MAX_DAYS_WEEK': '0', 'HIRE_DATE': '', 'STATUS': '', 'PRIORITY_GROUP': '0', 'CUSTOM_1': '',
+            'CUSTOM_2': '', 'BIWEEKLY_TARGET_HRS': '', 'ALERT_DATE': '', 'NEXT_ALERT': ''}
+
+
+class FakeW2WServer:
+    """Serves the WhenToWork endpoints AsyncYMCAW2WClient uses from memory and records every request."""
+
+    def __init__(self, delay=0.0, status=200):
+        self.delay = delay
+        self.status = status
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.peers = set()
+        self.employees = [employee_payload(1)]
+        self.positions = [{'COMPANY_ID': '1', 'POSITION_ID': '7', 'POSITION_NAME': 'Lifeguard',
+                           'POSITION_CUSTOM1': '', 'POSITION_CUSTOM2': '', 'POSITION_CUSTOM3': '',
+                           'LAST_CHANGED_TS': '01/01/2024 9:00:00 AM'}]
+        app = web.Application()
+        app.router.add_get('/api/{endpoint}', self.handle)
+        self.server = TestServer(app)
+
+    async def handle(self, request):
+        endpoint = request.match_info['endpoint']
+        self.requests.append((endpoint, request.query.get('start_date'), request.query.get('end_date')))
+        self.peers.add(request.transport.get_extra_info('peername'))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        if endpoint == 'AssignedShiftList':
+            start = datetime.strptime(request.query['start_date'], '%m/%d/%Y').date()
+            end = datetime.strptime(request.query['end_date'], '%m/%d/%Y').date()
+            data = []
+            for offset in range((end - start).days + 1):
+                data.append(dict(shift_payload(start + timedelta(days=offset)),
+                                 W2W_EMPLOYEE_ID='2' if offset else '1', POSITION_ID='7'))
+        else:
+            data = {'EmployeeList': self.employees, 'PositionList': self.positions, 'CategoryList': []}[endpoint]
+        return web.json_response({endpoint: data}, status=self.status)
+
+
+class AsyncW2WClientTestCase(IsolatedAsyncioTestCase):
+    position_ids = {'director': 0, 'specialist': 0, 'supervisor': 0, 'swim_instructor': 0,
+                    'private_swim_instructor': 0, 'swam': 0, 'lifeguard': {'main': 7}}
+
+    async def start(self, **kwargs):
+        self.fake = FakeW2WServer(**{key: kwargs.pop(key) for key in ('delay', 'status') if key in kwargs})
+        await self.fake.server.start_server()
+        self.addAsyncCleanup(self.fake.server.close)
+        self.client = fred.AsyncYMCAW2WClient(None, 'token', self.position_ids,
+                                              url=str(self.fake.server.make_url('/api/')), **kwargs)
+        self.addAsyncCleanup(self.client.close)
+
+    async def test_setup_and_cached_shift_queries(self):
+        await self.start()
+        await self.client.setup()
+        self.assertEqual(self.client.company_id, 1)
+        self.assertEqual(self.client.lifeguard_positions, self.client.positions)
+        self.fake.employees.append(employee_payload(2))
+        shifts = await self.client.get_shifts(date(2024, 1, 14), date(2024, 1, 16), self.client.lifeguard_positions)
+        self.assertEqual([shift.employee.id for shift in shifts], [1, 2, 2])
+        self.assertEqual(await self.client.get_shifts_by_date(date(2024, 1, 15), date(2024, 1, 15)), shifts[1:2])
+        self.assertEqual([request[0] for request in self.fake.requests].count('AssignedShiftList'), 1)
+        self.assertEqual([request[0] for request in self.fake.requests].count('EmployeeList'), 2)
+
+    async def test_concurrency_is_bounded_and_connections_are_reused(self):
+        await self.start(delay=0.05, max_concurrency=2)
+        self.fake.employees.append(employee_payload(2))
+        await self.client.setup()
+        self.fake.requests.clear()
+        await asyncio.gather(*(self.client.get_shifts_by_date(date(2024, 1, day), date(2024, 1, day))
+                               for day in range(1, 30, 2)))
+        self.assertEqual(len(self.fake.requests), 15)
+        self.assertEqual(self.fake.max_in_flight, 2)
+        self.assertLessEqual(len(self.fake.peers), 2)
+
+    async def test_concurrent_callers_share_in_flight_fetches(self):
+        await self.start(delay=0.05)
+        self.fake.employees.append(employee_payload(2))
+        await self.client.setup()
+        self.fake.requests.clear()
+        results = await asyncio.gather(*(self.client.get_shifts_by_date(date(2024, 1, 14), date(2024, 1, 15))
+                                         for _ in range(5)),
+                                       self.client.get_shifts_by_date(date(2024, 1, 15), date(2024, 1, 16)))
+        self.assertEqual(sorted(self.fake.requests), [('AssignedShiftList', '01/14/2024', '01/15/2024'),
+                                                      ('AssignedShiftList', '01/16/2024', '01/16/2024')])
+        self.assertEqual(self.client.shift_fetches_coalesced, 5)
+        self.assertTrue(all(result == results[0] for result in results[:5]))
+        self.assertEqual([shift.start_datetime.day for shift in results[5]], [15, 16])
+
+    async def test_failed_fetch_reaches_every_waiter(self):
+        await self.start(status=500)
+        results = await asyncio.gather(*(self.client.get_shifts_by_date(date(2024, 1, 14), date(2024, 1, 14))
+                                         for _ in range(3)), return_exceptions=True)
+        self.assertTrue(all(isinstance(result, W2WBadRequestException) for result in results))
+        self.assertEqual(len(self.fake.requests), 1)
+        self.assertEqual(self.client._shift_fetches, {})
+
+    async def test_prefetch_keeps_the_week_warm(self):
+        await self.start()
+        self.fake.employees.append(employee_payload(2))
+        await self.client.setup()
+        self.fake.requests.clear()
+        today = date(2024, 1, 14)
+        self.assertEqual(await self.client.prefetch_shifts(today), 8)
+        self.assertEqual(sorted(self.fake.requests), [('AssignedShiftList', '01/14/2024', '01/15/2024'),
+                                                      ('AssignedShiftList', '01/16/2024', '01/21/2024')])
+        self.assertEqual(await self.client.prefetch_shifts(today), 0)
+
+        # Ten minutes later only today and tomorrow are due again.
+        for day, (fetched, ttl, index) in list(self.client._shift_cache.items()):
+            self.client._shift_cache[day] = (fetched - 600, ttl, index)
+        self.assertEqual(await self.client.prefetch_shifts(today), 2)
+        self.assertEqual(self.fake.requests[-1], ('AssignedShiftList', '01/14/2024', '01/15/2024'))
+
+        # Prefetched days outlive shift_cache_ttl, so week queries are answered from memory.
+        self.client.shift_cache_ttl = 0
+        self.fake.requests.clear()
+        week = await self.client.get_shifts(today, today + timedelta(7), self.client.lifeguard_positions)
+        self.assertEqual(len(week), 8)
+        self.assertEqual(self.fake.requests, [])
+
+    async def test_slow_responses_time_out(self):
+        await self.start(delay=1, timeout=0.1)
+        with self.assertRaises(W2WBadRequestException):
+            await self.client.get_shifts_by_date(date(2024, 1, 14), date(2024, 1, 14))
+
+    async def test_error_status_raises(self):
+        await self.start(status=500)
+        with self.assertRaises(W2WBadRequestException):
+            await self.client.setup()
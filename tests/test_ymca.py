@@ -1,4 +1,6 @@
-from unittest import TestCase, mock
+import asyncio
+import time
+from unittest import IsolatedAsyncioTestCase, TestCase, mock
 from fred import YMCA
 from settings import SETTINGS_DICT
 
@@ -9,4 +11,55 @@ class YMCATestCase(TestCase):
         self.ymca.setup()
          
     def test_branches(self):
-        self.assertIn('007', self.ymca.branches)
\ No newline at end of file
+        self.assertIn('007', self.ymca.branches)
+
+class FakeBranch:
+    def __init__(self, name, delay, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.started = False
+
+    async def start(self, timings):
+        timings['w2w'] = 0.0
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        timings['pool_hours'] = self.delay
+        self.started = True
+
+
+class YMCAStartCase(IsolatedAsyncioTestCase):
+    async def test_branches_start_concurrently_and_fail_alone(self):
+        ymca = YMCA.__new__(YMCA)
+        ymca.branches = {'001': FakeBranch('Fast', 0.05), '002': FakeBranch('Also Fast', 0.05),
+                         '003': FakeBranch('Broken', 0.0, ValueError('no token')), '004': FakeBranch('Stuck', 5)}
+        start = time.perf_counter()
+        with self.assertLogs('fred.ymca', level='INFO') as logs:
+            await ymca.start(timeout=0.2)
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual([branch.started for branch in ymca.branches.values()], [True, True, False, False])
+        self.assertTrue(any('Broken startup failed: no token' in line for line in logs.output))
+        self.assertTrue(any('Stuck startup timed out after 0.2s' in line and 'w2w 0.00s' in line
+                            for line in logs.output))
+
+    async def test_run_branches_bounds_concurrency(self):
+        ymca = YMCA.__new__(YMCA)
+        ymca.branches = {f'{i:03}': FakeBranch(str(i), 0.05) for i in range(6)}
+        ymca.branch_concurrency = 2
+        running, peak = 0, 0
+
+        async def ingest(branch, timings):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await branch.start(timings)
+            running -= 1
+            if branch.name == '3':
+                raise ValueError('feed down')
+
+        with self.assertLogs('fred.ymca', level='INFO') as logs:
+            results = await ymca.run_branches(ingest, 'ingest')
+        self.assertEqual(peak, 2)
+        self.assertEqual([branch_id for branch_id, finished in results.items() if not finished], ['003'])
+        self.assertTrue(any('ingest: 5 of 6 branches finished' in line for line in logs.output))